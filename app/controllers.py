@@ -1,10 +1,7 @@
-import base64
-import json
 import threading
 import time
 from tkinter import filedialog as tk_filedialog
 
-from .ui.logging import infer_log_tag as ui_infer_log_tag
 from .ui.network_panel import NetworkPanel
 from .ui.instance_panel import InstancePanel
 from .services.poll_resources import poll_openstack_resources
@@ -15,15 +12,27 @@ from .services.router_fip import (
     create_router,
     add_subnet_interface,
     associate_floating_ip,
-    get_ports_for_device,
 )
+from .services.readiness import wait_for_server_port
+from .services.batch_provision import expand_names, provision_batch
+from .services.inventory_daemon import get_daemon_client
+from .services.circuit import CLOSED, states as circuit_states
+from .services.metrics import METRICS_FILE, metrics, write_prometheus
 from .utils.validate import (
-    is_instance_duplicate,
+    find_duplicate_instances,
     is_network_duplicate,
     get_available_floating_ips,
     get_port_id_by_device,
 )
 
+# Resources the instance panel needs before the UI is usable; the rest load on demand.
+STARTUP_RESOURCES = ("images", "flavors", "security_groups", "networks", "floating_ips")
+DEFERRED_RESOURCES = ("servers", "ports")
+# Pause before reconnecting to the inventory daemon's change feed.
+DAEMON_RETRY_DELAY = 10
+# How often the API metrics summary under the log panel is refreshed.
+METRICS_REFRESH_MS = 5000
+
 
 class AppBehaviorMixin:
     def _toggle_buttons(self, enabled):
@@ -36,9 +45,14 @@ class AppBehaviorMixin:
             self.log_panel.refresh_button.configure(state="normal")
 
     def on_log_clear_click(self):
-        self.log_textbox.configure(state="normal")
-        self.log_textbox.delete("1.0", "end")
-        self.log_textbox.configure(state="disabled")
+        self.log_sink.clear()
+
+    def on_log_filter(self, tag, text):
+        shown = self.log_sink.set_filter(tag, text.strip())
+        if tag or text.strip():
+            self.log_panel.label.configure(text=f"Logs ({shown} match{'es' if shown != 1 else ''})")
+        else:
+            self.log_panel.label.configure(text="Logs")
 
     def on_log_save_click(self):
         filename = tk_filedialog.asksaveasfilename(
@@ -48,30 +62,29 @@ class AppBehaviorMixin:
         )
         if not filename:
             return
-        content = self.log_panel.textbox.get("1.0", "end")
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(content)
+            # The widget only holds the scrollback; the session log on disk has everything.
+            self.log_sink.session_log.save_to(filename)
             print(f"Info: Log saved to {filename}")
         except OSError as exc:
             print(f"Error: Failed to save log file: {exc}")
 
-    def _append_log(self, text):
-        if not text:
-            return
-        lines = text.splitlines(keepends=True)
-        self.log_panel.textbox.configure(state="normal")
-        for line in lines:
-            tag = self._infer_log_tag(line)
-            if tag:
-                self.log_panel.textbox.insert("end", line, tag)
-            else:
-                self.log_panel.textbox.insert("end", line)
-        self.log_panel.textbox.see("end")
-        self.log_panel.textbox.configure(state="disabled")
-
-    def _infer_log_tag(self, line):
-        return ui_infer_log_tag(line)
+    def _update_metrics_summary(self):
+        try:
+            summary = metrics.format_summary()
+            unhealthy = [f"{name} {state}" for name, state in circuit_states().items() if state != CLOSED]
+            if unhealthy:
+                summary += " | circuit: " + ", ".join(unhealthy)
+            pool = self.floating_ip_pool.status()
+            target = f"/{pool['target']}" if pool["target"] else ""
+            summary += f" | FIP pool: {pool['available']}{target} free"
+            if self.instance_pool.enabled:
+                summary += f" | {self.instance_pool.format_summary()}"
+            self.log_panel.metrics_label.configure(text=summary)
+            if METRICS_FILE:
+                write_prometheus(METRICS_FILE)
+        finally:
+            self.after(METRICS_REFRESH_MS, self._update_metrics_summary)
 
     def on_refresh_click(self):
         if self._refresh_in_progress:
@@ -106,7 +119,7 @@ class AppBehaviorMixin:
                     self._toggle_buttons(enabled=True)
                     return
 
-                if is_network_duplicate(network_name):
+                if is_network_duplicate(network_name, live=True):
                     print(f"Error: Network '{network_name}' already exists.")
                     self._toggle_buttons(enabled=True)
                     return
@@ -152,14 +165,11 @@ class AppBehaviorMixin:
             except Exception as e:
                 print(f"An unexpected error occurred: {e}")
 
-            self._force_poll_and_update_ui()
+            self._refresh_after_action(("networks", "subnets", "routers", "ports"))
 
-            network_names = [net.get('name', 'Unnamed') for net in self.data.get("networks", {}).get("networks", [])]
-            if network_name in network_names:
-                self.network_combo.set(network_name)
-                print(f"Set network combobox to newly created network: {network_name}")
-            else:
-                self.network_combo.set(network_name)
+            if self.inventory.has_name("networks", network_name):
+                self.after(0, self.network_picker.set, network_name)
+                print(f"Selected newly created network: {network_name}")
 
             self._toggle_buttons(enabled=True)
 
@@ -170,23 +180,35 @@ class AppBehaviorMixin:
         self._toggle_buttons(enabled=False)
 
         def _actual_action():
+            claimed_floating_ip_id = None
             try:
                 instance_name = self.instance_name_entry.get()
                 if not instance_name:
                     print("Error: Instance name cannot be empty.")
                     return
 
-                if is_instance_duplicate(instance_name):
-                    print(f"Error: Instance '{instance_name}' already exists.")
+                count_text = self.count_entry.get().strip()
+                count = int(count_text) if count_text.isdigit() else 0
+                if count_text and count < 1:
+                    print("Error: Count must be a positive whole number.")
                     self._toggle_buttons(enabled=True)
                     return
+                count = max(count, 1)
 
-                selected_image_name = self.image_combo.get()
-                selected_flavor_string = self.flavor_combo.get()
-                selected_sg_name = self.sg_combo.get()
-                selected_network_name = self.network_combo.get()
-                selected_floating_value = self.floating_ip_combo.get()
+                instance_names = expand_names(instance_name, count) if count > 1 else [instance_name]
+                duplicates = find_duplicate_instances(instance_names, live=True)
+                if duplicates:
+                    print(f"Error: Instance '{duplicates[0]}' already exists.")
+                    self._toggle_buttons(enabled=True)
+                    return
+
+                selected_image_name = self.image_picker.get()
+                selected_flavor_string = self.flavor_picker.get()
+                selected_sg_name = self.sg_picker.get()
+                selected_network_name = self.network_picker.get()
+                selected_floating_value = self.floating_ip_picker.get()
                 floating_ip_id = self._floating_ip_map.get(selected_floating_value)
+                use_pool = selected_floating_value == self.pool_floating_ip_option
 
                 if not all([selected_image_name, selected_flavor_string, selected_sg_name, selected_network_name]):
                     print("Error: Please ensure all fields are selected/filled.")
@@ -194,82 +216,149 @@ class AppBehaviorMixin:
 
                 selected_flavor_name = selected_flavor_string.split(" (")[0]
 
-                image_id = None
-                for img in self.data.get("images", {}).get("images", []):
-                    if img.get("name") == selected_image_name:
-                        image_id = img.get("id")
-                        break
-
-                flavor_id = None
-                for f in self.data.get("flavors", {}).get("flavors", []):
-                    if f.get("name") == selected_flavor_name:
-                        flavor_id = f.get("id")
-                        break
-
-                network_id = None
-                for net in self.data.get("networks", {}).get("networks", []):
-                    if net.get("name") == selected_network_name:
-                        network_id = net.get("id")
-                        break
+                image_id = self.inventory.id_for_name("images", selected_image_name)
+                flavor_id = self.inventory.id_for_name("flavors", selected_flavor_name)
+                network_id = self.inventory.id_for_name("networks", selected_network_name)
 
                 if not all([image_id, flavor_id, network_id]):
                     print("Error: Could not find IDs for the selected resources.")
                     return
 
+                # Reserve the picked address so a concurrent flow cannot bind it too.
+                if floating_ip_id and not self.floating_ip_pool.claim(floating_ip_id):
+                    print(f"Error: Floating IP '{selected_floating_value}' is already being bound by another request.")
+                    self._toggle_buttons(enabled=True)
+                    return
+                claimed_floating_ip_id = floating_ip_id
+
                 user_script = self.script_textbox.get("1.0", "end").strip()
 
                 token = get_openstack_token()
 
-                instance_id = create_instance(token, instance_name, image_id, flavor_id, network_id, user_data=user_script)
-
-                if instance_id:
-                    print(f"Instance creation successful. ID: {instance_id}")
-
-                    if floating_ip_id:
-                        print(f"Attempting to associate floating IP ID {floating_ip_id} with instance {instance_id}...")
-                        print("Waiting 5 seconds for instance networking to initialize...")
-                        time.sleep(5)
-                        print("Refreshing cached inventory prior to floating IP association...")
-                        self._force_poll_and_update_ui()
-                        port_id = None
-                        ports = get_ports_for_device(token, instance_id)
-                        for port in ports:
-                            candidate_port_id = port.get("id")
-                            if candidate_port_id:
-                                port_id = candidate_port_id
-                                break
-
-                        if not port_id:
-                            print("Info: No ports returned from live query, falling back to refreshed cache.")
-                            port_id = get_port_id_by_device(instance_id)
-
-                        if port_id:
-                            association = associate_floating_ip(token, floating_ip_id, port_id)
-                            if association:
-                                floating_ip_address = (
-                                    association.get("floatingip", {}).get("floating_ip_address") or selected_floating_value
-                                )
-                                print(f"Floating IP {floating_ip_address} associated successfully.")
+                if count > 1:
+                    self._provision_instance_batch(
+                        token, instance_name, count, image_id, flavor_id, network_id,
+                        user_script, floating_ip_id, selected_floating_value,
+                    )
+                else:
+                    started = time.monotonic()
+                    # Pool instances booted without user data, so a custom script always boots a new one.
+                    from_pool = self.instance_pool.enabled and not user_script
+                    pooled = None
+                    if from_pool:
+                        pooled = self.instance_pool.acquire(
+                            token, image_id, flavor_id, network_id, instance_name,
+                            label=f"{selected_image_name}/{selected_flavor_name}/{selected_network_name}",
+                        )
+
+                    if pooled:
+                        instance_id = pooled["id"]
+                        print(f"Instance '{instance_name}' taken from the warm pool. ID: {instance_id}")
+                    else:
+                        instance_id = create_instance(token, instance_name, image_id, flavor_id, network_id, user_data=user_script)
+
+                    if instance_id:
+                        if not pooled:
+                            print(f"Instance creation successful. ID: {instance_id}")
+                        # A pool instance is usable right away; a new one once its port is ACTIVE.
+                        ready = bool(pooled)
+                        port_checked = bool(pooled)
+
+                        if floating_ip_id or use_pool:
+                            port_id = pooled["port_id"] if pooled else None
+                            if not port_id:
+                                print("Info: Waiting for the instance port to become ACTIVE...")
+                                port = wait_for_server_port(token, instance_id)
+                                port_id = port.get("id") if port else None
+                                ready = port_id is not None
+                                port_checked = True
+
+                            if not port_id:
+                                print("Info: No ACTIVE port found before the deadline, looking up any port of the instance.")
+                                port_id = get_port_id_by_device(instance_id, live=True)
+
+                            if port_id:
+                                self._bind_floating_ip(token, instance_id, port_id, floating_ip_id, selected_floating_value)
                             else:
-                                print(f"Warning: Failed to associate floating IP {floating_ip_id} with port {port_id}.")
+                                print(f"Warning: Could not determine port for instance {instance_id}; skipping floating IP assignment.")
                         else:
-                            print(f"Warning: Could not determine port for instance {instance_id}; skipping floating IP assignment.")
+                            if selected_floating_value != self.no_floating_ip_option:
+                                print(f"Warning: Selected floating IP '{selected_floating_value}' not available in map; skipping assignment.")
+
+                        if from_pool and port_checked:
+                            self.instance_pool.record_handout(
+                                image_id, flavor_id, network_id, hit=bool(pooled),
+                                seconds=time.monotonic() - started if ready else None,
+                            )
+                        elif from_pool:
+                            # Nothing waited for the port: time the miss to ACTIVE without holding up the UI.
+                            threading.Thread(
+                                target=self._record_pool_miss,
+                                args=(token, instance_id, image_id, flavor_id, network_id, started),
+                                daemon=True,
+                            ).start()
+                        self.instance_name_entry.delete(0, "end")
+                        self.script_textbox.delete("1.0", "end")
                     else:
-                        if selected_floating_value != self.no_floating_ip_option:
-                            print(f"Warning: Selected floating IP '{selected_floating_value}' not available in map; skipping assignment.")
-
-                    self.instance_name_entry.delete(0, "end")
-                    self.script_textbox.delete("1.0", "end")
-                else:
-                    print("Instance creation failed.")
+                        print("Instance creation failed.")
             except Exception as e:
                 print(f"An unexpected error occurred: {e}")
+            finally:
+                # Whatever happened, drop the claim; once the address is bound this is a no-op.
+                if claimed_floating_ip_id:
+                    self.floating_ip_pool.release(claimed_floating_ip_id)
 
-            self._force_poll_and_update_ui()
+            self._refresh_after_action(("servers", "ports", "floating_ips"))
             self._toggle_buttons(enabled=True)
 
         threading.Thread(target=_actual_action, daemon=True).start()
 
+    def _record_pool_miss(self, token, instance_id, image_id, flavor_id, network_id, started):
+        """Record a warm pool miss once the booted instance's port is ACTIVE (no latency if it never is)."""
+        port = wait_for_server_port(token, instance_id)
+        self.instance_pool.record_handout(
+            image_id, flavor_id, network_id, hit=False, seconds=time.monotonic() - started if port else None,
+        )
+
+    def _bind_floating_ip(self, token, instance_id, port_id, floating_ip_id, selected_floating_value):
+        """Associate the picked floating IP (or one from the pool) with the instance port."""
+        pooled = None
+        if not floating_ip_id:
+            pooled = self.floating_ip_pool.acquire(token)
+            if not pooled:
+                print(f"Warning: No floating IP available from the pool; instance {instance_id} has none.")
+                return
+            floating_ip_id = pooled["id"]
+            selected_floating_value = pooled.get("floating_ip_address") or floating_ip_id
+
+        print(f"Attempting to associate floating IP ID {floating_ip_id} with instance {instance_id}...")
+        association = associate_floating_ip(token, floating_ip_id, port_id)
+        if association:
+            floating_ip_address = association.get("floatingip", {}).get("floating_ip_address") or selected_floating_value
+            print(f"Floating IP {floating_ip_address} associated successfully.")
+        else:
+            print(f"Warning: Failed to associate floating IP {floating_ip_id} with port {port_id}.")
+            self.floating_ip_pool.release(pooled or floating_ip_id)
+
+    def _provision_instance_batch(
+        self, token, name_pattern, count, image_id, flavor_id, network_id,
+        user_script, floating_ip_id, selected_floating_value,
+    ):
+        # Start with the selected address; the pool hands out the rest as ports become ready.
+        floating_ip_ids = [floating_ip_id] if floating_ip_id else []
+        floating_ip_pool = None
+        if selected_floating_value != self.no_floating_ip_option:
+            floating_ip_pool = self.floating_ip_pool
+
+        results = provision_batch(
+            token, name_pattern, count, image_id, flavor_id, network_id,
+            user_data=user_script, floating_ip_ids=floating_ip_ids, floating_ip_pool=floating_ip_pool,
+        )
+        if any(not result["error"] for result in results):
+            self.instance_name_entry.delete(0, "end")
+            self.count_entry.delete(0, "end")
+            self.script_textbox.delete("1.0", "end")
+
     def _build_network_frame(self):
         self.network_panel = NetworkPanel(self.controls_frame, self.on_create_network_click)
         self.network_frame = self.network_panel.frame
@@ -283,107 +372,157 @@ class AppBehaviorMixin:
     def _build_instance_frame(self):
         self.instance_panel = InstancePanel(self.controls_frame, self.on_create_instance_click, self._on_flavor_select)
         self.instance_frame = self.instance_panel.frame
-        self.image_combo = self.instance_panel.image_combo
-        self.flavor_combo = self.instance_panel.flavor_combo
+        self.image_picker = self.instance_panel.image_picker
+        self.flavor_picker = self.instance_panel.flavor_picker
         self.flavor_details_label = self.instance_panel.flavor_details_label
-        self.sg_combo = self.instance_panel.sg_combo
-        self.network_combo = self.instance_panel.network_combo
-        self.floating_ip_combo = self.instance_panel.floating_ip_combo
+        self.sg_picker = self.instance_panel.sg_picker
+        self.network_picker = self.instance_panel.network_picker
+        self.floating_ip_picker = self.instance_panel.floating_ip_picker
         self.instance_name_entry = self.instance_panel.instance_name_entry
+        self.count_entry = self.instance_panel.count_entry
         self.script_textbox = self.instance_panel.script_textbox
         self.create_instance_button = self.instance_panel.create_button
 
     def _load_data_and_update_ui(self):
-        try:
-            with open("openstack_data.json", "r", encoding='utf-8') as f:
-                self.data = json.load(f)
-                print("Data loaded from cache.")
-        except FileNotFoundError:
+        self.inventory.refresh(force=True)
+        if self.inventory.loaded:
+            print("Data loaded from cache.")
+        else:
             print("Cached data not found. Polling from OpenStack API...")
             poll_openstack_resources(verbose=False, log_file=self.poll_log_path)
-            try:
-                with open("openstack_data.json", "r", encoding='utf-8') as f:
-                    self.data = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError) as e:
-                print(f"Error: Failed to load data after polling: {e}")
-        except json.JSONDecodeError as e:
-            print(f"Warning: Could not decode cached JSON data: {e}")
-        self.after(0, self._update_comboboxes)
+            self.inventory.refresh(force=True)
+            if not self.inventory.loaded:
+                print("Error: Failed to load data after polling.")
+        # Only the sections behind the pickers are needed to become interactive.
+        self.inventory.preload(STARTUP_RESOURCES)
+        self.after(0, self._update_pickers)
+        self.floating_ip_pool.start()
+        self.inventory.preload(DEFERRED_RESOURCES)
+        # Adopting pool instances from earlier sessions needs the server list.
+        self.instance_pool.start(self.inventory)
+        if self.refresh_scheduler is not None:
+            self.refresh_scheduler.start()
 
     def _force_poll_and_update_ui(self, on_finish_callback=None):
-        poll_openstack_resources(verbose=False, log_file=self.poll_log_path)
-        try:
-            with open("openstack_data.json", "r", encoding='utf-8') as f:
-                self.data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error: Failed to load data after polling: {e}")
-            self.data = {}
-        self.after(0, self._update_comboboxes, on_finish_callback)
-
-    def _update_comboboxes(self, on_finish_callback=None):
+        # Shares the lock with scheduled and post-action refreshes so polls never overlap.
+        with self._background_refresh_lock:
+            poll_openstack_resources(verbose=False, log_file=self.poll_log_path, incremental=True)
+            self.inventory.refresh(force=True)
+            if not self.inventory.loaded:
+                print("Error: Failed to load data after polling.")
+            self.inventory.preload(STARTUP_RESOURCES)
+        self.after(0, self._update_pickers, on_finish_callback)
+
+    def _refresh_after_action(self, resource_names):
+        """
+        Show the patched inventory right away, then re-poll only the affected
+        resource types in the background to pick up server-side details.
+        """
+        self.after(0, self._update_pickers, None, resource_names)
+
+        def _background_refresh():
+            with self._background_refresh_lock:
+                poll_openstack_resources(
+                    verbose=False, log_file=self.poll_log_path, incremental=True, resources=resource_names
+                )
+                self.inventory.refresh(force=True)
+                self.inventory.preload(STARTUP_RESOURCES)
+            self.after(0, self._update_pickers, None, resource_names)
+
+        threading.Thread(target=_background_refresh, daemon=True).start()
+
+    def _on_scheduled_refresh(self, changed):
+        """Reload the inventory after a scheduled refresh; redraw only if a picker's data changed."""
+        self.inventory.refresh(force=True)
+        self.inventory.preload(STARTUP_RESOURCES)
+        if set(changed) & set(STARTUP_RESOURCES):
+            self.after(0, self._update_pickers, None, changed)
+
+    def _watch_inventory_daemon(self):
+        """Follow the inventory daemon's change feed and reload the UI when its snapshot changes."""
+        client = get_daemon_client()
+        epoch, version = None, 0
+        while True:
+            try:
+                status = client.wait_for_changes(version, epoch=epoch)
+                if status.get("epoch") == epoch and status["version"] == version:
+                    continue
+                # A restarted daemon (new epoch) counts from zero; sync() then downloads everything.
+                changed = client.sync(status)
+                epoch, version = status.get("epoch"), status["version"]
+            except Exception as exc:
+                print(f"Warning: Inventory daemon at {client.base_url} unreachable ({exc}); retrying in {DAEMON_RETRY_DELAY}s.")
+                time.sleep(DAEMON_RETRY_DELAY)
+                continue
+            if changed:
+                print(f"Info: Inventory daemon reported changes to {', '.join(changed)}.")
+                self.inventory.refresh(force=True)
+                self.inventory.preload(STARTUP_RESOURCES)
+                self.after(0, self._update_pickers, None, changed)
+
+    @staticmethod
+    def _flavor_display(flavor):
+        ram_mb = flavor.get('ram', 0)
+        ram_gb = ram_mb / 1024 if ram_mb else 0
+        vcpus = flavor.get('vcpus', 'N/A')
+        disk = flavor.get('disk', 'N/A')
+        return f"{flavor.get('name')} (VCPUs: {vcpus}, RAM: {ram_gb:.2f}GB, Disk: {disk}GB)"
+
+    def _update_pickers(self, on_finish_callback=None, resources=STARTUP_RESOURCES):
+        """
+        Push the inventory into the pickers whose resources are in ``resources``.
+
+        Pickers apply only the difference to their search index, so a refresh
+        that changed one network costs one index update, not a rebuild.
+        """
+        resources = set(resources)
         print("Updating UI with loaded data...")
-        image_names = [img.get('name', 'Unnamed') for img in self.data.get("images", {}).get("images", [])]
-        self.image_combo.configure(values=image_names if image_names else ["No images found"])
-        self.image_combo.set(image_names[0] if image_names else "No images found")
-
-        flavor_display_list = []
-        flavors = self.data.get("flavors", {}).get("flavors", [])
-        for f in flavors:
-            ram_mb = f.get('ram', 0)
-            ram_gb = ram_mb / 1024 if ram_mb else 0
-            vcpus = f.get('vcpus', 'N/A')
-            disk = f.get('disk', 'N/A')
-            display_name = f"{f.get('name')} (VCPUs: {vcpus}, RAM: {ram_gb:.2f}GB, Disk: {disk}GB)"
-            flavor_display_list.append(display_name)
-
-        self.flavor_combo.configure(values=flavor_display_list if flavor_display_list else ["No flavors found"], command=self._on_flavor_select)
-        self.flavor_combo.set(flavor_display_list[0] if flavor_display_list else "No flavors found")
-
-        sg_names = [sg.get('name', 'Unnamed') for sg in self.data.get("security_groups", {}).get("security_groups", [])]
-        self.sg_combo.configure(values=sg_names if sg_names else ["No SGs found"])
-        if "default" in sg_names:
-            self.sg_combo.set("default")
-        else:
-            self.sg_combo.set(sg_names[0] if sg_names else "No SGs found")
-
-        network_names = [net.get('name', 'Unnamed') for net in self.data.get("networks", {}).get("networks", [])]
-        self.network_combo.configure(values=network_names if network_names else ["No networks found"])
-        self.network_combo.set(network_names[0] if network_names else "No networks found")
-
-        available_fips = get_available_floating_ips()
-        floating_values = [self.no_floating_ip_option]
-        self._floating_ip_map = {}
-        for ip in available_fips:
-            address = ip.get("floating_ip_address", "Unknown IP")
-            ip_id = ip.get("id", "")
-            display = f"{address} ({ip_id[:8]})" if ip_id else address
-            floating_values.append(display)
-            self._floating_ip_map[display] = ip_id
-
-        if len(floating_values) == 1:
-            print("Info: No available floating IPs detected in cache.")
-
-        self.floating_ip_combo.configure(values=floating_values)
-        self.floating_ip_combo.set(floating_values[0])
-
-        self._on_flavor_select(self.flavor_combo.get())
+        if "images" in resources:
+            image_names = [img.get('name') or 'Unnamed' for img in self.inventory.items("images")]
+            self.image_picker.set_values(image_names or ["No images found"])
+
+        if "flavors" in resources:
+            flavor_display_list = [self._flavor_display(f) for f in self.inventory.items("flavors")]
+            self.flavor_picker.set_values(flavor_display_list or ["No flavors found"])
+
+        if "security_groups" in resources:
+            sg_names = [sg.get('name') or 'Unnamed' for sg in self.inventory.items("security_groups")]
+            self.sg_picker.set_values(sg_names or ["No SGs found"], default="default")
+
+        if "networks" in resources:
+            network_names = [net.get('name') or 'Unnamed' for net in self.inventory.items("networks")]
+            self.network_picker.set_values(network_names or ["No networks found"])
+
+        if "floating_ips" in resources:
+            self._floating_ip_map = {}
+            for ip in get_available_floating_ips():
+                address = ip.get("floating_ip_address") or "Unknown IP"
+                ip_id = ip.get("id") or ""
+                display = f"{address} ({ip_id[:8]})" if ip_id else address
+                self._floating_ip_map[display] = ip_id
+
+            if not self._floating_ip_map:
+                print("Info: No available floating IPs detected in cache.")
+
+            self.floating_ip_picker.set_values(
+                self._floating_ip_map, pinned=[self.no_floating_ip_option, self.pool_floating_ip_option]
+            )
+
+        if "flavors" in resources:
+            self._on_flavor_select(self.flavor_picker.get())
         print("UI update complete.")
 
         if on_finish_callback:
             self.after(50, on_finish_callback)
 
     def _on_flavor_select(self, selected_flavor_string):
-        if not self.data or not selected_flavor_string or "(" not in selected_flavor_string:
+        if not self.inventory.loaded or not selected_flavor_string or "(" not in selected_flavor_string:
             self.flavor_details_label.configure(text="")
             return
 
         selected_flavor_name = selected_flavor_string.split(" (")[0]
 
-        flavor_details = None
-        for flavor in self.data.get("flavors", {}).get("flavors", []) :
-            if flavor.get("name") == selected_flavor_name:
-                flavor_details = flavor
-                break
+        flavor_details = self.inventory.find_by_name("flavors", selected_flavor_name)
 
         if flavor_details:
             ram_mb = flavor_details.get('ram', 0)
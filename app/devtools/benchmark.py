@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from .mock_openstack import MockCloud, base_urls, create_server, start_in_thread
+
+# Scenarios scale the synthetic inventory; "large" matches a busy shared project.
+SCALES = {
+    "small": {"networks": 20, "servers": 200, "ports": 1000, "floating_ips": 100},
+    "medium": {"networks": 100, "servers": 2000, "ports": 10000, "floating_ips": 500},
+    "large": {"networks": 500, "servers": 5000, "ports": 50000, "floating_ips": 2000},
+}
+
+
+def _timed(func, repeat=1):
+    """Run ``func`` ``repeat`` times; return (last result, list of durations in seconds)."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - started)
+    return result, durations
+
+
+def _stats(durations):
+    return {
+        "runs": len(durations),
+        "median_s": statistics.median(durations),
+        "min_s": min(durations),
+        "max_s": max(durations),
+    }
+
+
+def _point_app_at(server):
+    # Must run before any app.services module is imported: base URLs are read at import time.
+    os.environ.update(base_urls(server))
+    os.environ["ACCOUNT_ID"] = "benchmark"
+    os.environ["OPENSTACK_PROJECT_ID"] = "benchmark"
+    os.environ["ACCOUNT_PASSWORD_BASE64"] = "YmVuY2htYXJr"
+    os.environ.pop("OPENSTACK_TOKEN", None)
+
+
+def run_benchmarks(cloud, server, repeat=3, lookups=10000, batch_size=10):
+    """
+    Run every benchmark against a started mock server.
+
+    Returns:
+        dict: benchmark name -> timing statistics (and throughput where relevant).
+    """
+    _point_app_at(server)
+    from ..services.batch_provision import provision_batch
+    from ..services.create_instance import create_instance
+    from ..services.floating_ip_pool import FloatingIPPool
+    from ..services.instance_pool import InstancePool
+    from ..services.readiness import wait_for_server_port
+    from ..services.router_fip import allocate_floating_ip
+    from ..services.auth import get_openstack_token
+    from ..services.poll_resources import poll_openstack_resources
+    from ..services.metrics import metrics
+    from ..services.snapshot import OUTPUT_FILE, load_snapshot
+    from ..utils import validate
+    from ..utils.inventory import Inventory, get_inventory
+    from ..utils.search_index import SearchIndex
+
+    results = {}
+    token = get_openstack_token()
+
+    bytes_before = metrics.response_bytes_total()
+    _, durations = _timed(lambda: poll_openstack_resources(verbose=False), repeat)
+    results["poll_full"] = dict(_stats(durations), response_bytes=(metrics.response_bytes_total() - bytes_before) // repeat)
+
+    _, durations = _timed(lambda: poll_openstack_resources(verbose=False, incremental=True), repeat)
+    results["poll_incremental"] = _stats(durations)
+
+    _, durations = _timed(load_snapshot, repeat)
+    results["snapshot_load_all"] = dict(_stats(durations), snapshot_bytes=os.path.getsize(OUTPUT_FILE) if os.path.exists(OUTPUT_FILE) else None)
+
+    _, durations = _timed(lambda: Inventory().items("networks"), repeat)
+    results["snapshot_load_one_section"] = _stats(durations)
+
+    inventory = get_inventory()
+    inventory.refresh(force=True)
+    inventory.preload(["networks", "servers", "ports", "floating_ips"])
+    network_names = [network["name"] for network in inventory.items("networks")] or ["missing"]
+    device_ids = [port["device_id"] for port in inventory.items("ports") if port.get("device_id")] or ["missing"]
+
+    def _lookups():
+        for index in range(lookups):
+            validate.is_network_duplicate(network_names[index % len(network_names)])
+            validate.get_port_id_by_device(device_ids[index % len(device_ids)])
+
+    _, durations = _timed(_lookups, repeat)
+    results["validator_lookups"] = dict(_stats(durations), lookups=lookups * 2,
+                                        lookups_per_s=lookups * 2 / statistics.median(durations))
+
+    server_names = [server["name"] for server in inventory.items("servers")] or ["missing"]
+    live_checks = max(1, lookups // 100)
+
+    def _live_checks():
+        for index in range(live_checks):
+            validate.is_network_duplicate(network_names[index % len(network_names)], live=True)
+            validate.is_instance_duplicate(server_names[index % len(server_names)], live=True)
+            validate.get_port_id_by_device(device_ids[index % len(device_ids)], live=True)
+
+    bytes_before = metrics.response_bytes_total()
+    _, durations = _timed(_live_checks, repeat)
+    results["validator_live_checks"] = dict(
+        _stats(durations), checks=live_checks * 3,
+        response_bytes_per_check=(metrics.response_bytes_total() - bytes_before) // (live_checks * 3 * repeat),
+    )
+
+    # Picker type-ahead over the largest name list: one search per keystroke, then a one-item refresh.
+    picker_index = SearchIndex(server_names)
+    typed = server_names[0]
+    keystrokes = [typed[:length] for length in range(1, len(typed) + 1)]
+
+    def _picker_searches():
+        for query in keystrokes:
+            picker_index.search(query)
+        picker_index.update(server_names[1:])
+        picker_index.update(server_names)
+
+    _, durations = _timed(_picker_searches, repeat)
+    results["picker_search"] = dict(_stats(durations), values=len(picker_index), keystrokes=len(keystrokes))
+
+    # Floating IP for a new instance: allocate at bind time versus take one from a warm pool.
+    fip_pool = FloatingIPPool(target=0)
+    _, durations = _timed(lambda: fip_pool.release(allocate_floating_ip(token)), repeat)
+    results["fip_allocate"] = _stats(durations)
+    _, durations = _timed(lambda: fip_pool.acquire(token, allocate=False), repeat)
+    results["fip_pool_acquire"] = _stats(durations)
+
+    networks = [network for network in inventory.items("networks") if network.get("subnets")]
+    images = inventory.items("images")
+    flavors = inventory.items("flavors")
+    free_ips = [fip["id"] for fip in inventory.available_floating_ips()]
+    if networks and images and flavors:
+        def _provision():
+            floating_ips = [free_ips.pop() for _ in range(min(batch_size, len(free_ips)))]
+            return provision_batch(
+                token, f"bench-{time.time_ns()}-{{index}}", batch_size, images[0]["id"], flavors[0]["id"],
+                networks[0]["id"], floating_ip_ids=floating_ips,
+            )
+
+        batches, durations = _timed(_provision, repeat)
+        failed = sum(1 for result in batches if result["error"])
+        results["provision_batch"] = dict(_stats(durations), instances=batch_size, failed_last_run=failed,
+                                          instances_per_s=batch_size / statistics.median(durations))
+
+        # One usable instance: boot and wait for its port (miss) versus rename a pre-booted one (hit).
+        profile = (images[0]["id"], flavors[0]["id"], networks[0]["id"])
+        _, durations = _timed(
+            lambda: wait_for_server_port(token, create_instance(token, f"bench-{time.time_ns()}", *profile)), repeat
+        )
+        results["instance_boot_miss"] = _stats(durations)
+
+        warm_pool = InstancePool(size=1)
+        warm_pool.start(inventory, profiles=",".join(profile))
+        durations = []
+        for _ in range(repeat):
+            give_up = time.monotonic() + cloud.boot_seconds * 10 + 30
+            while not any(status["ready"] for status in warm_pool.status().values()) and time.monotonic() < give_up:
+                time.sleep(0.1)
+            started = time.perf_counter()
+            if warm_pool.acquire(token, *profile, f"bench-{time.time_ns()}"):
+                durations.append(time.perf_counter() - started)
+        warm_pool.stop()
+        if durations:
+            results["instance_pool_hit"] = _stats(durations)
+    return results
+
+
+def _print_results(results, baseline=None):
+    print(f"{'benchmark':<28}{'median':>10}{'min':>10}{'max':>10}  extra")
+    for name, stats in results.items():
+        extra = ", ".join(f"{key}={value:.0f}" if isinstance(value, float) else f"{key}={value}"
+                          for key, value in stats.items() if key not in ("runs", "median_s", "min_s", "max_s"))
+        line = f"{name:<28}{stats['median_s']:>9.3f}s{stats['min_s']:>9.3f}s{stats['max_s']:>9.3f}s  {extra}"
+        if baseline and name in baseline:
+            before = baseline[name]["median_s"]
+            change = (stats["median_s"] - before) / before * 100 if before else 0.0
+            line += f"  ({change:+.1f}% vs baseline)"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark polling, snapshot loading, lookups and provisioning against the mock cloud.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Synthetic inventory size.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every mock response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay of up to this many seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock requests that fail with 503.")
+    parser.add_argument("--gzip", action="store_true", help="Have the mock gzip large responses.")
+    parser.add_argument("--boot-seconds", type=float, default=1.0, help="Time for a new server to become ACTIVE.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark.")
+    parser.add_argument("--lookups", type=int, default=10000, help="Validator lookups per run (each does two).")
+    parser.add_argument("--batch-size", type=int, default=10, help="Instances per provisioning run.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against a previous --output file.")
+    parser.add_argument("--workdir", help="Directory for snapshot/token files (default: a new temp dir).")
+    args = parser.parse_args()
+
+    baseline_results = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline_results = json.load(f)["results"]
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    # Snapshot, poll state and token cache paths are relative; keep them out of the real ones.
+    os.chdir(args.workdir or tempfile.mkdtemp(prefix="openstack-bench-"))
+    mock_cloud = MockCloud(boot_seconds=args.boot_seconds, seed=args.seed, **SCALES[args.scale])
+    mock_server = create_server(mock_cloud, port=0, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                compress=args.gzip)
+    start_in_thread(mock_server)
+    print(f"Benchmarking '{args.scale}' inventory ({len(mock_cloud.collections['ports'])} ports) "
+          f"with {args.latency * 1000:.0f} ms latency in {os.getcwd()}")
+
+    benchmark_results = run_benchmarks(
+        mock_cloud, mock_server, repeat=args.repeat, lookups=args.lookups, batch_size=args.batch_size
+    )
+    mock_server.shutdown()
+    _print_results(benchmark_results, baseline_results)
+
+    if output_path:
+        report = {"scale": args.scale, "latency": args.latency, "error_rate": args.error_rate, "gzip": args.gzip,
+                  "results": benchmark_results}
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {output_path}")
@@ -0,0 +1,603 @@
+import argparse
+import gzip
+import ipaddress
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+DEFAULT_PORT = 8999
+EXTERNAL_NETWORK_ID = "c3455e8f-ea16-4f5d-ad5e-5c4292015a0d"
+TOKEN_TTL = 3600
+
+COMPUTE_PREFIX = "/v2.1"
+NETWORK_PREFIX = "/v2.0"
+IDENTITY_PREFIX = "/v3"
+
+# URL path segment -> (resource name, collection key) for the collections served.
+COMPUTE_COLLECTIONS = {
+    "flavors/detail": ("flavors", "flavors"),
+    "images": ("images", "images"),
+    "os-keypairs": ("keypairs", "keypairs"),
+    "servers/detail": ("servers", "servers"),
+}
+NETWORK_COLLECTIONS = {
+    "networks": ("networks", "networks"),
+    "subnets": ("subnets", "subnets"),
+    "ports": ("ports", "ports"),
+    "routers": ("routers", "routers"),
+    "floatingips": ("floating_ips", "floatingips"),
+    "security-groups": ("security_groups", "security_groups"),
+}
+# Query parameters that are not attribute filters.
+_RESERVED_PARAMS = {"limit", "marker", "fields", "changes-since", "page_reverse", "sort_key", "sort_dir"}
+
+
+def _filter_value(value):
+    # Query strings carry JSON-style booleans and "" for null.
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else str(value)
+
+
+def _now_iso(offset=0):
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class MockCloud:
+    """
+    In-memory Keystone/Nova/Neutron state with a synthetic inventory.
+
+    Items are generated deterministically from ``seed``. Servers created through
+    the API start in BUILD with a DOWN port and become ACTIVE after
+    ``boot_seconds``. Every collection has a version used for ETags.
+    """
+
+    def __init__(
+        self,
+        networks=20,
+        servers=200,
+        ports=None,
+        floating_ips=100,
+        routers=5,
+        images=20,
+        flavors=10,
+        security_groups=5,
+        keypairs=2,
+        boot_seconds=2.0,
+        seed=0,
+    ):
+        self.boot_seconds = boot_seconds
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self.collections = {name: {} for name in (*[v[0] for v in COMPUTE_COLLECTIONS.values()],
+                                                   *[v[0] for v in NETWORK_COLLECTIONS.values()])}
+        self.versions = {name: 1 for name in self.collections}
+        self._ready_at = {}
+        self._next_ip = {}
+        self._generate(networks, servers, ports, floating_ips, routers, images, flavors, security_groups, keypairs)
+
+    # -- generation ----------------------------------------------------------
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self._rng.getrandbits(128), version=4))
+
+    def _allocate_ip(self, subnet):
+        network = ipaddress.ip_network(subnet["cidr"])
+        offset = self._next_ip.get(subnet["id"], 10)
+        self._next_ip[subnet["id"]] = offset + 1
+        return str(network.network_address + offset % max(network.num_addresses - 2, 1))
+
+    def _add(self, resource_name, item):
+        self.collections[resource_name][item.get("id") or item["keypair"]["name"]] = item
+        self.versions[resource_name] += 1
+        return item
+
+    def _generate(self, networks, servers, ports, floating_ips, routers, images, flavors, security_groups, keypairs):
+        for index in range(images):
+            self._add("images", {"id": self._uuid(), "name": f"image-{index}", "status": "ACTIVE"})
+        for index in range(flavors):
+            self._add("flavors", {
+                "id": self._uuid(), "name": f"m1.flavor-{index}",
+                "vcpus": 1 + index % 8, "ram": 1024 * (1 + index % 16), "disk": 10 * (1 + index % 10),
+            })
+        for index in range(keypairs):
+            self._add("keypairs", {"keypair": {"name": f"key-{index}", "fingerprint": f"00:{index:02x}"}})
+        for index in range(security_groups):
+            self._add("security_groups", {"id": self._uuid(), "name": "default" if index == 0 else f"sg-{index}"})
+
+        self._add("networks", {
+            "id": EXTERNAL_NETWORK_ID, "name": "public", "status": "ACTIVE",
+            "router:external": True, "subnets": [],
+        })
+        subnets = []
+        for index in range(networks):
+            network = self._add("networks", {
+                "id": self._uuid(), "name": f"net-{index}", "status": "ACTIVE",
+                "router:external": False, "subnets": [],
+            })
+            subnet = self._add("subnets", {
+                "id": self._uuid(), "name": f"subnet-{index}", "network_id": network["id"],
+                "cidr": f"10.{index // 256}.{index % 256}.0/24", "ip_version": 4,
+            })
+            network["subnets"].append(subnet["id"])
+            subnets.append(subnet)
+
+        for index in range(routers):
+            router = self._add("routers", {
+                "id": self._uuid(), "name": f"router-{index}", "status": "ACTIVE",
+                "external_gateway_info": {"network_id": EXTERNAL_NETWORK_ID},
+            })
+            if subnets:
+                self._add_port(subnets[index % len(subnets)], router["id"], "network:router_interface")
+
+        image_ids = list(self.collections["images"])
+        flavor_ids = list(self.collections["flavors"])
+        for index in range(servers):
+            server = self._add("servers", self._server_doc(
+                self._uuid(), f"vm-{index}", image_ids, flavor_ids, status="ACTIVE", updated=_now_iso(-3600)
+            ))
+            if subnets:
+                self._add_port(subnets[index % len(subnets)], server["id"], "compute:nova")
+
+        # Extra unattached ports to reach the requested total.
+        if subnets and ports:
+            for index in range(max(0, ports - len(self.collections["ports"]))):
+                self._add_port(subnets[index % len(subnets)], "", "", status="DOWN")
+
+        server_ports = [port for port in self.collections["ports"].values() if port["device_owner"] == "compute:nova"]
+        for index in range(floating_ips):
+            # Associate every other floating IP with a server port.
+            port = server_ports[index // 2] if index % 2 == 0 and index // 2 < len(server_ports) else None
+            self._add("floating_ips", {
+                "id": self._uuid(), "floating_ip_address": f"172.16.{index // 256}.{index % 256}",
+                "floating_network_id": EXTERNAL_NETWORK_ID, "status": "ACTIVE" if port else "DOWN",
+                "port_id": port["id"] if port else None,
+                "fixed_ip_address": port["fixed_ips"][0]["ip_address"] if port else None,
+            })
+
+    def _server_doc(self, server_id, name, image_ids, flavor_ids, status, updated=None, metadata=None):
+        return {
+            "id": server_id, "name": name, "status": status, "updated": updated or _now_iso(),
+            "image": {"id": image_ids[0] if image_ids else None},
+            "flavor": {"id": flavor_ids[0] if flavor_ids else None},
+            "addresses": {}, "metadata": dict(metadata or {}),
+        }
+
+    def _add_port(self, subnet, device_id, device_owner, status="ACTIVE"):
+        return self._add("ports", {
+            "id": self._uuid(), "name": "", "network_id": subnet["network_id"], "status": status,
+            "device_id": device_id, "device_owner": device_owner,
+            "fixed_ips": [{"subnet_id": subnet["id"], "ip_address": self._allocate_ip(subnet)}],
+        })
+
+    # -- state ---------------------------------------------------------------
+
+    def advance(self):
+        """Move servers whose boot time has passed (and their ports) to ACTIVE."""
+        now = time.monotonic()
+        with self._lock:
+            for server_id, ready_at in list(self._ready_at.items()):
+                if ready_at > now:
+                    continue
+                del self._ready_at[server_id]
+                server = self.collections["servers"].get(server_id)
+                if server:
+                    server.update(status="ACTIVE", updated=_now_iso())
+                    self.versions["servers"] += 1
+                for port in self.collections["ports"].values():
+                    if port["device_id"] == server_id:
+                        port["status"] = "ACTIVE"
+                        self.versions["ports"] += 1
+
+    @staticmethod
+    def _matches(resource_name, item, key, values):
+        # Nova treats the server name filter as a regular expression; Neutron matches exactly.
+        if resource_name == "servers" and key == "name":
+            return any(re.search(pattern, item.get("name") or "") for pattern in values)
+        return _filter_value(item.get(key)) in values
+
+    def list(self, resource_name, params):
+        """Return (items, next marker or None) honouring filters, changes-since and limit/marker."""
+        with self._lock:
+            items = list(self.collections[resource_name].values())
+        filters = {key: values for key, values in params.items() if key not in _RESERVED_PARAMS}
+        if filters:
+            items = [
+                item for item in items
+                if all(self._matches(resource_name, item, key, values) for key, values in filters.items())
+            ]
+        if "changes-since" in params:
+            since = params["changes-since"][0]
+            items = [item for item in items if item.get("updated", "") >= since]
+
+        marker = params.get("marker", [None])[0]
+        if marker:
+            keys = [item.get("id") or item.get("keypair", {}).get("name") for item in items]
+            items = items[keys.index(marker) + 1:] if marker in keys else []
+        limit = int(params.get("limit", [0])[0] or 0)
+        next_marker = None
+        if limit and len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_marker = last.get("id") or last.get("keypair", {}).get("name")
+
+        fields = params.get("fields")
+        if fields:
+            items = [{key: item[key] for key in fields if key in item} for item in items]
+        return items, next_marker
+
+    def create_server(self, body):
+        server_body = body.get("server", {})
+        networks = server_body.get("networks") or []
+        with self._lock:
+            server = self._add("servers", self._server_doc(
+                self._uuid(), server_body.get("name", ""), [server_body.get("imageRef")],
+                [server_body.get("flavorRef")], status="BUILD", metadata=server_body.get("metadata"),
+            ))
+            for network in networks:
+                subnet = next(
+                    (s for s in self.collections["subnets"].values() if s["network_id"] == network.get("uuid")), None
+                )
+                if subnet:
+                    self._add_port(subnet, server["id"], "compute:nova", status="DOWN")
+            self._ready_at[server["id"]] = time.monotonic() + self.boot_seconds
+        return {"id": server["id"], "links": [], "adminPass": "mock"}
+
+    def rename_server(self, server_id, name):
+        with self._lock:
+            server = self.collections["servers"].get(server_id)
+            if server is None:
+                return None
+            server.update(name=name, updated=_now_iso())
+            self.versions["servers"] += 1
+            return dict(server)
+
+    def delete_server_metadata(self, server_id, key):
+        with self._lock:
+            server = self.collections["servers"].get(server_id)
+            if server is None or key not in server["metadata"]:
+                return False
+            del server["metadata"][key]
+            server["updated"] = _now_iso()
+            self.versions["servers"] += 1
+            return True
+
+    def create(self, resource_name, doc):
+        with self._lock:
+            doc = dict(doc, id=self._uuid())
+            doc.setdefault("status", "ACTIVE")
+            if resource_name == "networks":
+                doc.setdefault("subnets", [])
+            elif resource_name == "subnets":
+                network = self.collections["networks"].get(doc.get("network_id"))
+                if network is None:
+                    return None
+                network["subnets"].append(doc["id"])
+                self.versions["networks"] += 1
+            return self._add(resource_name, doc)
+
+    def add_router_interface(self, router_id, subnet_id):
+        with self._lock:
+            subnet = self.collections["subnets"].get(subnet_id)
+            if router_id not in self.collections["routers"] or subnet is None:
+                return None
+            port = self._add_port(subnet, router_id, "network:router_interface")
+        return {"id": router_id, "subnet_id": subnet_id, "port_id": port["id"], "subnet_ids": [subnet_id]}
+
+    def allocate_floating_ip(self, doc):
+        with self._lock:
+            if doc.get("floating_network_id") != EXTERNAL_NETWORK_ID:
+                return None
+            index = len(self.collections["floating_ips"])
+            return self._add("floating_ips", {
+                "id": self._uuid(), "floating_ip_address": f"172.17.{index // 256 % 256}.{index % 256}",
+                "floating_network_id": EXTERNAL_NETWORK_ID, "status": "DOWN", "port_id": None,
+                "fixed_ip_address": None,
+            })
+
+    def update_floating_ip(self, floating_ip_id, changes):
+        with self._lock:
+            floating_ip = self.collections["floating_ips"].get(floating_ip_id)
+            if floating_ip is None:
+                return None
+            port = self.collections["ports"].get(changes.get("port_id")) if changes.get("port_id") else None
+            floating_ip.update(
+                port_id=port["id"] if port else None,
+                fixed_ip_address=port["fixed_ips"][0]["ip_address"] if port else None,
+                status="ACTIVE" if port else "DOWN",
+            )
+            self.versions["floating_ips"] += 1
+            return floating_ip
+
+
+class MockOpenStackHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, small (e.g. gzipped)
+    # responses stall on Nagle + delayed ACK for ~40 ms each.
+    disable_nagle_algorithm = True
+    # Set on the server: cloud, latency, jitter, error_rate, error_status, compress, chunked, ignore_paging.
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # -- plumbing ------------------------------------------------------------
+
+    def _send_json(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        if payload:
+            self.send_header("Content-Type", "application/json")
+        if self.server.compress and len(payload) >= 1024 and "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(payload, 5)
+            self.send_header("Content-Encoding", "gzip")
+        if self.server.chunked and payload:
+            # One chunk plus the terminator; clients only see that the length is not announced.
+            self.send_header("Transfer-Encoding", "chunked")
+            payload = b"%x\r\n%s\r\n0\r\n\r\n" % (len(payload), payload)
+        else:
+            self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (deadline or cancellation); nothing left to do.
+            pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            return {}
+
+    def _simulate_network(self):
+        server = self.server
+        delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send_json(server.error_status, {"error": {"message": "Injected failure", "code": server.error_status}})
+            return False
+        return True
+
+    def _authorized(self):
+        if self.headers.get("X-Auth-Token") in self.server.tokens:
+            return True
+        self._send_json(401, {"error": {"message": "The request you have made requires authentication.", "code": 401}})
+        return False
+
+    def _dispatch(self, method):
+        # Drain the body first so keep-alive connections stay in sync even on errors.
+        body = self._read_json() if method in ("POST", "PUT") else {}
+        if not self._simulate_network():
+            return
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/")
+        params = parse_qs(parts.query)
+        self.server.cloud.advance()
+
+        if path == f"{IDENTITY_PREFIX}/auth/tokens" and method == "POST":
+            return self._issue_token(body)
+        if not self._authorized():
+            return
+        if path.startswith(COMPUTE_PREFIX + "/"):
+            return self._compute(method, path[len(COMPUTE_PREFIX) + 1:], params, body)
+        if path.startswith(NETWORK_PREFIX + "/"):
+            return self._network(method, path[len(NETWORK_PREFIX) + 1:], params, body)
+        self._send_json(404, {"error": {"message": f"No route for {path}"}})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    # -- identity ------------------------------------------------------------
+
+    def _issue_token(self, body):
+        if not body.get("auth", {}).get("identity"):
+            return self._send_json(400, {"error": {"message": "Missing identity", "code": 400}})
+        token = uuid.uuid4().hex
+        self.server.tokens.add(token)
+        self._send_json(
+            201,
+            {"token": {"expires_at": _now_iso(self.server.token_ttl), "methods": ["password"]}},
+            headers={"X-Subject-Token": token},
+        )
+
+    # -- compute / network ---------------------------------------------------
+
+    def _list(self, path, resource_name, collection_key, params, prefix):
+        cloud = self.server.cloud
+        etag = f'"{resource_name}-{cloud.versions[resource_name]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send_json(304, headers={"ETag": etag})
+        if self.server.ignore_paging:
+            # Like services without pagination support: every request gets the whole collection.
+            params = {key: values for key, values in params.items() if key not in ("limit", "marker")}
+        items, next_marker = cloud.list(resource_name, params)
+        body = {collection_key: items}
+        if next_marker:
+            next_params = {key: values for key, values in params.items() if key != "marker"}
+            next_params["marker"] = [next_marker]
+            host = self.headers.get("Host", f"127.0.0.1:{self.server.server_port}")
+            href = f"http://{host}{prefix}/{path}?{urlencode(next_params, doseq=True)}"
+            body[f"{collection_key}_links"] = [{"rel": "next", "href": href}]
+        self._send_json(200, body, headers={"ETag": etag})
+
+    def _compute(self, method, path, params, body):
+        cloud = self.server.cloud
+        if method == "GET" and path == "servers":
+            # Nova's summary listing only carries id and name.
+            return self._list(path, "servers", "servers", {**params, "fields": ["id", "name"]}, COMPUTE_PREFIX)
+        if method == "GET" and path in COMPUTE_COLLECTIONS:
+            return self._list(path, *COMPUTE_COLLECTIONS[path], params, COMPUTE_PREFIX)
+        if method == "POST" and path == "servers":
+            return self._send_json(202, {"server": cloud.create_server(body)})
+        if method == "GET" and path.startswith("servers/"):
+            server = cloud.collections["servers"].get(path.split("/", 1)[1])
+            if server is None:
+                return self._send_json(404, {"itemNotFound": {"message": "Instance could not be found", "code": 404}})
+            return self._send_json(200, {"server": server})
+        segments = path.split("/")
+        if method == "DELETE" and len(segments) == 4 and segments[0] == "servers" and segments[2] == "metadata":
+            if not cloud.delete_server_metadata(segments[1], segments[3]):
+                return self._send_json(404, {"itemNotFound": {"message": "Metadata item was not found", "code": 404}})
+            return self._send_json(204)
+        if method == "PUT" and path.startswith("servers/"):
+            server = cloud.rename_server(path.split("/", 1)[1], body.get("server", {}).get("name"))
+            if server is None:
+                return self._send_json(404, {"itemNotFound": {"message": "Instance could not be found", "code": 404}})
+            return self._send_json(200, {"server": server})
+        self._send_json(404, {"error": {"message": f"No compute route for {method} {path}"}})
+
+    def _network(self, method, path, params, body):
+        cloud = self.server.cloud
+        if method == "GET" and path in NETWORK_COLLECTIONS:
+            return self._list(path, *NETWORK_COLLECTIONS[path], params, NETWORK_PREFIX)
+        if method == "POST" and path in ("networks", "subnets", "routers"):
+            singular = path[:-1]
+            created = cloud.create(path, body.get(singular, {}))
+            if created is None:
+                return self._send_json(404, {"NeutronError": {"message": f"Invalid {singular} reference"}})
+            return self._send_json(201, {singular: created})
+        if method == "POST" and path == "floatingips":
+            floating_ip = cloud.allocate_floating_ip(body.get("floatingip", {}))
+            if floating_ip is None:
+                return self._send_json(404, {"NeutronError": {"message": "External network not found"}})
+            return self._send_json(201, {"floatingip": floating_ip})
+        segments = path.split("/")
+        if method == "PUT" and len(segments) == 3 and segments[0] == "routers" and segments[2] == "add_router_interface":
+            result = cloud.add_router_interface(segments[1], body.get("subnet_id"))
+            if result is None:
+                return self._send_json(404, {"NeutronError": {"message": "Router or subnet not found"}})
+            return self._send_json(200, result)
+        if method == "PUT" and len(segments) == 2 and segments[0] == "floatingips":
+            floating_ip = cloud.update_floating_ip(segments[1], body.get("floatingip", {}))
+            if floating_ip is None:
+                return self._send_json(404, {"NeutronError": {"message": "Floating IP not found"}})
+            return self._send_json(200, {"floatingip": floating_ip})
+        self._send_json(404, {"error": {"message": f"No network route for {method} {path}"}})
+
+
+def create_server(
+    cloud=None,
+    host="127.0.0.1",
+    port=DEFAULT_PORT,
+    latency=0.0,
+    jitter=0.0,
+    error_rate=0.0,
+    error_status=503,
+    token_ttl=TOKEN_TTL,
+    verbose=False,
+    compress=False,
+    chunked=False,
+    ignore_paging=False,
+):
+    """
+    Build (but do not start) a mock OpenStack HTTP server.
+
+    Args:
+        cloud (MockCloud): State to serve; a default-sized inventory when omitted.
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free port (see ``server.server_port``).
+        latency (float): Seconds added to every response.
+        jitter (float): Extra uniformly random delay of up to this many seconds.
+        error_rate (float): Fraction of requests answered with ``error_status``.
+        error_status (int): Status code used for injected failures.
+        token_ttl (int): Lifetime of issued Keystone tokens in seconds.
+        verbose (bool): Log every request to stderr.
+        compress (bool): Gzip responses of 1 KiB or more for clients that accept it.
+        chunked (bool): Send bodies chunked, without a Content-Length header.
+        ignore_paging (bool): Ignore ``limit``/``marker`` and always send whole collections.
+
+    Returns:
+        ThreadingHTTPServer: Call ``serve_forever()`` (or use ``start_in_thread``).
+    """
+    server = ThreadingHTTPServer((host, port), MockOpenStackHandler)
+    server.daemon_threads = True
+    server.cloud = cloud or MockCloud()
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.error_status = error_status
+    server.token_ttl = token_ttl
+    server.tokens = set()
+    server.verbose = verbose
+    server.compress = compress
+    server.chunked = chunked
+    server.ignore_paging = ignore_paging
+    return server
+
+
+def start_in_thread(server):
+    thread = threading.Thread(target=server.serve_forever, name="mock-openstack", daemon=True)
+    thread.start()
+    return thread
+
+
+def base_urls(server):
+    """Environment overrides that point the app at ``server``."""
+    root = f"http://{server.server_address[0]}:{server.server_port}"
+    return {
+        "OPENSTACK_COMPUTE_URL": f"{root}{COMPUTE_PREFIX}",
+        "OPENSTACK_NETWORK_URL": f"{root}{NETWORK_PREFIX}",
+        "OPENSTACK_IDENTITY_URL": f"{root}{IDENTITY_PREFIX}",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local mock of the Keystone/Nova/Neutron APIs used by the app.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay of up to this many seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail.")
+    parser.add_argument("--error-status", type=int, default=503, help="Status code for injected failures.")
+    parser.add_argument("--networks", type=int, default=20)
+    parser.add_argument("--servers", type=int, default=200)
+    parser.add_argument("--ports", type=int, default=0, help="Total ports (padded with unattached ports).")
+    parser.add_argument("--floating-ips", type=int, default=100)
+    parser.add_argument("--routers", type=int, default=5)
+    parser.add_argument("--boot-seconds", type=float, default=2.0, help="Time for a new server to become ACTIVE.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gzip", action="store_true", help="Gzip large responses when the client accepts it.")
+    parser.add_argument("--chunked", action="store_true", help="Send bodies without a Content-Length.")
+    parser.add_argument("--ignore-paging", action="store_true", help="Ignore limit/marker on list calls.")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+
+    mock_cloud = MockCloud(
+        networks=args.networks, servers=args.servers, ports=args.ports, floating_ips=args.floating_ips,
+        routers=args.routers, boot_seconds=args.boot_seconds, seed=args.seed,
+    )
+    mock_server = create_server(
+        mock_cloud, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, verbose=args.verbose, compress=args.gzip,
+        chunked=args.chunked, ignore_paging=args.ignore_paging,
+    )
+    counts = ", ".join(f"{len(items)} {name}" for name, items in mock_cloud.collections.items())
+    print(f"Mock OpenStack listening on http://{args.host}:{mock_server.server_port} ({counts})")
+    for name, value in base_urls(mock_server).items():
+        print(f"  {name}={value}")
+    try:
+        mock_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
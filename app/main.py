@@ -1,18 +1,27 @@
 import customtkinter
 import sys
 import threading
-from .ui.logging import TextboxStream as UiTextboxStream, configure_log_widget
+from .ui.logging import LogSink, TextboxStream as UiTextboxStream, configure_log_widget
 from .ui.log_panel import LogPanel
 from .controllers import AppBehaviorMixin
+from .services.inventory_daemon import get_daemon_client
+from .services.refresh_scheduler import AUTO_REFRESH, RefreshScheduler
+from .services.floating_ip_pool import get_floating_ip_pool
+from .services.instance_pool import get_instance_pool
+from .services.metrics import start_metrics_server
+from .utils.inventory import get_inventory
 
 
 class App(AppBehaviorMixin, customtkinter.CTk):
     def __init__(self):
         super().__init__()
 
-        self.data = {}
+        self.inventory = get_inventory()
         self._floating_ip_map = {}
         self.no_floating_ip_option = "No floating IP (skip)"
+        self.pool_floating_ip_option = "Any free floating IP (pool)"
+        self.floating_ip_pool = get_floating_ip_pool()
+        self.instance_pool = get_instance_pool()
         self.poll_log_path = "poll_refresh.log"
         self.title("Main Application")
         self.geometry("1280x880")
@@ -28,24 +37,45 @@ class App(AppBehaviorMixin, customtkinter.CTk):
         self.controls_frame.grid_rowconfigure(1, weight=1)
 
         self._refresh_in_progress = False
+        self._background_refresh_lock = threading.Lock()
 
         # Right-side log panel
-        self.log_panel = LogPanel(self, self.on_refresh_click, self.on_log_clear_click, self.on_log_save_click)
+        self.log_panel = LogPanel(
+            self, self.on_refresh_click, self.on_log_clear_click, self.on_log_save_click,
+            on_filter=self.on_log_filter,
+        )
         self.log_textbox = self.log_panel.textbox  # shim for existing logic
 
         # configure log tags (colors) via shared UI helper
         configure_log_widget(self.log_textbox)
 
-        sys.stdout = UiTextboxStream(self)
-        sys.stderr = UiTextboxStream(self)
+        self.log_sink = LogSink(self, self.log_textbox)
+        self.log_sink.start()
+        sys.stdout = UiTextboxStream(self.log_sink)
+        sys.stderr = UiTextboxStream(self.log_sink)
 
         # Left-side panels
         self._build_network_frame()
         self._build_instance_frame()
 
+        start_metrics_server()
+        self._update_metrics_summary()
+
+        # The daemon keeps its own schedule; otherwise refresh per resource in the background.
+        self.refresh_scheduler = None
+        if AUTO_REFRESH and not get_daemon_client():
+            self.refresh_scheduler = RefreshScheduler(
+                on_change=self._on_scheduled_refresh,
+                lock=self._background_refresh_lock,
+                log_file=self.poll_log_path,
+            )
+
         self.data_loading_thread = threading.Thread(target=self._load_data_and_update_ui, daemon=True)
         self.data_loading_thread.start()
 
+        if get_daemon_client():
+            threading.Thread(target=self._watch_inventory_daemon, daemon=True).start()
+
     # All behavior methods are inherited from AppBehaviorMixin
 
 if __name__ == "__main__":
@@ -0,0 +1,337 @@
+import asyncio
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+
+from . import circuit, events
+from .create_instance import build_instance_payload
+from .errors import (
+    AuthenticationError,
+    DeadlineExceededError,
+    OpenStackError,
+    ServiceUnavailableError,
+    TransportError,
+    error_for_status,
+)
+from .http_client import (
+    COMPUTE_BASE_URL,
+    CONNECT_TIMEOUT,
+    IDEMPOTENT_METHODS,
+    MAX_RETRIES,
+    NETWORK_BASE_URL,
+    NON_IDEMPOTENT_RETRY_STATUSES,
+    POOL_MAXSIZE,
+    READ_TIMEOUT,
+    RETRY_STATUSES,
+    _backoff_delay,
+)
+from .metrics import metrics
+from .router_fip import EXTERNAL_NETWORK_ID, build_router_payload
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency: only needed for the async API
+    aiohttp = None
+
+load_dotenv()
+
+# Upper bound on requests in flight from one client, across all hosts.
+ASYNC_CONCURRENCY = int(os.getenv("OPENSTACK_ASYNC_CONCURRENCY", "100"))
+
+
+class AsyncOpenStack:
+    """
+    Asyncio counterpart of the blocking service helpers.
+
+    One ``aiohttp`` session (and so one keep-alive pool per host) is shared by
+    every call made through the client. Calls use the same retry and
+    re-authentication rules and per-service circuit breakers as
+    ``http_client.request``. Each call accepts a
+    ``deadline`` in seconds covering all of its attempts. Failures raise the
+    typed errors from ``app.services.errors`` instead of returning None, and
+    cancelling the awaiting task aborts the request.
+
+    Usage::
+
+        async with AsyncOpenStack() as cloud:
+            network_id = await cloud.create_network("lab-net", deadline=30)
+    """
+
+    def __init__(self, token=None, max_concurrency=ASYNC_CONCURRENCY, pool_size=POOL_MAXSIZE, deadline=None):
+        if aiohttp is None:
+            raise ImportError("The async API requires aiohttp (pip install aiohttp).")
+        self._token = token
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.default_deadline = deadline
+        self._session = None
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._token_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.pool_size)
+            timeout = aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # -- transport -----------------------------------------------------------
+
+    async def _get_token(self, rejected=None):
+        from .auth import token_manager
+
+        async with self._token_lock:
+            if rejected is not None:
+                if self._token == rejected:
+                    # Keystone calls stay blocking; keep them off the event loop.
+                    self._token = await asyncio.to_thread(token_manager.handle_unauthorized, rejected)
+            elif self._token is None:
+                self._token = await asyncio.to_thread(token_manager.get_token)
+            return self._token
+
+    async def request(self, method, url, json_body=None, params=None, expected=(200,), deadline=None):
+        """
+        Send one API call and return its decoded JSON body ({} when empty).
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute endpoint URL.
+            json_body (dict, optional): Payload serialized as JSON.
+            params (dict | list, optional): Query string parameters.
+            expected (tuple): Status codes that count as success.
+            deadline (float, optional): Seconds for the whole call, retries included.
+
+        Raises:
+            DeadlineExceededError: The deadline passed first.
+            TransportError: No response after all retries.
+            ServiceUnavailableError: The service's circuit is open (failing fast).
+            OpenStackError: A subclass matching the unexpected HTTP status.
+        """
+        deadline = self.default_deadline if deadline is None else deadline
+        breaker = circuit.breaker_for(url)
+        if breaker is None:
+            return await self._call(method, url, json_body, params, expected, deadline)
+        try:
+            breaker.before_call()
+        except circuit.CircuitOpenError as exc:
+            raise ServiceUnavailableError(str(exc), method, url) from None
+        failure = None
+        try:
+            body = await self._call(method, url, json_body, params, expected, deadline)
+            failure = ""
+            return body
+        except (TransportError, DeadlineExceededError) as exc:
+            failure = exc.__class__.__name__
+            raise
+        except OpenStackError as exc:
+            # 4xx answers come from a healthy service.
+            failure = f"HTTP {exc.status_code}" if (exc.status_code or 500) >= 500 else ""
+            raise
+        finally:
+            if failure is None:
+                breaker.release()
+            elif failure:
+                breaker.record_failure(failure)
+            else:
+                breaker.record_success()
+
+    async def _call(self, method, url, json_body, params, expected, deadline):
+        call = self._request(method.upper(), url, json_body, params, expected)
+        if deadline is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, timeout=deadline)
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError(
+                f"{method} {url} did not complete within {deadline:g}s", method, url
+            ) from None
+
+    async def _request(self, method, url, json_body, params, expected):
+        await self.open()
+        data = json.dumps(json_body) if json_body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        retry_statuses = RETRY_STATUSES if method in IDEMPOTENT_METHODS else NON_IDEMPOTENT_RETRY_STATUSES
+        token = await self._get_token()
+        reauthenticated = False
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                async with self._semaphore:
+                    async with self._session.request(
+                        method, url, data=data, params=params, headers={**headers, "X-Auth-Token": token}
+                    ) as response:
+                        body = await response.read()
+                        status = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                metrics.observe(method, url, exc.__class__.__name__, time.monotonic() - started, len(data or ""))
+                # A POST is only replayed when the connection was never established.
+                retryable = method in IDEMPOTENT_METHODS or isinstance(exc, aiohttp.ClientConnectorError)
+                if attempt >= MAX_RETRIES or not retryable:
+                    raise TransportError(f"{method} {url} failed: {exc!r}", method, url) from exc
+                delay = _backoff_delay(attempt)
+                print(f"[http] Warning: {method} {url} failed ({exc.__class__.__name__}); retrying in {delay:.2f}s.")
+            else:
+                metrics.observe(method, url, status, time.monotonic() - started, len(data or ""), len(body))
+                if status in expected:
+                    return json.loads(body) if body else {}
+                text = body.decode("utf-8", errors="replace")
+                if status == 401 and not reauthenticated:
+                    reauthenticated = True
+                    renewed = await self._get_token(rejected=token)
+                    if renewed and renewed != token:
+                        print(f"[http] {method} {url} returned 401; retrying with a renewed token.")
+                        token = renewed
+                        continue
+                    raise AuthenticationError(f"{method} {url} returned 401: {text[:300]}", method, url, 401, text)
+                if status not in retry_statuses or attempt >= MAX_RETRIES:
+                    raise error_for_status(method, url, status, text)
+                delay = _backoff_delay(attempt)
+                print(f"[http] Warning: {method} {url} returned {status}; retrying in {delay:.2f}s.")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _publish(resource_name, item=None):
+        # Inventory listeners may write the snapshot to disk; keep that off the event loop.
+        await asyncio.to_thread(events.publish, resource_name, item)
+
+    # -- operations ------------------------------------------------------------
+
+    async def create_network(self, network_name, deadline=None):
+        """
+        Create a network.
+
+        Returns:
+            str: The ID of the new network.
+        """
+        payload = {"network": {"name": network_name, "admin_state_up": True}}
+        body = await self.request("POST", f"{NETWORK_BASE_URL}/networks", payload, expected=(201,), deadline=deadline)
+        network = body.get("network", {})
+        await self._publish("networks", network)
+        return network.get("id")
+
+    async def create_subnet(self, subnet_name, network_id, cidr, deadline=None):
+        """
+        Create an IPv4 subnet with DHCP enabled.
+
+        Returns:
+            str: The ID of the new subnet.
+        """
+        payload = {
+            "subnet": {
+                "name": subnet_name,
+                "network_id": network_id,
+                "ip_version": 4,
+                "cidr": cidr,
+                "enable_dhcp": True,
+            }
+        }
+        body = await self.request("POST", f"{NETWORK_BASE_URL}/subnets", payload, expected=(201,), deadline=deadline)
+        subnet = body.get("subnet", {})
+        await self._publish("subnets", subnet)
+        return subnet.get("id")
+
+    async def create_router(self, router_name, external_network_id=None, project_id=None, deadline=None):
+        """
+        Create a router with its gateway on the external network.
+
+        Returns:
+            str: The ID of the new router.
+        """
+        payload = build_router_payload(router_name, external_network_id, project_id)
+        body = await self.request("POST", f"{NETWORK_BASE_URL}/routers", payload, expected=(201,), deadline=deadline)
+        router = body.get("router", {})
+        await self._publish("routers", router)
+        return router.get("id")
+
+    async def add_subnet_interface(self, router_id, subnet_id, deadline=None):
+        """
+        Attach a subnet to a router.
+
+        Returns:
+            dict: Neutron's interface description (router, subnet and port IDs).
+        """
+        url = f"{NETWORK_BASE_URL}/routers/{router_id}/add_router_interface"
+        body = await self.request("PUT", url, {"subnet_id": subnet_id}, expected=(200, 201), deadline=deadline)
+        await self._publish("ports")
+        return body
+
+    async def allocate_floating_ip(self, floating_network_id=None, deadline=None):
+        """
+        Allocate an unbound floating IP from the external network.
+
+        Returns:
+            dict: The floating IP document.
+        """
+        payload = {"floatingip": {"floating_network_id": floating_network_id or EXTERNAL_NETWORK_ID}}
+        body = await self.request("POST", f"{NETWORK_BASE_URL}/floatingips", payload, expected=(201,), deadline=deadline)
+        floating_ip = body.get("floatingip", {})
+        await self._publish("floating_ips", floating_ip)
+        return floating_ip
+
+    async def associate_floating_ip(self, floating_ip_id, port_id, deadline=None):
+        """
+        Associate a floating IP with a port.
+
+        Returns:
+            dict: The response body ({"floatingip": {...}}).
+        """
+        url = f"{NETWORK_BASE_URL}/floatingips/{floating_ip_id}"
+        body = await self.request("PUT", url, {"floatingip": {"port_id": port_id}}, deadline=deadline)
+        await self._publish("floating_ips", body.get("floatingip"))
+        return body
+
+    async def get_ports_for_device(self, device_id, fields=None, deadline=None):
+        """
+        Return the ports that belong to a device (instance or router).
+
+        Returns:
+            list[dict]: Neutron port documents (only ``fields`` when given).
+        """
+        params = [("device_id", device_id)] + [("fields", field) for field in fields or ()]
+        body = await self.request("GET", f"{NETWORK_BASE_URL}/ports", params=params, deadline=deadline)
+        return body.get("ports", [])
+
+    async def create_instance(
+        self, instance_name, image_id, flavor_id, network_id, user_data=None, metadata=None, deadline=None
+    ):
+        """
+        Create a server on one network.
+
+        Returns:
+            str: The ID of the new server (still building).
+        """
+        payload = build_instance_payload(
+            instance_name, image_id, flavor_id, network_id, user_data=user_data, metadata=metadata
+        )
+        body = await self.request("POST", f"{COMPUTE_BASE_URL}/servers", payload, expected=(202,), deadline=deadline)
+        server = body.get("server", {})
+        await self._publish("servers", {"id": server.get("id"), "name": instance_name, "status": "BUILD"})
+        return server.get("id")
+
+    async def rename_instance(self, server_id, new_name, deadline=None):
+        """
+        Rename a server.
+
+        Returns:
+            dict: The updated server document.
+        """
+        url = f"{COMPUTE_BASE_URL}/servers/{server_id}"
+        body = await self.request("PUT", url, {"server": {"name": new_name}}, deadline=deadline)
+        server = body.get("server", {})
+        await self._publish("servers", server)
+        return server
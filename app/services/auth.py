@@ -1,14 +1,21 @@
 import os
 import json
 import base64
-import requests
+import threading
+import time
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+from . import http_client
+from .http_client import IDENTITY_BASE_URL
+
 load_dotenv()
 
 CACHE_FILE = "token_cache.json"
-IDENTITY_URL = "https://cloud-identity.uitiot.vn/v3/auth/tokens"
+IDENTITY_URL = f"{IDENTITY_BASE_URL}/auth/tokens"
+# Renew this many seconds before the token expires; retry delay if renewal fails.
+RENEW_BEFORE = 300
+RENEW_RETRY_DELAY = 30
 
 def _decode_password():
     encoded_password = os.getenv("ACCOUNT_PASSWORD_BASE64")
@@ -38,8 +45,7 @@ def _request_new_token():
         }
     }
 
-    headers = {"Content-Type": "application/json"}
-    response = requests.post(IDENTITY_URL, headers=headers, data=json.dumps(payload))
+    response = http_client.post(IDENTITY_URL, json_body=payload, authenticated=False)
 
     if response.status_code != 201:
         raise RuntimeError(f"Authentication failed ({response.status_code}): {response.text}")
@@ -57,7 +63,14 @@ def _request_new_token():
         json.dump(cache, f, indent=2)
 
     os.environ["OPENSTACK_TOKEN"] = token
-    return token
+    return token, expires_at
+
+def _parse_expiry(expires_at_str):
+    """Return the expiry as a UNIX timestamp, or None if it cannot be parsed."""
+    try:
+        return datetime.fromisoformat(expires_at_str.replace("Z", "+00:00")).timestamp()
+    except Exception:
+        return None
 
 def _is_token_valid(expires_at_str):
     try:
@@ -67,20 +80,104 @@ def _is_token_valid(expires_at_str):
     except Exception:
         return False
 
-def get_openstack_token():
+class TokenManager:
     """
-    Lấy token OpenStack, ưu tiên dùng cache nếu còn hạn.
+    Thread-safe, in-memory holder of the Keystone token.
+
+    ``get_token()`` is a memory read while the token is valid. The token is
+    renewed in the background ``RENEW_BEFORE`` seconds ahead of expiry, and
+    concurrent refreshes (expiry, 401s) are collapsed into one Keystone request.
+    ``token_cache.json`` is only read once, at first use, and written on renewal.
     """
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r") as f:
-            cache = json.load(f)
-        if _is_token_valid(cache.get("expires_at", "")):
-            token = cache["token"]
-            os.environ["OPENSTACK_TOKEN"] = token
-            print("[auth] reusing cached token.")
+
+    def __init__(self, renew_before=RENEW_BEFORE):
+        self.renew_before = renew_before
+        self._token = None
+        self._expires_at = None
+        self._cache_checked = False
+        self._refresh_lock = threading.Lock()
+        self._timer = None
+
+    def _is_fresh(self, token, expires_at):
+        return bool(token) and expires_at is not None and expires_at > time.time()
+
+    def get_token(self):
+        token, expires_at = self._token, self._expires_at
+        if self._is_fresh(token, expires_at):
             return token
-        else:
+        return self._refresh(stale_token=token)
+
+    def handle_unauthorized(self, rejected_token):
+        """
+        Hook for 401 responses: renew unless another thread already replaced the
+        rejected token, and return the token to retry with.
+        """
+        return self._refresh(stale_token=rejected_token, force=True)
+
+    def _refresh(self, stale_token=None, force=False):
+        with self._refresh_lock:
+            # Another caller may have renewed the token while we waited for the lock.
+            if self._token != stale_token and self._is_fresh(self._token, self._expires_at):
+                return self._token
+
+            if not self._cache_checked and not force:
+                self._cache_checked = True
+                cached = self._load_cache()
+                if cached:
+                    print("[auth] reusing cached token.")
+                    self._store(*cached)
+                    return self._token
+
+            print("[auth] Requesting new OpenStack token...")
+            self._store(*_request_new_token())
+            return self._token
+
+    def _load_cache(self):
+        if not os.path.exists(CACHE_FILE):
+            return None
+        try:
+            with open(CACHE_FILE, "r") as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not _is_token_valid(cache.get("expires_at", "")):
             print("[auth] Cached token expired, requesting new one...")
+            return None
+        return cache["token"], cache["expires_at"]
+
+    def _store(self, token, expires_at_str):
+        self._expires_at = _parse_expiry(expires_at_str)
+        self._token = token
+        os.environ["OPENSTACK_TOKEN"] = token
+        self._schedule_renewal()
+
+    def _schedule_renewal(self, delay=None):
+        if self._timer is not None:
+            self._timer.cancel()
+        if delay is None:
+            if self._expires_at is None:
+                return
+            remaining = self._expires_at - time.time()
+            # Short-lived tokens are renewed halfway through instead of back to back.
+            delay = max(remaining - self.renew_before, remaining / 2, 0)
+        self._timer = threading.Timer(delay, self._renew_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _renew_in_background(self):
+        try:
+            self._refresh(stale_token=self._token, force=True)
+            print("[auth] Token renewed ahead of expiry.")
+        except Exception as exc:
+            print(f"[auth] Warning: Background token renewal failed ({exc}); retrying in {RENEW_RETRY_DELAY}s.")
+            self._schedule_renewal(delay=RENEW_RETRY_DELAY)
+
 
-    print("[auth] Requesting new OpenStack token...")
-    return _request_new_token()
+token_manager = TokenManager()
+
+
+def get_openstack_token():
+    """
+    Lấy token OpenStack, ưu tiên dùng token trong bộ nhớ hoặc cache nếu còn hạn.
+    """
+    return token_manager.get_token()
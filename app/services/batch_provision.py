@@ -0,0 +1,175 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from .create_instance import create_instance
+from .readiness import BACKOFF_FACTOR, INITIAL_DELAY, MAX_DELAY, READY_TIMEOUT
+from .router_fip import associate_floating_ip, get_ports_for_devices
+
+load_dotenv()
+
+# Upper bound on concurrent Nova create / Neutron association calls in one batch.
+BATCH_CONCURRENCY = int(os.getenv("OPENSTACK_BATCH_CONCURRENCY", "8"))
+
+
+def expand_names(name_pattern, count, start=1):
+    """
+    Build instance names for a batch.
+
+    ``name_pattern`` may contain ``{index}`` (format specs allowed, e.g.
+    ``lab-{index:02d}``); otherwise ``-<index>`` is appended.
+    """
+    if "{index" in name_pattern:
+        return [name_pattern.format(index=index) for index in range(start, start + count)]
+    return [f"{name_pattern}-{index}" for index in range(start, start + count)]
+
+
+def _wait_for_ports(token, results, started, timeout, on_ready=None):
+    """
+    Poll ports for every pending instance with one multi-device query per round.
+
+    ``on_ready(ready)`` is called after each round with the instances whose
+    port turned ACTIVE in it, so their follow-up work does not wait for the rest.
+    """
+    pending = {result["id"]: result for result in results if result["id"]}
+    deadline = started + timeout
+    delay = INITIAL_DELAY
+    while pending:
+        ports_by_device = get_ports_for_devices(token, list(pending), fields=("id", "status"))
+        ready = []
+        for device_id, ports in ports_by_device.items():
+            active = next((port for port in ports if port.get("status") == "ACTIVE" and port.get("id")), None)
+            if active and device_id in pending:
+                result = pending.pop(device_id)
+                result["port_id"] = active["id"]
+                result["ready_s"] = time.monotonic() - started
+                ready.append(result)
+        if ready and on_ready:
+            on_ready(ready)
+
+        remaining = deadline - time.monotonic()
+        if not pending or remaining <= 0:
+            break
+        time.sleep(min(delay, remaining))
+        delay = min(delay * BACKOFF_FACTOR, MAX_DELAY)
+
+    for result in pending.values():
+        result["error"] = f"no ACTIVE port within {timeout:.0f}s"
+
+
+def provision_batch(
+    token,
+    name_pattern,
+    count,
+    image_id,
+    flavor_id,
+    network_id,
+    user_data=None,
+    floating_ip_ids=None,
+    floating_ip_pool=None,
+    max_workers=BATCH_CONCURRENCY,
+    ready_timeout=READY_TIMEOUT,
+):
+    """
+    Create ``count`` instances from one template and bind floating IPs to them.
+
+    Servers are created concurrently (bounded by ``max_workers``), their ports
+    are resolved together with multi-``device_id`` queries, and floating IPs
+    from ``floating_ip_ids`` are associated in parallel as ports become ready:
+    each polling round submits the instances that turned ready in it, while
+    the rest are still being waited on. Once ``floating_ip_ids`` runs out,
+    instances draw an address from ``floating_ip_pool`` (a ``FloatingIPPool``);
+    addresses whose association fails or that end up unused go back to it.
+
+    Returns:
+        list[dict]: One entry per instance with ``name``, ``id``, ``port_id``,
+        ``floating_ip_id``, timings (``create_s``, ``ready_s``, ``associate_s``)
+        and ``error`` (None on success).
+    """
+    names = expand_names(name_pattern, count)
+    results = [
+        {
+            "name": name,
+            "id": None,
+            "port_id": None,
+            "floating_ip_id": None,
+            "create_s": None,
+            "ready_s": None,
+            "associate_s": None,
+            "error": None,
+        }
+        for name in names
+    ]
+    started = time.monotonic()
+    print(f"--> Creating {count} instance(s) with up to {max_workers} concurrent request(s)...")
+
+    def _create(result):
+        call_started = time.monotonic()
+        result["id"] = create_instance(token, result["name"], image_id, flavor_id, network_id, user_data=user_data)
+        result["create_s"] = time.monotonic() - call_started
+        if not result["id"]:
+            result["error"] = "create failed"
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        list(executor.map(_create, results))
+
+        floating_ip_ids = list(floating_ip_ids or [])
+        pooled = {}
+        if floating_ip_ids or floating_ip_pool:
+            associations = []
+            unbound = []
+
+            def _associate(result, floating_ip_id):
+                call_started = time.monotonic()
+                association = associate_floating_ip(token, floating_ip_id, result["port_id"])
+                result["associate_s"] = time.monotonic() - call_started
+                if association:
+                    result["floating_ip_id"] = floating_ip_id
+                else:
+                    result["error"] = f"floating IP {floating_ip_id} association failed"
+                    if floating_ip_pool:
+                        floating_ip_pool.release(pooled.get(floating_ip_id, floating_ip_id))
+
+            def _bind_ready(ready):
+                if floating_ip_pool and len(ready) > len(floating_ip_ids):
+                    for floating_ip in floating_ip_pool.acquire_many(len(ready) - len(floating_ip_ids), token=token):
+                        pooled[floating_ip["id"]] = floating_ip
+                        floating_ip_ids.append(floating_ip["id"])
+                for result in ready:
+                    if floating_ip_ids:
+                        associations.append(executor.submit(_associate, result, floating_ip_ids.pop(0)))
+                    else:
+                        unbound.append(result)
+
+            _wait_for_ports(token, results, started, ready_timeout, on_ready=_bind_ready)
+            for future in associations:
+                future.result()
+            if unbound:
+                print(f"Warning: Only {len(associations)} floating IP(s) for {len(associations) + len(unbound)} ready instance(s).")
+            if floating_ip_pool:
+                for floating_ip_id in floating_ip_ids:
+                    floating_ip_pool.release(pooled.get(floating_ip_id, floating_ip_id))
+
+    _report(results, time.monotonic() - started)
+    return results
+
+
+def _format_seconds(value):
+    return f"{value:.1f}s" if value is not None else "-"
+
+
+def _report(results, elapsed):
+    succeeded = [result for result in results if not result["error"]]
+    print(f"--> Batch finished in {elapsed:.1f}s: {len(succeeded)}/{len(results)} instance(s) succeeded.")
+    for result in results:
+        timings = (
+            f"create {_format_seconds(result['create_s'])}, "
+            f"ready {_format_seconds(result['ready_s'])}, "
+            f"associate {_format_seconds(result['associate_s'])}"
+        )
+        if result["error"]:
+            print(f"Warning: {result['name']} failed ({result['error']}); {timings}.")
+        else:
+            print(f"Info: {result['name']} ({result['id']}) ok; {timings}.")
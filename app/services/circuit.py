@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Consecutive failed calls that open a service's circuit.
+FAILURE_THRESHOLD = int(os.getenv("OPENSTACK_CIRCUIT_FAILURES", "5"))
+# Seconds an open circuit rejects calls before letting one probe through.
+RESET_TIMEOUT = float(os.getenv("OPENSTACK_CIRCUIT_RESET", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling a service whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a service keeps failing.
+
+    After ``failure_threshold`` consecutive failed calls (5xx, transport
+    errors, deadlines) the circuit opens and calls raise ``CircuitOpenError``
+    without touching the network. After ``reset_timeout`` seconds one probe
+    call is let through: success closes the circuit, failure reopens it.
+    State changes are printed with the ``[circuit]`` prefix.
+    """
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Reserve a call, or raise if the circuit rejects it.
+
+        Raises:
+            CircuitOpenError: While open, or while a half-open probe is already running.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            retry_in = max(remaining, 0)
+        raise CircuitOpenError(
+            f"{self.name} circuit is {self.state}; failing fast (next probe in {retry_in:.0f}s)."
+        )
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, reason=""):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self._transition(OPEN, reason)
+
+    def release(self):
+        """Give back a reserved call that ended without a verdict (e.g. it was cancelled)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _transition(self, state, reason=""):
+        previous, self.state = self.state, state
+        detail = f" after {self.failures} failure(s): {reason}" if state == OPEN and reason else ""
+        if state == OPEN:
+            detail += f"; failing fast for {self.reset_timeout:.0f}s"
+        print(f"[circuit] {self.name}: {previous} -> {state}{detail}.")
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def register_service(name, base_url):
+    """Create the breaker guarding calls under ``base_url``."""
+    with _breakers_lock:
+        _breakers[base_url.rstrip("/") + "/"] = CircuitBreaker(name)
+
+
+def breaker_for(url):
+    """Return the breaker for ``url``, or None for hosts outside the registered services."""
+    for base_url, breaker in _breakers.items():
+        if url.startswith(base_url):
+            return breaker
+    return None
+
+
+def states():
+    """Return {service name: state} for every registered breaker."""
+    return {breaker.name: breaker.state for breaker in _breakers.values()}
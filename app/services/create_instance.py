@@ -1,29 +1,18 @@
 import requests
-import json
 import os
 import base64
 
-def create_instance(token, instance_name, image_id, flavor_id, network_id, user_data=None):
-    """
-    Sends an API request to create a new instance (virtual machine) in OpenStack.
+from . import events, http_client
+from .http_client import COMPUTE_BASE_URL
 
-    Args:
-        token (str): The OpenStack authentication token.
-        instance_name (str): The desired name for the new instance.
-        image_id (str): The ID of the image to use for the instance.
-        flavor_id (str): The ID of the flavor to use for the instance.
-        network_id (str): The ID of the network to attach the instance to.
-        user_data (str, optional): Base64-encoded user data script to run on instance boot.
-    Returns:
-        str: The ID of the newly created instance, or None on failure.
+def build_instance_payload(instance_name, image_id, flavor_id, network_id, user_data=None, metadata=None):
     """
-    print(f"--> Attempting to create instance: {instance_name}")
-    instance_endpoint = "https://cloud-compute.uitiot.vn/v2.1/servers"
-    headers = {
-        "X-Auth-Token": token,
-        "Content-Type": "application/json"
-    }
+    Build the Nova create-server body shared by the blocking and async APIs.
 
+    ``user_data`` is base64-encoded here; the key pair comes from
+    ``KEY_PAIR_NAME_BASE64`` when set. ``metadata`` becomes Nova server
+    metadata (string keys and values).
+    """
     # Base payload structure
     payload = {
         "server": {
@@ -39,30 +28,100 @@ def create_instance(token, instance_name, image_id, flavor_id, network_id, user_
         }
     }
 
-    if user_data:
-        encoded_user_data = base64.b64encode(user_data.encode('utf-8')).decode('utf-8') # encode to base64
+    if metadata:
+        payload["server"]["metadata"] = dict(metadata)
 
-        payload["server"]["user_data"] = encoded_user_data
+    if user_data:
+        payload["server"]["user_data"] = base64.b64encode(user_data.encode('utf-8')).decode('utf-8') # encode to base64
 
-        print("--> Added user_data to payload (base64 encoded).")
-    
     # Get key pair name from environment variable if available
     key_name = os.getenv("KEY_PAIR_NAME_BASE64")
     if key_name:
         payload["server"]["key_name"] = base64.b64decode(key_name).decode('utf-8') # decode from base64
+    return payload
+
+def create_instance(token, instance_name, image_id, flavor_id, network_id, user_data=None, metadata=None):
+    """
+    Sends an API request to create a new instance (virtual machine) in OpenStack.
+
+    Args:
+        token (str): The OpenStack authentication token.
+        instance_name (str): The desired name for the new instance.
+        image_id (str): The ID of the image to use for the instance.
+        flavor_id (str): The ID of the flavor to use for the instance.
+        network_id (str): The ID of the network to attach the instance to.
+        user_data (str, optional): Base64-encoded user data script to run on instance boot.
+        metadata (dict, optional): Server metadata, e.g. to tag pooled instances.
+    Returns:
+        str: The ID of the newly created instance, or None on failure.
+    """
+    print(f"--> Attempting to create instance: {instance_name}")
+    instance_endpoint = f"{COMPUTE_BASE_URL}/servers"
+    payload = build_instance_payload(instance_name, image_id, flavor_id, network_id, user_data=user_data, metadata=metadata)
+    if "user_data" in payload["server"]:
+        print("--> Added user_data to payload (base64 encoded).")
+    if "key_name" in payload["server"]:
         print(f"--> Added key_name '{payload['server']['key_name']}' to payload.")
 
     try:
-        response = requests.post(instance_endpoint, headers=headers, data=json.dumps(payload))
+        response = http_client.post(instance_endpoint, token=token, json_body=payload)
         
         if response.status_code == 202:
             print(f"--> Success! Instance '{instance_name}' created.")
-            instance_data = response.json()
-            return instance_data.get("server", {}).get("id")
+            server = response.json().get("server", {})
+            # The create response only carries the ID; record the name so duplicate checks see it.
+            events.publish("servers", {"id": server.get("id"), "name": instance_name, "status": "BUILD"})
+            return server.get("id")
         else:
             print(f"--> Error creating instance. Status: {response.status_code}")
             print(f"--> Response: {response.text}")
             return None
     except requests.exceptions.RequestException as e:
         print(f"--> An exception occurred during the API request: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def rename_instance(token, server_id, new_name):
+    """
+    Rename an existing instance.
+
+    Returns:
+        dict: The updated server document; False if the server no longer
+        exists (404), None on any other failure.
+    """
+    url = f"{COMPUTE_BASE_URL}/servers/{server_id}"
+    payload = {"server": {"name": new_name}}
+    try:
+        response = http_client.put(url, token=token, json_body=payload)
+        if response.status_code == 200:
+            server = response.json().get("server", {})
+            events.publish("servers", server)
+            print(f"--> Renamed instance {server_id} to '{new_name}'.")
+            return server
+        if response.status_code == 404:
+            print(f"--> Instance {server_id} no longer exists; cannot rename it.")
+            return False
+        print(f"--> Error renaming instance {server_id}. Status: {response.status_code}")
+        print(f"--> Response: {response.text}")
+    except requests.exceptions.RequestException as e:
+        print(f"--> An exception occurred while renaming instance {server_id}: {e}")
+    return None
+
+
+def delete_instance_metadata(token, server_id, key):
+    """
+    Remove one metadata item from an instance.
+
+    Returns:
+        bool: True if the item is gone (including when it was not set), False on failure.
+    """
+    url = f"{COMPUTE_BASE_URL}/servers/{server_id}/metadata/{key}"
+    try:
+        response = http_client.delete(url, token=token)
+        if response.status_code in (200, 204, 404):
+            return True
+        print(f"--> Error removing metadata '{key}' from instance {server_id}. Status: {response.status_code}")
+        print(f"--> Response: {response.text}")
+    except requests.exceptions.RequestException as e:
+        print(f"--> An exception occurred while removing metadata from instance {server_id}: {e}")
+    return False
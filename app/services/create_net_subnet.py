@@ -1,5 +1,7 @@
 import requests
-import json
+
+from . import events, http_client
+from .http_client import NETWORK_BASE_URL
 
 def create_network(token, network_name):
     """
@@ -13,11 +15,7 @@ def create_network(token, network_name):
         str: The ID of the newly created network, or None on failure.
     """
     print(f"--> Attempting to create network: {network_name}")
-    network_endpoint = "https://cloud-network.uitiot.vn/v2.0/networks"
-    headers = {
-        "X-Auth-Token": token,
-        "Content-Type": "application/json"
-    }
+    network_endpoint = f"{NETWORK_BASE_URL}/networks"
     payload = {
         "network": {
             "name": network_name,
@@ -26,12 +24,13 @@ def create_network(token, network_name):
     }
 
     try:
-        response = requests.post(network_endpoint, headers=headers, data=json.dumps(payload))
+        response = http_client.post(network_endpoint, token=token, json_body=payload)
         
         if response.status_code == 201:
             print(f"--> Success! Network '{network_name}' created.")
-            network_data = response.json()
-            return network_data.get("network", {}).get("id")
+            network = response.json().get("network", {})
+            events.publish("networks", network)
+            return network.get("id")
         else:
             print(f"--> Error creating network. Status: {response.status_code}")
             print(f"--> Response: {response.text}")
@@ -54,11 +53,7 @@ def create_subnet(token, subnet_name, network_id, cidr):
         str: The ID of the newly created subnet, or None on failure.
     """
     print(f"--> Attempting to create subnet: {subnet_name}")
-    subnet_endpoint = "https://cloud-network.uitiot.vn/v2.0/subnets"
-    headers = {
-        "X-Auth-Token": token,
-        "Content-Type": "application/json"
-    }
+    subnet_endpoint = f"{NETWORK_BASE_URL}/subnets"
     payload = {
         "subnet": {
             "name": subnet_name,
@@ -70,12 +65,13 @@ def create_subnet(token, subnet_name, network_id, cidr):
     }
 
     try:
-        response = requests.post(subnet_endpoint, headers=headers, data=json.dumps(payload))
+        response = http_client.post(subnet_endpoint, token=token, json_body=payload)
         
         if response.status_code == 201:
             print(f"--> Success! Subnet '{subnet_name}' created.")
-            subnet_data = response.json()
-            return subnet_data.get("subnet", {}).get("id")
+            subnet = response.json().get("subnet", {})
+            events.publish("subnets", subnet)
+            return subnet.get("id")
         else:
             print(f"--> Error creating subnet. Status: {response.status_code}")
             print(f"--> Response: {response.text}")
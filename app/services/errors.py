@@ -0,0 +1,75 @@
+class OpenStackError(Exception):
+    """
+    Base class for failed OpenStack API calls raised by the async API.
+
+    Attributes:
+        method (str): HTTP method of the failed call.
+        url (str): Endpoint URL.
+        status_code (int | None): HTTP status, or None when no response arrived.
+        body (str): Response body (may be empty).
+    """
+
+    def __init__(self, message, method=None, url=None, status_code=None, body=""):
+        super().__init__(message)
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        self.body = body
+
+
+class TransportError(OpenStackError):
+    """The request never got a response (connection failure or timeout) after all retries."""
+
+
+class DeadlineExceededError(OpenStackError, TimeoutError):
+    """The call, including retries and re-authentication, did not finish within its deadline."""
+
+
+class BadRequestError(OpenStackError):
+    """400: the service rejected the request body or parameters."""
+
+
+class AuthenticationError(OpenStackError):
+    """401: the token was rejected even after re-authenticating."""
+
+
+class PermissionDeniedError(OpenStackError):
+    """403: the project or user may not perform the call."""
+
+
+class NotFoundError(OpenStackError):
+    """404: a referenced resource does not exist."""
+
+
+class ConflictError(OpenStackError):
+    """409: the request conflicts with the resource's current state (e.g. IP in use)."""
+
+
+class QuotaExceededError(OpenStackError):
+    """413 or a quota message: the project is out of quota."""
+
+
+class ServiceUnavailableError(OpenStackError):
+    """5xx after all retries."""
+
+
+_STATUS_ERRORS = {
+    400: BadRequestError,
+    401: AuthenticationError,
+    403: PermissionDeniedError,
+    404: NotFoundError,
+    409: ConflictError,
+    413: QuotaExceededError,
+}
+
+
+def error_for_status(method, url, status_code, body=""):
+    """Return the typed error for an unexpected HTTP status."""
+    if status_code == 403 and "quota" in (body or "").lower():
+        error_class = QuotaExceededError
+    elif status_code >= 500:
+        error_class = ServiceUnavailableError
+    else:
+        error_class = _STATUS_ERRORS.get(status_code, OpenStackError)
+    snippet = (body or "")[:300]
+    return error_class(f"{method} {url} returned {status_code}: {snippet}", method, url, status_code, body)
@@ -0,0 +1,31 @@
+import threading
+
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def subscribe(listener):
+    """
+    Register ``listener(resource_name, item)`` to be called after a service call
+    changed a resource. ``item`` is the resource as returned by the API, or None
+    when only the resource type is known to be stale.
+    """
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def unsubscribe(listener):
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def publish(resource_name, item=None):
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(resource_name, item)
+        except Exception as exc:
+            print(f"Warning: Resource listener failed for {resource_name}: {exc}")
@@ -0,0 +1,319 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from . import events
+from .router_fip import EXTERNAL_NETWORK_ID, allocate_floating_ip
+
+load_dotenv()
+
+# Unbound floating IPs kept allocated ahead of time; 0 only hands out ones that already exist.
+FIP_POOL_SIZE = int(os.getenv("OPENSTACK_FIP_POOL_SIZE", "0"))
+# Seconds between checks of the pool against Neutron (addresses bound or released elsewhere).
+FIP_POOL_RECHECK = float(os.getenv("OPENSTACK_FIP_POOL_RECHECK", "60"))
+# Pause after a failed allocation (quota, outage) before topping up again.
+ALLOCATION_BACKOFF = 30.0
+# Claims neither bound nor released after this many seconds are dropped at the next re-check.
+CLAIM_TIMEOUT = float(os.getenv("OPENSTACK_FIP_CLAIM_TIMEOUT", "900"))
+# Attributes needed to know whether a floating IP is free.
+POOL_FIELDS = ("id", "floating_ip_address", "floating_network_id", "port_id")
+
+
+class FloatingIPPool:
+    """
+    Hand out unbound floating IPs to concurrent provisioning flows.
+
+    The pool holds the project's unbound floating IPs (seeded from the cached
+    inventory, re-checked against Neutron every ``recheck`` seconds) and, when
+    ``target`` is above zero, a background thread allocates new ones from the
+    external network so at least ``target`` are always ready. Addresses are
+    handed out under a lock and tracked as claimed until Neutron reports them
+    bound, so two flows never get the same address and binding never waits on
+    an allocation unless the pool ran dry. A claim that is neither bound nor
+    released within ``CLAIM_TIMEOUT`` seconds is dropped at the next re-check,
+    so a crashed flow cannot take an address out of the pool for good.
+
+    A re-check lists Neutron without holding the lock; addresses handed out,
+    bound, released or allocated while the listing is in flight keep their
+    current state instead of the listing's, which may already be stale.
+    """
+
+    def __init__(self, target=FIP_POOL_SIZE, network_id=EXTERNAL_NETWORK_ID, recheck=FIP_POOL_RECHECK):
+        self.target = max(0, target)
+        self.network_id = network_id
+        self.recheck = recheck
+        self.allocated = 0
+        self.handed_out = 0
+        self.shortfalls = 0
+        self._free = OrderedDict()
+        # id -> (claimed_at, floating IP dict or None when it was never in the pool)
+        self._claimed = {}
+        # IDs whose state changed since the current re-check started listing (None outside one).
+        self._touched = None
+        self._lock = threading.Lock()
+        self._resync_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        """Seed the pool from the cached inventory and start topping it up."""
+        from ..utils.inventory import get_inventory
+
+        with self._resync_lock:
+            self._begin_listing()
+            self._reset_free(get_inventory().available_floating_ips())
+        events.subscribe(self._on_event)
+        self._thread = threading.Thread(target=self._run, name="fip-pool", daemon=True)
+        self._thread.start()
+        target = f"keeping {self.target} ready" if self.target else "not pre-allocating"
+        print(f"[floating-ip] Pool started with {self.available} unbound address(es); {target}.")
+
+    def stop(self):
+        self._stopped = True
+        events.unsubscribe(self._on_event)
+        self._wakeup.set()
+
+    @property
+    def available(self):
+        with self._lock:
+            return len(self._free)
+
+    def status(self):
+        """Return {"available", "claimed", "target", "allocated", "handed_out", "shortfalls"} for display."""
+        with self._lock:
+            return {
+                "available": len(self._free),
+                "claimed": len(self._claimed),
+                "target": self.target,
+                "allocated": self.allocated,
+                "handed_out": self.handed_out,
+                "shortfalls": self.shortfalls,
+            }
+
+    # -- hand-out ------------------------------------------------------------
+
+    def acquire(self, token=None, allocate=True):
+        """
+        Take one unbound floating IP out of the pool.
+
+        Args:
+            token (str, optional): Keystone token for the fallback allocation.
+            allocate (bool): Allocate one on the spot if the pool is empty.
+
+        Returns:
+            dict: The floating IP (at least ``id`` and ``floating_ip_address``),
+            or None if none is free and none could be allocated.
+        """
+        taken = self.acquire_many(1, token=token, allocate=allocate)
+        return taken[0] if taken else None
+
+    def acquire_many(self, count, token=None, allocate=True):
+        """Take up to ``count`` floating IPs; allocate the shortfall directly when ``allocate`` is set."""
+        with self._lock:
+            taken = []
+            while self._free and len(taken) < count:
+                floating_ip_id, floating_ip = self._free.popitem(last=False)
+                self._claim_locked(floating_ip_id, floating_ip)
+                taken.append(floating_ip)
+            self.handed_out += len(taken)
+            missing = count - len(taken)
+            if missing:
+                self.shortfalls += missing
+        self._wakeup.set()
+
+        if missing and allocate:
+            print(f"[floating-ip] Warning: Pool empty; allocating {missing} floating IP(s) on demand.")
+            token = token or self._token()
+            for _ in range(missing):
+                floating_ip = allocate_floating_ip(token, self.network_id)
+                if not floating_ip:
+                    break
+                with self._lock:
+                    self.allocated += 1
+                    self.handed_out += 1
+                    self._claim_locked(floating_ip.get("id"), floating_ip)
+                taken.append(floating_ip)
+        return taken
+
+    def claim(self, floating_ip_id):
+        """
+        Reserve a specific floating IP (e.g. picked in the GUI).
+
+        Returns:
+            bool: False if another flow already holds it.
+        """
+        with self._lock:
+            if floating_ip_id in self._claimed:
+                return False
+            floating_ip = self._free.pop(floating_ip_id, None)
+            self._claim_locked(floating_ip_id, floating_ip)
+            if floating_ip is not None:
+                self.handed_out += 1
+        self._wakeup.set()
+        return True
+
+    def release(self, floating_ip):
+        """
+        Put a floating IP that ended up unused (e.g. its association failed) back into the pool.
+
+        Accepts the floating IP dict or its id. An id that is no longer claimed
+        (bound meanwhile, or never claimed) is left alone.
+        """
+        if isinstance(floating_ip, dict):
+            floating_ip_id = floating_ip.get("id")
+        else:
+            floating_ip_id, floating_ip = floating_ip, None
+        with self._lock:
+            claim = self._claimed.pop(floating_ip_id, None)
+            if floating_ip is None and claim is not None:
+                floating_ip = claim[1]
+            lookup = floating_ip is None and claim is not None
+        if lookup:
+            floating_ip = self._lookup(floating_ip_id)
+        if not floating_ip or floating_ip.get("port_id") or not self._on_network(floating_ip):
+            return
+        with self._lock:
+            if floating_ip_id in self._claimed:
+                return
+            self._touch_locked(floating_ip_id)
+            self._free[floating_ip_id] = floating_ip
+            self._free.move_to_end(floating_ip_id, last=False)
+
+    # -- bookkeeping ---------------------------------------------------------
+
+    def _touch_locked(self, floating_ip_id):
+        if self._touched is not None:
+            self._touched.add(floating_ip_id)
+
+    def _claim_locked(self, floating_ip_id, floating_ip):
+        self._claimed[floating_ip_id] = (time.monotonic(), floating_ip)
+        self._touch_locked(floating_ip_id)
+
+    def _on_network(self, floating_ip):
+        network_id = floating_ip.get("floating_network_id")
+        return not self.network_id or network_id is None or network_id == self.network_id
+
+    @staticmethod
+    def _lookup(floating_ip_id):
+        from ..utils.inventory import get_inventory
+
+        return get_inventory().get("floating_ips", floating_ip_id)
+
+    def _on_event(self, resource_name, item=None):
+        if resource_name != "floating_ips" or not item or not item.get("id"):
+            return
+        with self._lock:
+            if item.get("port_id"):
+                # Bound: the claim is fulfilled, and it is no longer free for anyone.
+                self._claimed.pop(item["id"], None)
+                self._free.pop(item["id"], None)
+                self._touch_locked(item["id"])
+
+    def _begin_listing(self):
+        """Start recording changes that a listing fetched from now on will not reflect."""
+        with self._lock:
+            self._touched = set()
+
+    def _reset_free(self, floating_ips):
+        """Rebuild the free list from a listing taken after ``_begin_listing()``."""
+        with self._lock:
+            touched, self._touched = self._touched or set(), None
+            free = OrderedDict(
+                (floating_ip["id"], floating_ip) for floating_ip in floating_ips
+                if floating_ip.get("id") and not floating_ip.get("port_id") and self._on_network(floating_ip)
+                and floating_ip["id"] not in self._claimed and floating_ip["id"] not in touched
+            )
+            # Addresses released or allocated while the listing was in flight stay free.
+            for floating_ip_id in touched:
+                if floating_ip_id in self._free:
+                    free[floating_ip_id] = self._free[floating_ip_id]
+            self._free = free
+
+    @staticmethod
+    def _token():
+        from .auth import get_openstack_token
+
+        return get_openstack_token()
+
+    def _expire_claims(self):
+        cutoff = time.monotonic() - CLAIM_TIMEOUT
+        with self._lock:
+            expired = [floating_ip_id for floating_ip_id, (claimed_at, _) in self._claimed.items() if claimed_at < cutoff]
+            for floating_ip_id in expired:
+                del self._claimed[floating_ip_id]
+        if expired:
+            print(f"[floating-ip] Warning: Dropped {len(expired)} claim(s) unused for {CLAIM_TIMEOUT:.0f}s.")
+
+    def _resync(self):
+        """Replace the free list with Neutron's current unbound floating IPs."""
+        from . import query
+
+        self._expire_claims()
+        with self._resync_lock:
+            self._begin_listing()
+            try:
+                # Neutron has no portable "unbound" filter; the projection keeps the listing small.
+                filters = {"floating_network_id": self.network_id} if self.network_id else None
+                floating_ips = query.list_resources("floating_ips", filters=filters, fields=POOL_FIELDS)
+            except BaseException:
+                with self._lock:
+                    self._touched = None
+                raise
+            self._reset_free(floating_ips)
+
+    def _run(self):
+        next_resync = time.monotonic() + self.recheck
+        while not self._stopped:
+            wait = max(0.0, next_resync - time.monotonic())
+            if self.available >= self.target:
+                self._wakeup.wait(timeout=wait)
+                self._wakeup.clear()
+            if self._stopped:
+                return
+            try:
+                if time.monotonic() >= next_resync:
+                    next_resync = time.monotonic() + self.recheck
+                    self._resync()
+                if not self._top_up():
+                    self._wakeup.wait(timeout=ALLOCATION_BACKOFF)
+                    self._wakeup.clear()
+            except Exception as exc:
+                print(f"[floating-ip] Warning: Pool maintenance failed ({exc}); retrying in {ALLOCATION_BACKOFF:.0f}s.")
+                self._wakeup.wait(timeout=ALLOCATION_BACKOFF)
+                self._wakeup.clear()
+
+    def _top_up(self):
+        """Allocate until ``target`` addresses are free; return False if an allocation failed."""
+        missing = self.target - self.available
+        if missing <= 0:
+            return True
+        token = self._token()
+        for _ in range(missing):
+            floating_ip = allocate_floating_ip(token, self.network_id)
+            if not floating_ip:
+                print(f"[floating-ip] Warning: Pool top-up failed; {self.available}/{self.target} ready.")
+                return False
+            with self._lock:
+                self.allocated += 1
+                self._free[floating_ip["id"]] = floating_ip
+                self._touch_locked(floating_ip["id"])
+        print(f"[floating-ip] Pool topped up to {self.available}/{self.target} ready.")
+        return True
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_floating_ip_pool():
+    """Return the process-wide floating IP pool (not started)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = FloatingIPPool()
+    return _pool
@@ -0,0 +1,302 @@
+import os
+import json
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from dotenv import load_dotenv
+
+from . import circuit
+from .metrics import metrics
+
+load_dotenv()
+
+# Override these to point the app at another cloud or at app.devtools.mock_openstack.
+COMPUTE_BASE_URL = os.getenv("OPENSTACK_COMPUTE_URL", "https://cloud-compute.uitiot.vn/v2.1").rstrip("/")
+NETWORK_BASE_URL = os.getenv("OPENSTACK_NETWORK_URL", "https://cloud-network.uitiot.vn/v2.0").rstrip("/")
+IDENTITY_BASE_URL = os.getenv("OPENSTACK_IDENTITY_URL", "https://cloud-identity.uitiot.vn/v3").rstrip("/")
+
+CONNECT_TIMEOUT = float(os.getenv("OPENSTACK_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("OPENSTACK_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("OPENSTACK_MAX_RETRIES", "3"))
+# Wall-clock budget for one call: every attempt, backoff sleep and body read. 0 disables it.
+REQUEST_DEADLINE = float(os.getenv("OPENSTACK_REQUEST_DEADLINE", "60"))
+POOL_MAXSIZE = int(os.getenv("OPENSTACK_POOL_MAXSIZE", "20"))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+metrics.register_service("compute", COMPUTE_BASE_URL)
+metrics.register_service("network", NETWORK_BASE_URL)
+metrics.register_service("identity", IDENTITY_BASE_URL)
+circuit.register_service("compute", COMPUTE_BASE_URL)
+circuit.register_service("network", NETWORK_BASE_URL)
+circuit.register_service("identity", IDENTITY_BASE_URL)
+
+RETRY_STATUSES = {500, 502, 503, 504}
+# A POST that hit a 500/504 may already have created the resource, so only replay
+# statuses that mean the request was rejected before reaching the service.
+NON_IDEMPOTENT_RETRY_STATUSES = {502, 503}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+class DeadlineExceeded(requests.Timeout):
+    """The call, including retries and backoff, did not finish within its deadline."""
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the process-wide session shared by every service module.
+
+    urllib3 keeps one keep-alive pool per host, so compute, network and identity
+    each reuse their TCP+TLS connections across calls and threads.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # Large list responses shrink several-fold when the endpoint honours gzip.
+                session.headers["Accept-Encoding"] = "gzip, deflate"
+                # Retries are handled in request() so they can be jittered and logged.
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _backoff_delay(attempt):
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _is_retryable_exception(method, exc):
+    if method in IDEMPOTENT_METHODS:
+        return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+    # Non-idempotent calls (POST) are only replayed when the request never reached the server.
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def _body_size(response, streamed):
+    # A streamed body has not been read yet; its reader reports it (see record_streamed_body).
+    if streamed:
+        return 0
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit():
+        return int(length)
+    return len(response.content or b"")
+
+
+def _received_bytes(response, decoded_bytes):
+    """Body bytes as received (before gzip decoding, like Content-Length), else ``decoded_bytes``."""
+    try:
+        # urllib3 does not track chunked bodies and reports 0 for them.
+        return int(response.raw.tell()) or decoded_bytes
+    except (AttributeError, TypeError, ValueError):
+        return decoded_bytes
+
+
+def _read_body(response, expires, method, url):
+    """Read a streamed body, giving up once the call's deadline has passed; return its size."""
+    chunks = []
+    for chunk in response.iter_content(BODY_CHUNK_SIZE):
+        chunks.append(chunk)
+        if time.monotonic() > expires:
+            response.close()
+            raise DeadlineExceeded(f"{method} {url}: response body still arriving at the deadline.")
+    # Hand the buffered body back to requests so .content / .json() work as usual.
+    response._content = b"".join(chunks)
+    return _received_bytes(response, len(response._content))
+
+
+def record_streamed_body(response, decoded_bytes):
+    """
+    Count the body of a ``stream=True`` response once its reader is done with it.
+
+    ``request()`` records such responses when their headers arrive, before the
+    body is read, so the reader reports the body size here.
+
+    Args:
+        response (requests.Response): The streamed response.
+        decoded_bytes (int): Bytes the reader consumed, used when the
+            transport cannot tell how many arrived over the wire.
+    """
+    metrics.add_response_bytes(response.request.method, response.url, _received_bytes(response, decoded_bytes))
+
+
+def request(
+    method,
+    url,
+    token=None,
+    json_body=None,
+    params=None,
+    headers=None,
+    timeout=None,
+    retries=None,
+    authenticated=True,
+    deadline=None,
+    **kwargs,
+):
+    """
+    Send a request through the shared session with timeouts, retries and a deadline.
+
+    Calls to compute, network and identity go through that service's circuit
+    breaker: while it is open they fail fast with ``circuit.CircuitOpenError``
+    instead of waiting on an unhealthy endpoint.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Absolute endpoint URL.
+        token (str, optional): Keystone token; fetched via auth when omitted.
+        json_body (dict, optional): Payload serialized as JSON.
+        params (dict, optional): Query string parameters.
+        headers (dict, optional): Extra headers merged over the defaults.
+        timeout (tuple, optional): (connect, read) timeout in seconds for each attempt.
+        retries (int, optional): Retry budget for 5xx and connection errors.
+        authenticated (bool): Whether to inject the X-Auth-Token header.
+        deadline (float, optional): Seconds for the whole call; defaults to REQUEST_DEADLINE.
+
+    Returns:
+        requests.Response: The final response (possibly a 5xx after retries).
+
+    Raises:
+        requests.RequestException: When every attempt failed at the transport level,
+            the deadline passed (``DeadlineExceeded``) or the circuit is open.
+    """
+    method = method.upper()
+    merged_headers = {}
+    if authenticated:
+        if token is None:
+            from .auth import get_openstack_token
+
+            token = get_openstack_token()
+        merged_headers["X-Auth-Token"] = token
+    if json_body is not None:
+        merged_headers["Content-Type"] = "application/json"
+        kwargs["data"] = json.dumps(json_body)
+    if headers:
+        merged_headers.update(headers)
+
+    deadline = REQUEST_DEADLINE if deadline is None else deadline
+    expires = time.monotonic() + deadline if deadline > 0 else None
+    breaker = circuit.breaker_for(url)
+    if breaker is None:
+        return _send(method, url, merged_headers, params, timeout, retries, authenticated, expires, kwargs)
+
+    breaker.before_call()
+    failure = None
+    try:
+        response = _send(method, url, merged_headers, params, timeout, retries, authenticated, expires, kwargs)
+        failure = f"HTTP {response.status_code}" if response.status_code >= 500 else ""
+        return response
+    except requests.RequestException as exc:
+        failure = exc.__class__.__name__
+        raise
+    finally:
+        if failure is None:
+            breaker.release()
+        elif failure:
+            breaker.record_failure(failure)
+        else:
+            breaker.record_success()
+
+
+def _send(method, url, headers, params, timeout, retries, authenticated, expires, kwargs):
+    connect_timeout, read_timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    retries = MAX_RETRIES if retries is None else retries
+    retry_statuses = RETRY_STATUSES if method in IDEMPOTENT_METHODS else NON_IDEMPOTENT_RETRY_STATUSES
+    session = get_session()
+    # With a deadline the body is streamed so a trickling response cannot outlive it.
+    read_with_deadline = expires is not None and not kwargs.get("stream", False)
+    if read_with_deadline:
+        kwargs = {**kwargs, "stream": True}
+
+    attempt = 0
+    reauthenticated = False
+    request_bytes = len(kwargs.get("data") or b"")
+    while True:
+        started = time.monotonic()
+        attempt_timeout = (connect_timeout, read_timeout)
+        if expires is not None:
+            remaining = expires - started
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{method} {url}: deadline passed after {attempt} attempt(s).")
+            attempt_timeout = (min(connect_timeout, remaining), min(read_timeout, remaining))
+        try:
+            response = session.request(
+                method, url, headers=headers, params=params, timeout=attempt_timeout, **kwargs
+            )
+            response_bytes = _read_body(response, expires, method, url) if read_with_deadline else None
+        except requests.RequestException as exc:
+            metrics.observe(method, url, exc.__class__.__name__, time.monotonic() - started, request_bytes)
+            if attempt >= retries or not _is_retryable_exception(method, exc) or isinstance(exc, DeadlineExceeded):
+                raise
+            delay = _backoff_delay(attempt)
+            if expires is not None and time.monotonic() + delay >= expires:
+                print(f"[http] Warning: {method} {url} failed ({exc.__class__.__name__}); no time left to retry.")
+                raise
+            print(f"[http] Warning: {method} {url} failed ({exc.__class__.__name__}); retrying in {delay:.2f}s.")
+        else:
+            metrics.observe(
+                method,
+                url,
+                response.status_code,
+                time.monotonic() - started,
+                request_bytes,
+                response_bytes if read_with_deadline else _body_size(response, kwargs.get("stream", False)),
+            )
+            if response.status_code == 401 and authenticated and not reauthenticated:
+                from .auth import token_manager
+
+                rejected = headers["X-Auth-Token"]
+                reauthenticated = True
+                try:
+                    renewed = token_manager.handle_unauthorized(rejected)
+                except Exception as exc:
+                    print(f"[http] Warning: Re-authentication after 401 failed ({exc}).")
+                    return response
+                if renewed and renewed != rejected:
+                    print(f"[http] {method} {url} returned 401; retrying with a renewed token.")
+                    response.close()
+                    headers["X-Auth-Token"] = renewed
+                    continue
+                return response
+            if response.status_code not in retry_statuses or attempt >= retries:
+                return response
+            delay = _backoff_delay(attempt)
+            if expires is not None and time.monotonic() + delay >= expires:
+                print(f"[http] Warning: {method} {url} returned {response.status_code}; no time left to retry.")
+                return response
+            print(f"[http] Warning: {method} {url} returned {response.status_code}; retrying in {delay:.2f}s.")
+            # Hand a streamed connection back to the pool before sleeping.
+            response.close()
+        attempt += 1
+        time.sleep(delay)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def put(url, **kwargs):
+    return request("PUT", url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request("DELETE", url, **kwargs)
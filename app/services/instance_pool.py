@@ -0,0 +1,421 @@
+import os
+import threading
+import time
+import uuid
+
+from dotenv import load_dotenv
+
+from .create_instance import create_instance, delete_instance_metadata, rename_instance
+from .metrics import format_labels, metrics
+from .router_fip import get_ports_for_devices
+
+load_dotenv()
+
+# Pre-booted instances kept per (image, flavor, network) profile; 0 turns the pool off.
+INSTANCE_POOL_SIZE = int(os.getenv("OPENSTACK_INSTANCE_POOL_SIZE", "0"))
+# Profiles kept warm from start-up: "image,flavor,network" (names or IDs), several separated by ";".
+INSTANCE_POOL_PROFILES = os.getenv("OPENSTACK_INSTANCE_POOL_PROFILES", "")
+# A pool instance whose port is not ACTIVE within this many seconds is given up on.
+BOOT_TIMEOUT = float(os.getenv("OPENSTACK_INSTANCE_POOL_BOOT_TIMEOUT", "900"))
+# Pooled instances are named with this prefix and tagged with this metadata key (value: profile key),
+# so they are adopted again after a restart.
+POOL_NAME_PREFIX = "warm-pool-"
+POOL_METADATA_KEY = "warm_pool"
+# Seconds between readiness checks while pool instances are booting.
+BOOT_CHECK_INTERVAL = 5.0
+# Pause before refilling a profile whose create or boot failed.
+REFILL_BACKOFF = 60.0
+# Failed renames after which a pool instance is given up on instead of re-checked.
+MAX_RENAME_ATTEMPTS = 2
+# Upper bounds (seconds) of the hand-out latency histogram.
+HANDOUT_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def profile_key(image_id, flavor_id, network_id):
+    """Key (and metadata tag value) of an (image, flavor, network) profile."""
+    return f"{image_id}:{flavor_id}:{network_id}"
+
+
+def parse_profiles(spec, inventory):
+    """
+    Resolve ``OPENSTACK_INSTANCE_POOL_PROFILES`` entries to (image_id, flavor_id, network_id, label).
+
+    Each part may be a name or an ID; entries that do not resolve are skipped with a warning.
+    """
+    profiles = []
+    for entry in (spec or "").split(";"):
+        if not entry.strip():
+            continue
+        parts = [part.strip() for part in entry.split(",")]
+        ids = []
+        if len(parts) == 3:
+            for resource_name, value in zip(("images", "flavors", "networks"), parts):
+                ids.append(inventory.id_for_name(resource_name, value) or (value if inventory.get(resource_name, value) else None))
+        if len(ids) != 3 or not all(ids):
+            print(f"[pool] Warning: Ignoring instance pool profile '{entry.strip()}'.")
+            continue
+        profiles.append((*ids, "/".join(parts)))
+    return profiles
+
+
+class InstancePool:
+    """
+    Keep pre-booted instances ready to hand out by (image, flavor, network).
+
+    For every profile a background thread keeps ``size`` instances booted
+    (named ``warm-pool-<id>`` and tagged with ``POOL_METADATA_KEY``). An
+    instance counts as ready once its port is ACTIVE. ``acquire`` takes a
+    ready one, renames it to the requested name and removes the pool tag, so
+    the caller only has to bind a floating IP to the port it returns; the pool
+    then boots a replacement. A request for a profile the pool does not know yet is a
+    miss that starts warming that profile. Hand-out latency is recorded per
+    profile for hits and misses and exported through ``metrics``.
+
+    An instance that cannot be renamed goes back to the readiness check and
+    is offered again if it still has its ACTIVE port. One that fails the
+    rename ``MAX_RENAME_ATTEMPTS`` times, or misses the boot timeout, is
+    listed as orphaned. It still counts against the quota until deleted.
+    One that no longer exists (the rename answers 404) is simply dropped.
+    """
+
+    def __init__(self, size=INSTANCE_POOL_SIZE, boot_timeout=BOOT_TIMEOUT):
+        self.size = max(0, size)
+        self.boot_timeout = boot_timeout
+        self._profiles = {}
+        self._handouts = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def start(self, inventory=None, profiles=INSTANCE_POOL_PROFILES):
+        """Adopt pool instances left from earlier sessions, add the configured profiles and start refilling."""
+        if not self.enabled:
+            return
+        if inventory is None:
+            from ..utils.inventory import get_inventory
+
+            inventory = get_inventory()
+        for image_id, flavor_id, network_id, label in parse_profiles(profiles, inventory):
+            self.add_profile(image_id, flavor_id, network_id, label)
+        self._adopt(inventory)
+        metrics.register_collector(self.render_prometheus)
+        self._thread = threading.Thread(target=self._run, name="instance-pool", daemon=True)
+        self._thread.start()
+        print(f"[pool] Instance pool started: {self.size} per profile, {len(self._profiles)} profile(s).")
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def add_profile(self, image_id, flavor_id, network_id, label=None):
+        key = profile_key(image_id, flavor_id, network_id)
+        with self._lock:
+            if key not in self._profiles:
+                self._profiles[key] = {
+                    "label": label or key,
+                    "ready": [],
+                    "booting": {},
+                    "retry_at": 0.0,
+                    "hits": 0,
+                    "misses": 0,
+                    "failures": 0,
+                    "rename_failures": {},
+                    "orphaned": [],
+                }
+        self._wakeup.set()
+        return key
+
+    def _adopt(self, inventory):
+        """Track pool instances that already exist; their ports are checked like new ones."""
+        adopted = 0
+        for server in inventory.items("servers"):
+            key = (server.get("metadata") or {}).get(POOL_METADATA_KEY)
+            if not key or not (server.get("name") or "").startswith(POOL_NAME_PREFIX) or key.count(":") != 2:
+                continue
+            if server.get("status") == "ERROR":
+                print(f"[pool] Warning: Pool instance {server.get('id')} is in ERROR; not adopting it.")
+                continue
+            image_id, flavor_id, network_id = key.split(":")
+            label = "/".join(
+                (inventory.get(resource_name, item_id) or {}).get("name") or item_id
+                for resource_name, item_id in (("images", image_id), ("flavors", flavor_id), ("networks", network_id))
+            )
+            self.add_profile(image_id, flavor_id, network_id, label)
+            with self._lock:
+                self._profiles[key]["booting"][server["id"]] = time.monotonic()
+            adopted += 1
+        if adopted:
+            print(f"[pool] Adopted {adopted} pool instance(s) from earlier sessions.")
+
+    # -- hand-out ------------------------------------------------------------
+
+    def acquire(self, token, image_id, flavor_id, network_id, name, label=None):
+        """
+        Hand out a ready instance of the profile, renamed to ``name``.
+
+        Returns:
+            dict: ``id`` and ``port_id`` (ACTIVE) of the instance, or None on a
+            miss; the caller then boots one itself. Unknown profiles start warming.
+        """
+        key = profile_key(image_id, flavor_id, network_id)
+        if key not in self._profiles:
+            self.add_profile(image_id, flavor_id, network_id, label)
+            return None
+        while True:
+            with self._lock:
+                ready = self._profiles[key]["ready"]
+                entry = ready.pop(0) if ready else None
+            self._wakeup.set()
+            if entry is None:
+                return None
+            renamed = rename_instance(token, entry["id"], name)
+            with self._lock:
+                profile = self._profiles[key]
+                attempts = profile["rename_failures"].pop(entry["id"], 0) + (0 if renamed else 1)
+                if renamed is False:
+                    # Deleted behind the pool's back: nothing to re-check and no quota used.
+                    print(f"[pool] Warning: Pool instance {entry['id']} no longer exists; dropped from the pool.")
+                    continue
+                if not renamed and attempts < MAX_RENAME_ATTEMPTS:
+                    # Re-checked like a booting instance: ready again if its port is still ACTIVE.
+                    profile["rename_failures"][entry["id"]] = attempts
+                    profile["booting"][entry["id"]] = time.monotonic()
+                elif not renamed:
+                    self._orphan(profile, entry["id"], f"could not be renamed {attempts} times")
+            if renamed:
+                # Untagged, so it is no longer adopted as a pool instance after a restart.
+                if not delete_instance_metadata(token, entry["id"], POOL_METADATA_KEY):
+                    print(f"[pool] Warning: Could not remove the '{POOL_METADATA_KEY}' tag from {entry['id']}.")
+                print(f"[pool] Handed out {entry['id']} as '{name}' ({profile['label']}).")
+                return entry
+            print(f"[pool] Warning: Pool instance {entry['id']} could not be renamed; trying the next one.")
+
+    def record_handout(self, image_id, flavor_id, network_id, hit, seconds=None):
+        """
+        Count a hand-out as a hit or miss; ``seconds`` (request to usable
+        instance) feeds the latency histogram when known.
+        """
+        key = profile_key(image_id, flavor_id, network_id)
+        result = "hit" if hit else "miss"
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                return
+            profile["hits" if hit else "misses"] += 1
+            if seconds is None:
+                return
+            histogram = self._handouts.get((key, result))
+            if histogram is None:
+                # Per-bucket counts, then total count and sum.
+                histogram = self._handouts[(key, result)] = [0] * len(HANDOUT_BUCKETS) + [0, 0.0]
+            for index, bound in enumerate(HANDOUT_BUCKETS):
+                if seconds <= bound:
+                    histogram[index] += 1
+                    break
+            histogram[-2] += 1
+            histogram[-1] += seconds
+
+    # -- reporting -----------------------------------------------------------
+
+    def status(self):
+        """Return {profile label: {"ready", "booting", "hits", "misses", "failures", "orphaned", "hit_s", "miss_s"}}."""
+        with self._lock:
+            report = {}
+            for key, profile in self._profiles.items():
+                averages = {}
+                for result in ("hit", "miss"):
+                    histogram = self._handouts.get((key, result))
+                    averages[f"{result}_s"] = histogram[-1] / histogram[-2] if histogram and histogram[-2] else None
+                report[profile["label"]] = {
+                    "ready": len(profile["ready"]),
+                    "booting": len(profile["booting"]),
+                    "hits": profile["hits"],
+                    "misses": profile["misses"],
+                    "failures": profile["failures"],
+                    "orphaned": list(profile["orphaned"]),
+                    **averages,
+                }
+            return report
+
+    def format_summary(self):
+        """One-line pool summary for the GUI."""
+        report = self.status()
+        if not report:
+            return "warm pool: no profiles yet"
+        ready = sum(profile["ready"] for profile in report.values())
+        booting = sum(profile["booting"] for profile in report.values())
+        hits = sum(profile["hits"] for profile in report.values())
+        requests = hits + sum(profile["misses"] for profile in report.values())
+        text = f"warm pool: {ready} ready, {booting} booting"
+        if requests:
+            text += f", {hits}/{requests} hits"
+        orphaned = sum(len(profile["orphaned"]) for profile in report.values())
+        if orphaned:
+            text += f", {orphaned} to delete"
+        latencies = []
+        for result in ("hit", "miss"):
+            values = [profile[f"{result}_s"] for profile in report.values() if profile[f"{result}_s"] is not None]
+            if values:
+                latencies.append(f"{result} {sum(values) / len(values):.1f}s")
+        if latencies:
+            text += f" ({', '.join(latencies)})"
+        return text
+
+    def render_prometheus(self):
+        """Return the pool gauges and hand-out histograms as Prometheus text lines."""
+        with self._lock:
+            profiles = {
+                key: (
+                    profile["label"], len(profile["ready"]), len(profile["booting"]), profile["hits"], profile["misses"],
+                    len(profile["orphaned"]),
+                )
+                for key, profile in self._profiles.items()
+            }
+            handouts = {key: list(values) for key, values in self._handouts.items()}
+
+        lines = []
+        for name, help_text, column in (
+            ("openstack_instance_pool_ready", "Pre-booted instances ready to hand out.", 1),
+            ("openstack_instance_pool_booting", "Pool instances still booting.", 2),
+            ("openstack_instance_pool_orphaned", "Pool instances given up on that still need deleting.", 5),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for key in sorted(profiles):
+                lines.append(f"{name}{format_labels([('profile', profiles[key][0])])} {profiles[key][column]}")
+
+        lines += [
+            "# HELP openstack_instance_pool_handouts_total Instance requests served from the pool (hit) or booted (miss).",
+            "# TYPE openstack_instance_pool_handouts_total counter",
+        ]
+        for key in sorted(profiles):
+            label, _, _, hits, misses, _ = profiles[key]
+            for result, count in (("hit", hits), ("miss", misses)):
+                lines.append(
+                    f"openstack_instance_pool_handouts_total{format_labels([('profile', label), ('result', result)])} {count}"
+                )
+
+        lines += [
+            "# HELP openstack_instance_pool_handout_seconds Time from request to a usable instance.",
+            "# TYPE openstack_instance_pool_handout_seconds histogram",
+        ]
+        for key, result in sorted(handouts):
+            values = handouts[(key, result)]
+            label = profiles.get(key, (key,))[0]
+            pairs = [("profile", label), ("result", result)]
+            cumulative = 0
+            for bound, count in zip(HANDOUT_BUCKETS, values):
+                cumulative += count
+                lines.append(f"openstack_instance_pool_handout_seconds_bucket{format_labels(pairs + [('le', bound)])} {cumulative}")
+            lines.append(f"openstack_instance_pool_handout_seconds_bucket{format_labels(pairs + [('le', '+Inf')])} {values[-2]}")
+            lines.append(f"openstack_instance_pool_handout_seconds_sum{format_labels(pairs)} {values[-1]:.6f}")
+            lines.append(f"openstack_instance_pool_handout_seconds_count{format_labels(pairs)} {values[-2]}")
+        return lines
+
+    # -- refilling -----------------------------------------------------------
+
+    def _run(self):
+        from .auth import get_openstack_token
+
+        while not self._stopped:
+            self._wakeup.clear()
+            try:
+                if self._has_work():
+                    token = get_openstack_token()
+                    self._check_booting(token)
+                    self._refill(token)
+            except Exception as exc:
+                print(f"[pool] Warning: Instance pool maintenance failed: {exc}")
+            with self._lock:
+                booting = any(profile["booting"] for profile in self._profiles.values())
+            self._wakeup.wait(timeout=BOOT_CHECK_INTERVAL if booting else REFILL_BACKOFF)
+
+    def _has_work(self):
+        now = time.monotonic()
+        with self._lock:
+            return any(
+                profile["booting"]
+                or (len(profile["ready"]) < self.size and profile["retry_at"] <= now)
+                for profile in self._profiles.values()
+            )
+
+    def _check_booting(self, token):
+        """Move booting instances whose port is ACTIVE to ready; give up on those past the boot timeout."""
+        with self._lock:
+            pending = {server_id: key for key, profile in self._profiles.items() for server_id in profile["booting"]}
+        if not pending:
+            return
+        ports_by_device = get_ports_for_devices(token, list(pending), fields=("id", "status"))
+        now = time.monotonic()
+        with self._lock:
+            for server_id, key in pending.items():
+                profile = self._profiles[key]
+                started = profile["booting"].get(server_id)
+                if started is None:
+                    continue
+                port = next(
+                    (port for port in ports_by_device.get(server_id, []) if port.get("status") == "ACTIVE"), None
+                )
+                if port:
+                    del profile["booting"][server_id]
+                    profile["ready"].append({"id": server_id, "port_id": port.get("id")})
+                    print(f"[pool] {server_id} ready ({profile['label']}: {len(profile['ready'])}/{self.size}).")
+                elif now - started > self.boot_timeout:
+                    del profile["booting"][server_id]
+                    profile["rename_failures"].pop(server_id, None)
+                    profile["retry_at"] = now + REFILL_BACKOFF
+                    self._orphan(profile, server_id, f"not ready after {self.boot_timeout:.0f}s")
+
+    @staticmethod
+    def _orphan(profile, server_id, reason):
+        """Give up on a pool instance; the caller holds the lock."""
+        profile["failures"] += 1
+        profile["orphaned"].append(server_id)
+        print(f"[pool] Warning: Pool instance {server_id} {reason}; dropped from the pool. "
+              f"It still uses quota: delete it.")
+
+    def _refill(self, token):
+        now = time.monotonic()
+        with self._lock:
+            plan = [
+                (key, self.size - len(profile["ready"]) - len(profile["booting"]))
+                for key, profile in self._profiles.items()
+                if profile["retry_at"] <= now
+            ]
+        for key, missing in plan:
+            if missing <= 0:
+                continue
+            image_id, flavor_id, network_id = key.split(":")
+            print(f"[pool] Booting {missing} instance(s) for {self._profiles[key]['label']}.")
+            for _ in range(missing):
+                name = f"{POOL_NAME_PREFIX}{uuid.uuid4().hex[:8]}"
+                server_id = create_instance(
+                    token, name, image_id, flavor_id, network_id, metadata={POOL_METADATA_KEY: key}
+                )
+                with self._lock:
+                    profile = self._profiles[key]
+                    if not server_id:
+                        profile["failures"] += 1
+                        profile["retry_at"] = time.monotonic() + REFILL_BACKOFF
+                        print(f"[pool] Warning: Could not boot a pool instance for {profile['label']}; "
+                              f"retrying in {REFILL_BACKOFF:.0f}s.")
+                        break
+                    profile["booting"][server_id] = time.monotonic()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_instance_pool():
+    """Return the process-wide instance pool (not started)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = InstancePool()
+    return _pool
@@ -0,0 +1,371 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from dotenv import load_dotenv
+
+from .snapshot import (
+    COLLECTION_KEYS,
+    OUTPUT_FILE,
+    STORE_BACKEND,
+    SnapshotReader,
+    load_section_bytes,
+    open_snapshot_writer,
+    snapshot_lock,
+)
+
+load_dotenv()
+
+# URL of a running daemon (e.g. http://127.0.0.1:8787); when set, the GUI and CLI attach to it.
+DAEMON_URL = os.getenv("OPENSTACK_INVENTORY_DAEMON", "").rstrip("/")
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = int(os.getenv("OPENSTACK_DAEMON_PORT", "8787"))
+# Seconds between scheduled incremental polls.
+DAEMON_INTERVAL = float(os.getenv("OPENSTACK_DAEMON_INTERVAL", "60"))
+# Longest a /changes request is held open waiting for a new version.
+MAX_WAIT = 60.0
+# Client-side timeout for a refresh that waits for the daemon's poll to finish.
+REFRESH_TIMEOUT = 300.0
+
+
+class InventoryDaemon:
+    """
+    Keep the inventory warm with scheduled polls and track what changed.
+
+    A background thread runs ``poll_openstack_resources`` every ``interval``
+    seconds, or sooner when a client asks for a refresh. After each poll the
+    sections are hashed; a section whose bytes changed gets the new global
+    version, and clients blocked in ``wait_for_changes`` are woken up.
+
+    Versions live in memory and start over when the daemon restarts, so every
+    start gets a new ``epoch``; clients that see it change forget the versions
+    they synced.
+    """
+
+    def __init__(self, interval=DAEMON_INTERVAL, path=OUTPUT_FILE):
+        self.interval = interval
+        self.path = path
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self.resource_versions = {name: 0 for name in COLLECTION_KEYS}
+        self.item_counts = {}
+        self.polled_at = None
+        self.last_poll_seconds = None
+        self._hashes = {}
+        self._condition = threading.Condition()
+        self._wakeup = threading.Event()
+        self._pending = set()
+        self._pending_all = False
+        self._started_polls = 0
+        self._completed_polls = 0
+        self._stopped = False
+        self._thread = None
+
+    # -- polling -------------------------------------------------------------
+
+    def start(self):
+        self._scan(initial=True)
+        self._thread = threading.Thread(target=self._run, name="inventory-daemon", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def request_refresh(self, resources=None):
+        """
+        Ask for a poll of ``resources`` (all when None) as soon as possible.
+
+        Returns:
+            int: Number of the poll that will include the request (see ``wait_for_poll``).
+        """
+        with self._condition:
+            if resources:
+                self._pending.update(name for name in resources if name in COLLECTION_KEYS)
+            else:
+                self._pending_all = True
+            target = self._started_polls + 1
+        self._wakeup.set()
+        return target
+
+    def wait_for_poll(self, target, timeout):
+        with self._condition:
+            return self._condition.wait_for(lambda: self._completed_polls >= target, timeout=timeout)
+
+    def _run(self):
+        from .poll_resources import poll_openstack_resources
+
+        # Start with a poll so the cache is fresh when the first client attaches.
+        self.request_refresh()
+        while not self._stopped:
+            self._wakeup.wait(timeout=self.interval)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            with self._condition:
+                resources = None if self._pending_all or not self._pending else sorted(self._pending)
+                self._pending = set()
+                self._pending_all = False
+                self._started_polls += 1
+            started = time.monotonic()
+            label = ", ".join(resources) if resources else "all resources"
+            print(f"[daemon] Polling {label}...")
+            try:
+                poll_openstack_resources(
+                    verbose=False,
+                    incremental=SnapshotReader(self.path).exists() or STORE_BACKEND == "sqlite",
+                    resources=resources,
+                    use_daemon=False,
+                )
+            except Exception as exc:
+                print(f"[daemon] Error: Poll failed: {exc}")
+            self.last_poll_seconds = time.monotonic() - started
+            changed = self._scan()
+            with self._condition:
+                self._completed_polls += 1
+                self.polled_at = time.time()
+                self._condition.notify_all()
+            summary = ", ".join(changed) if changed else "no changes"
+            print(f"[daemon] Poll finished in {self.last_poll_seconds:.1f}s ({summary}); version {self.version}.")
+
+    def _scan(self, initial=False):
+        """Hash every section and bump versions for the ones that changed."""
+        changed = []
+        counts = {}
+        hashes = {}
+        for resource_name in COLLECTION_KEYS:
+            raw = self.section_bytes(resource_name)
+            hashes[resource_name] = hashlib.sha1(raw).hexdigest()
+            counts[resource_name] = None if raw == b"null" else raw.count(b"\n") - 1
+            if hashes[resource_name] != self._hashes.get(resource_name):
+                changed.append(resource_name)
+        with self._condition:
+            if changed:
+                self.version += 1
+                for resource_name in changed:
+                    self.resource_versions[resource_name] = self.version
+            self._hashes = hashes
+            self.item_counts = counts
+            if changed and not initial:
+                self._condition.notify_all()
+        return changed
+
+    # -- serving -------------------------------------------------------------
+
+    def section_bytes(self, resource_name):
+        """Return one section in the snapshot's line-per-item encoding."""
+        return load_section_bytes(resource_name, self.path)
+
+    def status(self):
+        with self._condition:
+            return {
+                "epoch": self.epoch,
+                "version": self.version,
+                "polled_at": self.polled_at,
+                "last_poll_seconds": self.last_poll_seconds,
+                "interval": self.interval,
+                "resources": {
+                    name: {"version": self.resource_versions[name], "items": self.item_counts.get(name)}
+                    for name in COLLECTION_KEYS
+                },
+            }
+
+    def wait_for_changes(self, since, timeout, epoch=None):
+        """
+        Block until the version moves past ``since`` or ``timeout`` passes; return the status.
+
+        ``since`` from another ``epoch`` (a previous run of the daemon) returns at once.
+        """
+        with self._condition:
+            if epoch is None or epoch == self.epoch:
+                self._condition.wait_for(lambda: self.version > since or self._stopped, timeout=timeout)
+        return self.status()
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        daemon = self.server.daemon
+        parts = urlsplit(self.path)
+        params = parse_qs(parts.query)
+        if parts.path == "/status":
+            return self._send(200, daemon.status())
+        if parts.path == "/changes":
+            try:
+                since = int(params.get("since", ["0"])[0])
+                timeout = min(float(params.get("timeout", [str(MAX_WAIT)])[0]), MAX_WAIT)
+            except ValueError:
+                return self._send(400, {"error": "'since' must be an integer and 'timeout' a number"})
+            epoch = params.get("epoch", [None])[0]
+            return self._send(200, daemon.wait_for_changes(since, max(0.0, timeout), epoch))
+        if parts.path.startswith("/resources/"):
+            resource_name = parts.path.split("/", 2)[2]
+            if resource_name not in COLLECTION_KEYS:
+                return self._send(404, {"error": f"Unknown resource '{resource_name}'"})
+            version = f"{daemon.epoch}-{daemon.resource_versions[resource_name]}"
+            if self.headers.get("If-None-Match") == version:
+                return self._send(304, b"", headers={"ETag": version})
+            return self._send(200, daemon.section_bytes(resource_name), headers={"ETag": version})
+        self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        daemon = self.server.daemon
+        parts = urlsplit(self.path)
+        if parts.path != "/refresh":
+            return self._send(404, {"error": "Not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length)) if length else {}
+        except json.JSONDecodeError:
+            return self._send(400, {"error": "Invalid JSON"})
+        target = daemon.request_refresh(body.get("resources"))
+        wait = parse_qs(parts.query).get("wait", ["0"])[0] == "1"
+        if wait and not daemon.wait_for_poll(target, timeout=REFRESH_TIMEOUT):
+            return self._send(504, daemon.status())
+        self._send(200 if wait else 202, daemon.status())
+
+
+def serve(daemon, host=DAEMON_HOST, port=DAEMON_PORT):
+    """Start ``daemon`` and serve its API until interrupted."""
+    server = ThreadingHTTPServer((host, port), _DaemonHandler)
+    server.daemon_threads = True
+    server.daemon = daemon
+    daemon.start()
+    print(f"[daemon] Serving inventory on http://{host}:{server.server_port} (poll every {daemon.interval:.0f}s).")
+    print(f"[daemon] Attach clients with OPENSTACK_INVENTORY_DAEMON=http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
+
+
+class DaemonClient:
+    """
+    Attach to a running inventory daemon instead of polling OpenStack.
+
+    ``sync()`` mirrors the daemon's snapshot into the local store, downloading
+    only the sections whose version changed since the last sync. After the
+    daemon restarted (new epoch) every section is downloaded again.
+    """
+
+    def __init__(self, base_url=DAEMON_URL, path=OUTPUT_FILE):
+        self.base_url = base_url.rstrip("/")
+        self.path = path
+        self._synced_versions = {}
+        self._epoch = None
+        self._lock = threading.Lock()
+        # A plain session: daemon calls are local and must not carry the Keystone token.
+        self._session = requests.Session()
+
+    def status(self):
+        response = self._session.get(f"{self.base_url}/status", timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def request_refresh(self, resources=None, wait=True):
+        """Ask the daemon to poll now; with ``wait`` block until that poll has finished."""
+        response = self._session.post(
+            f"{self.base_url}/refresh",
+            params={"wait": "1" if wait else "0"},
+            json={"resources": list(resources) if resources else None},
+            timeout=REFRESH_TIMEOUT + 10 if wait else 10,
+        )
+        if response.status_code not in (200, 202):
+            raise RuntimeError(f"Daemon refresh failed ({response.status_code}): {response.text}")
+        return response.json()
+
+    def wait_for_changes(self, since, timeout=MAX_WAIT, epoch=None):
+        params = {"since": since, "timeout": timeout}
+        if epoch:
+            params["epoch"] = epoch
+        response = self._session.get(f"{self.base_url}/changes", params=params, timeout=timeout + 10)
+        response.raise_for_status()
+        return response.json()
+
+    def sync(self, status=None):
+        """
+        Copy changed sections from the daemon into the local snapshot.
+
+        Returns:
+            list[str]: Resource names that were downloaded.
+        """
+        with self._lock:
+            status = status or self.status()
+            if status.get("epoch") != self._epoch:
+                # The daemon restarted and counts versions from zero again.
+                self._synced_versions = {}
+                self._epoch = status.get("epoch")
+            remote = status["resources"]
+            local_missing = STORE_BACKEND != "sqlite" and not SnapshotReader(self.path).exists()
+            changed = [
+                name for name in COLLECTION_KEYS
+                if local_missing or self._synced_versions.get(name) != remote[name]["version"]
+            ]
+            if not changed:
+                return []
+
+            writer = open_snapshot_writer(self.path)
+            try:
+                for resource_name in changed:
+                    response = self._session.get(f"{self.base_url}/resources/{resource_name}", timeout=60)
+                    response.raise_for_status()
+                    writer.write_raw_section(resource_name, response.content, remote[resource_name]["items"])
+                with snapshot_lock(self.path), SnapshotReader(self.path) as reader:
+                    for resource_name in COLLECTION_KEYS:
+                        if resource_name not in changed:
+                            writer.copy_section(resource_name, reader)
+                    writer.commit(list(COLLECTION_KEYS))
+            finally:
+                writer.discard()
+            for name in changed:
+                self._synced_versions[name] = remote[name]["version"]
+            return changed
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_daemon_client():
+    """Return the process-wide client, or None when OPENSTACK_INVENTORY_DAEMON is unset."""
+    global _client
+    if not DAEMON_URL:
+        return None
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = DaemonClient(DAEMON_URL)
+    return _client
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the OpenStack inventory warm and serve it to local clients.")
+    parser.add_argument("--host", default=DAEMON_HOST, help="Interface to bind (loopback by default).")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT, help="Port for the HTTP API.")
+    parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL, help="Seconds between scheduled polls.")
+    args = parser.parse_args()
+    serve(InventoryDaemon(interval=args.interval), host=args.host, port=args.port)
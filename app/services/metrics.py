@@ -0,0 +1,284 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Seconds of history behind the rolling summary shown in the GUI.
+SUMMARY_WINDOW = 300
+MAX_RECENT_CALLS = 20000
+
+METRICS_FILE = os.getenv("OPENSTACK_METRICS_FILE", "")
+METRICS_PORT = int(os.getenv("OPENSTACK_METRICS_PORT", "0"))
+
+# UUIDs, hex IDs and numbers in a path are replaced so calls group by endpoint.
+_ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{32}|\d+)$")
+
+
+def endpoint_for(url, services=None):
+    """
+    Map a request URL to a (service, endpoint) label pair.
+
+    ``services`` maps base URLs to service names; the first matching prefix
+    wins, otherwise the host name is used. Example:
+    ``https://cloud-network.uitiot.vn/v2.0/routers/<uuid>/add_router_interface``
+    becomes ``("network", "/v2.0/routers/{id}/add_router_interface")``.
+    """
+    parts = urlsplit(url)
+    service = next(
+        (name for base_url, name in (services or {}).items() if url.startswith(base_url)),
+        parts.hostname or "unknown",
+    )
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in parts.path.split("/")]
+    return service, "/".join(segments) or "/"
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(pairs):
+    """Render (name, value) pairs as a Prometheus label set, e.g. ``{service="compute"}``."""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Metrics:
+    """
+    Thread-safe per-endpoint counters for OpenStack REST calls.
+
+    Every HTTP exchange (including retries) is recorded with its service,
+    method and templated endpoint: a latency histogram, a counter per status
+    code (or exception name for transport failures) and request/response byte
+    totals. Recent calls are also kept for the rolling summary.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._statuses = {}
+        self._request_bytes = {}
+        self._response_bytes = {}
+        self._recent = deque(maxlen=MAX_RECENT_CALLS)
+        self._collectors = []
+        self.services = {}
+
+    def register_service(self, name, base_url):
+        """Label calls under ``base_url`` with service ``name`` (e.g. "compute")."""
+        self.services[base_url.rstrip("/") + "/"] = name
+
+    def register_collector(self, collector):
+        """Append the Prometheus lines returned by ``collector()`` to every export."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def observe(self, method, url, status, elapsed, request_bytes=0, response_bytes=0):
+        """
+        Record one HTTP exchange.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL (query string is ignored).
+            status (int | str): Status code, or the exception class name on failure.
+            elapsed (float): Seconds from sending the request to receiving the response.
+            request_bytes (int): Size of the request body.
+            response_bytes (int): Size of the response body; for a streamed body
+                that is read later, 0 here and ``add_response_bytes`` once read.
+        """
+        service, endpoint = endpoint_for(url, self.services)
+        key = (service, method, endpoint)
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                # Per-bucket counts, then total count and sum.
+                histogram = self._latency[key] = [0] * len(self.buckets) + [0, 0.0]
+            for index, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    histogram[index] += 1
+                    break
+            histogram[-2] += 1
+            histogram[-1] += elapsed
+            status_key = key + (str(status),)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+            self._request_bytes[key] = self._request_bytes.get(key, 0) + request_bytes
+            self._response_bytes[key] = self._response_bytes.get(key, 0) + response_bytes
+            self._recent.append((time.monotonic(), key, elapsed, str(status)))
+
+    def add_response_bytes(self, method, url, response_bytes):
+        """Add body bytes read after ``observe()`` (streamed responses) to the endpoint's total."""
+        service, endpoint = endpoint_for(url, self.services)
+        key = (service, method, endpoint)
+        with self._lock:
+            self._response_bytes[key] = self._response_bytes.get(key, 0) + response_bytes
+
+    def summary(self, window=SUMMARY_WINDOW):
+        """
+        Summarize the calls of the last ``window`` seconds.
+
+        Returns:
+            dict: ``calls``, ``errors`` (5xx and transport failures), ``p50``/``p95``
+            latency in seconds, and ``slowest`` as a ``((service, method, endpoint), p95)``
+            tuple or None.
+        """
+        cutoff = time.monotonic() - window
+        with self._lock:
+            recent = [call for call in self._recent if call[0] >= cutoff]
+        latencies = sorted(call[2] for call in recent)
+        errors = sum(1 for call in recent if not call[3].isdigit() or call[3].startswith("5"))
+        by_endpoint = {}
+        for _, key, elapsed, _ in recent:
+            by_endpoint.setdefault(key, []).append(elapsed)
+        slowest = None
+        for key, values in by_endpoint.items():
+            p95 = _percentile(sorted(values), 0.95)
+            if slowest is None or p95 > slowest[1]:
+                slowest = (key, p95)
+        return {
+            "calls": len(recent),
+            "errors": errors,
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "slowest": slowest,
+        }
+
+    def format_summary(self, window=SUMMARY_WINDOW):
+        """One-line rolling summary for the GUI."""
+        stats = self.summary(window)
+        if not stats["calls"]:
+            return f"API: no calls in the last {window // 60} min"
+        text = (
+            f"API ({window // 60} min): {stats['calls']} calls, {stats['errors']} errors, "
+            f"p50 {stats['p50'] * 1000:.0f} ms, p95 {stats['p95'] * 1000:.0f} ms"
+        )
+        if stats["slowest"]:
+            (service, method, endpoint), p95 = stats["slowest"]
+            text += f" | slowest: {method} {service} {endpoint} (p95 {p95 * 1000:.0f} ms)"
+        return text
+
+    def response_bytes_total(self):
+        """Return the response body bytes received so far, across all endpoints."""
+        with self._lock:
+            return sum(self._response_bytes.values())
+
+    def render_prometheus(self):
+        """Return all counters in the Prometheus text exposition format."""
+        with self._lock:
+            latency = {key: list(values) for key, values in self._latency.items()}
+            statuses = dict(self._statuses)
+            request_bytes = dict(self._request_bytes)
+            response_bytes = dict(self._response_bytes)
+            collectors = list(self._collectors)
+
+        def _labels(key, **extra):
+            service, method, endpoint = key
+            pairs = [("service", service), ("method", method), ("endpoint", endpoint), *extra.items()]
+            return format_labels(pairs)
+
+        lines = [
+            "# HELP openstack_request_duration_seconds Latency of OpenStack REST calls.",
+            "# TYPE openstack_request_duration_seconds histogram",
+        ]
+        for key in sorted(latency):
+            values = latency[key]
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"openstack_request_duration_seconds_bucket{_labels(key, le=bound)} {cumulative}")
+            lines.append(f"openstack_request_duration_seconds_bucket{_labels(key, le='+Inf')} {values[-2]}")
+            lines.append(f"openstack_request_duration_seconds_sum{_labels(key)} {values[-1]:.6f}")
+            lines.append(f"openstack_request_duration_seconds_count{_labels(key)} {values[-2]}")
+
+        lines += [
+            "# HELP openstack_requests_total OpenStack REST calls by status code or transport error.",
+            "# TYPE openstack_requests_total counter",
+        ]
+        for status_key in sorted(statuses):
+            lines.append(f"openstack_requests_total{_labels(status_key[:3], status=status_key[3])} {statuses[status_key]}")
+
+        for name, help_text, totals in (
+            ("openstack_request_bytes_total", "Request body bytes sent.", request_bytes),
+            ("openstack_response_bytes_total", "Response body bytes received.", response_bytes),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for key in sorted(totals):
+                lines.append(f"{name}{_labels(key)} {totals[key]}")
+        for collector in collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def write_prometheus(path=None):
+    """Atomically write the current metrics to ``path`` (default ``OPENSTACK_METRICS_FILE``)."""
+    path = path or METRICS_FILE
+    if not path:
+        return False
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(metrics.render_prometheus())
+        os.replace(tmp_path, path)
+        return True
+    except OSError as exc:
+        print(f"Warning: Failed to write metrics to {path}: {exc}")
+        return False
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes would otherwise flood the log panel via stderr.
+        pass
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """
+    Serve ``/metrics`` on a loopback port from a daemon thread.
+
+    Args:
+        port (int): Port to bind; defaults to ``OPENSTACK_METRICS_PORT``. 0 disables the server.
+        host (str): Interface to bind; loopback by default.
+
+    Returns:
+        ThreadingHTTPServer | None: The running server, or None if disabled or the bind failed.
+    """
+    port = METRICS_PORT if port is None else port
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as exc:
+        print(f"Warning: Could not start metrics endpoint on {host}:{port}: {exc}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"Info: Metrics available at http://{host}:{port}/metrics")
+    return server
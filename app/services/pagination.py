@@ -0,0 +1,256 @@
+import codecs
+import json
+import os
+import time
+
+from . import http_client
+
+# Items requested per page from Nova/Neutron list endpoints.
+PAGE_SIZE = int(os.getenv("OPENSTACK_PAGE_SIZE", "500"))
+# Pages are decoded while they stream in; items reach the consumer in batches of this size.
+STREAM_BATCH = 100
+STREAM_CHUNK_SIZE = 64 * 1024
+_VALUE_DELIMITERS = frozenset(",:]} \t\r\n")
+
+
+class PageFetchError(RuntimeError):
+    """Raised when a page of a list endpoint does not come back with 200 OK."""
+
+    def __init__(self, url, status_code, body):
+        super().__init__(f"GET {url} returned {status_code}: {body}")
+        self.url = url
+        self.status_code = status_code
+        self.body = body
+
+
+class _JSONStream:
+    """Cursor over JSON text arriving as byte chunks; decodes one value at a time."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def _more(self):
+        """Append the next chunk to the buffer; return False once the stream is exhausted."""
+        if self.exhausted:
+            return False
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if not text:
+                continue
+            # Drop consumed text so the buffer stays around one chunk in size.
+            self.buffer = self.buffer[self.pos:] + text
+            self.pos = 0
+            return True
+        self._utf8.decode(b"", final=True)
+        self.exhausted = True
+        return False
+
+    def peek(self):
+        """Skip whitespace and return the next character ("" at the end of the stream)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._more():
+                return ""
+
+    def consume(self, expected):
+        """Consume one of the structural characters in ``expected`` and return it."""
+        char = self.peek()
+        if not char or char not in expected:
+            raise ValueError(f"expected one of {expected!r}, found {char or 'end of body'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            # A number cut off by the chunk boundary ("12" of "12.5") decodes too early;
+            # only accept a value once the character after it has arrived.
+            if (end == len(self.buffer) or self.buffer[end] not in _VALUE_DELIMITERS) and self._more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_collection_items(chunks, collection_key, extras):
+    """
+    Yield the items of ``collection_key`` from a JSON object arriving in chunks.
+
+    Only one item is decoded at a time, so a large page never exists in memory
+    as one body string plus one parsed document. Other top-level members (such
+    as ``<collection>_links``) are stored in ``extras``.
+
+    Raises:
+        ValueError: When the body is not a JSON object.
+    """
+    stream = _JSONStream(chunks)
+    stream.consume("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.consume(":")
+        if key == collection_key and stream.peek() == "[":
+            stream.consume("[")
+            if stream.peek() == "]":
+                stream.consume("]")
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.consume(",]") == "]":
+                        break
+        else:
+            extras[key] = stream.value()
+        if stream.consume(",}") == "}":
+            return
+
+
+def _item_marker(item):
+    # Key pairs are wrapped ({"keypair": {...}}) and paginated by name.
+    return item.get("id") or item.get("keypair", {}).get("name")
+
+
+def _next_link(body, collection_key):
+    for link in body.get(f"{collection_key}_links") or []:
+        if link.get("rel") == "next" and link.get("href"):
+            return link["href"]
+    return None
+
+
+class CollectionPager:
+    """
+    Iterate a Nova/Neutron list endpoint a batch of items at a time.
+
+    Follows ``<collection>_links`` next pointers and falls back to
+    ``limit``/``marker`` when the service honours the limit but omits links, so
+    results are complete. Each page is streamed and decoded incrementally, so
+    only a batch of items (not a page, let alone the collection) is held in
+    memory at once.
+
+    Call ``start()`` first to inspect the first response (e.g. for a 304), then
+    iterate the pager to get lists of items; call ``close()`` when stopping early.
+    """
+
+    def __init__(self, url, token, collection_key, params=None, headers=None, page_size=PAGE_SIZE):
+        self.url = url
+        self.token = token
+        self.collection_key = collection_key
+        self.params = dict(params or {})
+        self.headers = headers
+        self.page_size = page_size
+        self.pages = 0
+        self.items = 0
+        self.first_response = None
+        self._response = None
+        self._expires = None
+
+    def _page_params(self, marker=None):
+        params = dict(self.params)
+        if self.page_size:
+            params["limit"] = self.page_size
+        if marker:
+            params["marker"] = marker
+        return params
+
+    def _get(self, url, params, headers=None):
+        deadline = http_client.REQUEST_DEADLINE
+        self._expires = time.monotonic() + deadline if deadline > 0 else None
+        self._response = http_client.get(url, token=self.token, params=params, headers=headers, stream=True)
+        return self._response
+
+    def _chunks(self, response):
+        # The body is read here rather than in http_client, so enforce the call deadline
+        # and report the bytes read here too.
+        received = 0
+        try:
+            for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                if self._expires is not None and time.monotonic() > self._expires:
+                    raise http_client.DeadlineExceeded(f"GET {response.url}: page still arriving at the deadline.")
+                received += len(chunk)
+                yield chunk
+        finally:
+            http_client.record_streamed_body(response, received)
+
+    def start(self):
+        """Request the first page and return its response."""
+        if self.first_response is None:
+            self.first_response = self._get(self.url, self._page_params(), self.headers)
+        return self.first_response
+
+    def close(self):
+        """Release the connection of the page being read (if any)."""
+        if self._response is not None:
+            self._response.close()
+
+    def __iter__(self):
+        response = self.start()
+        url = self.url
+        # First and last marker of the page before, to spot a service handing the same page back.
+        previous_page = None
+        while True:
+            if response.status_code != 200:
+                raise PageFetchError(url, response.status_code, response.text)
+            extras = {}
+            page_items = 0
+            first_item = last_item = None
+            repeated = False
+            batch = []
+            try:
+                for item in iter_collection_items(self._chunks(response), self.collection_key, extras):
+                    if first_item is None:
+                        first_item = item
+                        # A service that ignores limit/marker starts the "next" page with an item
+                        # already emitted; stop before any of it reaches the consumer.
+                        marker = _item_marker(item)
+                        if previous_page is not None and marker is not None and marker in previous_page:
+                            repeated = True
+                            break
+                    batch.append(item)
+                    if len(batch) >= STREAM_BATCH:
+                        page_items += len(batch)
+                        last_item = batch[-1]
+                        self.items += len(batch)
+                        yield batch
+                        batch = []
+            except ValueError as exc:
+                raise PageFetchError(url, response.status_code, f"malformed JSON body ({exc})") from exc
+            finally:
+                response.close()
+            if repeated:
+                print(f"[poll] Warning: {url} returned a page already read (limit/marker ignored); "
+                      f"keeping the {self.items} {self.collection_key} read so far.")
+                break
+            self.pages += 1
+            if batch:
+                page_items += len(batch)
+                last_item = batch[-1]
+                self.items += len(batch)
+                yield batch
+
+            if not page_items:
+                break
+            previous_page = (_item_marker(first_item), _item_marker(last_item))
+            next_url = _next_link(extras, self.collection_key)
+            if next_url:
+                url, params = next_url, None
+            else:
+                marker = _item_marker(last_item) if self.page_size and page_items >= self.page_size else None
+                if not marker:
+                    break
+                url, params = self.url, self._page_params(marker)
+            # Conditional headers only make sense for the first page.
+            response = self._get(url, params)
@@ -1,15 +1,207 @@
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from .auth import get_openstack_token
+from .http_client import COMPUTE_BASE_URL, NETWORK_BASE_URL
+from .inventory_daemon import get_daemon_client
+from .metrics import metrics, write_prometheus
+from .pagination import CollectionPager, PageFetchError
+from .snapshot import COLLECTION_KEYS, SnapshotReader, load_snapshot, open_snapshot_writer, snapshot_lock
+import argparse
 import requests
 import json
+import os
+import time
 
+POLL_STATE_FILE = "poll_state.json"
 
-def poll_openstack_resources(verbose=True, log_file=None):
+RESOURCES = {
+    "flavors": f"{COMPUTE_BASE_URL}/flavors/detail",
+    "images": f"{COMPUTE_BASE_URL}/images",
+    "keypairs": f"{COMPUTE_BASE_URL}/os-keypairs",
+    "networks": f"{NETWORK_BASE_URL}/networks",
+    "servers": f"{COMPUTE_BASE_URL}/servers/detail",
+    "security_groups": f"{NETWORK_BASE_URL}/security-groups",
+    "routers": f"{NETWORK_BASE_URL}/routers",
+    "subnets": f"{NETWORK_BASE_URL}/subnets",
+    "floating_ips": f"{NETWORK_BASE_URL}/floatingips",
+    "ports": f"{NETWORK_BASE_URL}/ports"
+}
+
+# Upper bound on concurrent endpoint fetches; one worker per resource by default.
+MAX_POLL_WORKERS = len(RESOURCES)
+
+# Subtracted from the server-side poll time so clock skew never hides a change.
+CHANGES_SINCE_SKEW = timedelta(seconds=5)
+MAX_TRACKED_DELETIONS = 1000
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _server_timestamp(response):
+    """Return the response's Date header (minus skew) as an ISO-8601 UTC string."""
+    try:
+        moment = parsedate_to_datetime(response.headers.get("Date"))
+    except (TypeError, ValueError):
+        moment = datetime.now(timezone.utc)
+    return (moment - CHANGES_SINCE_SKEW).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _item_ids(items):
+    return {item.get("id") for item in items if item.get("id")}
+
+
+def _merge_items(previous_items, changed_items, removed_ids):
+    """Apply changed items (by id) and removals to a previous item list, keeping order."""
+    changed_by_id = {item.get("id"): item for item in changed_items}
+    merged = []
+    for item in previous_items:
+        item_id = item.get("id")
+        if item_id in removed_ids:
+            continue
+        merged.append(changed_by_id.pop(item_id, item))
+    merged.extend(changed_by_id.values())
+    return merged
+
+
+def _record_deletions(state, deleted_ids, timestamp):
+    if not deleted_ids:
+        return
+    deleted = dict(state.get("deleted") or {})
+    for item_id in deleted_ids:
+        deleted[item_id] = timestamp
+    # Keep only the most recent deletions so the state file stays small.
+    recent = sorted(deleted.items(), key=lambda entry: entry[1])[-MAX_TRACKED_DELETIONS:]
+    state["deleted"] = dict(recent)
+
+
+def _fetch_resource(resource_name, url, token, writer, previous=None, state=None):
     """
-    Polls various OpenStack endpoints to gather resource information
+    Fetch a single resource list page by page into the snapshot writer.
+
+    With a previous payload, servers are requested with Nova's ``changes-since``
+    and every other resource with a conditional GET on its last ETag. Deltas are
+    merged into the previous payload and removed IDs are tracked in ``state``.
+    On failure the previous payload (if any) is kept.
+
+    Returns:
+        tuple: (resource_name, status message, elapsed seconds, state)
+    """
+    state = dict(state or {})
+    collection_key = COLLECTION_KEYS[resource_name]
+    params = None
+    headers = None
+    mode = "full"
+    if previous is not None:
+        if resource_name == "servers" and state.get("last_polled"):
+            params = {"changes-since": state["last_polled"]}
+            mode = "changes-since"
+        elif state.get("etag"):
+            headers = {"If-None-Match": state["etag"]}
+            mode = "conditional"
+
+    pager = CollectionPager(url, token, collection_key, params=params, headers=headers)
+    started = time.perf_counter()
+    try:
+        response = pager.start()
+        if response.status_code == 304:
+            pager.close()
+            writer.write_payload(resource_name, previous)
+            state["last_polled"] = _server_timestamp(response)
+            elapsed = time.perf_counter() - started
+            return resource_name, f"[poll] {resource_name} unchanged ({elapsed:.2f}s).", elapsed, state
+
+        if response.status_code != 200:
+            writer.write_payload(resource_name, previous)
+            elapsed = time.perf_counter() - started
+            return (
+                resource_name,
+                f"[poll] Failed to fetch {resource_name}. Status: {response.status_code}, Body: {response.text}",
+                elapsed,
+                state,
+            )
+
+        polled_at = _server_timestamp(response)
+        if mode == "changes-since":
+            changed = [item for page in pager for item in page]
+            deleted_ids = {item.get("id") for item in changed if item.get("status") == "DELETED"}
+            live_changes = [item for item in changed if item.get("status") != "DELETED"]
+            merged = {collection_key: _merge_items(previous.get(collection_key, []), live_changes, deleted_ids)}
+            writer.write_payload(resource_name, merged)
+            detail = f"delta: {len(live_changes)} changed, {len(deleted_ids)} deleted"
+        else:
+            seen_ids = set()
+
+            def _tracked_pages():
+                for page in pager:
+                    seen_ids.update(_item_ids(page))
+                    yield page
+
+            count = writer.write_section(resource_name, collection_key, _tracked_pages())
+            deleted_ids = _item_ids(previous.get(collection_key, [])) - seen_ids if previous is not None else set()
+            detail = f"{count} item(s) in {pager.pages} page(s)"
+    except (requests.RequestException, PageFetchError) as exc:
+        writer.write_payload(resource_name, previous)
+        elapsed = time.perf_counter() - started
+        return resource_name, f"[poll] Failed to fetch {resource_name}. Exception: {exc}", elapsed, state
+
+    _record_deletions(state, deleted_ids, polled_at)
+    # An ETag only describes the first page, so it is only reusable for single-page collections.
+    state["etag"] = response.headers.get("ETag") if mode != "changes-since" and pager.pages == 1 else None
+    state["last_polled"] = polled_at
+    elapsed = time.perf_counter() - started
+    return resource_name, f"[poll] Successfully fetched {resource_name}, {detail} ({elapsed:.2f}s).", elapsed, state
+
+
+def _poll_via_daemon(resources, verbose):
+    """Have the inventory daemon refresh and copy its snapshot; return False if it is unreachable."""
+    client = get_daemon_client()
+    try:
+        client.request_refresh(resources, wait=True)
+        changed = client.sync()
+    except (requests.RequestException, RuntimeError) as exc:
+        print(f"[poll] Warning: Inventory daemon at {client.base_url} unavailable ({exc}); polling OpenStack directly.")
+        return False
+    if verbose:
+        print(f"[poll] Synced {len(changed)} changed resource type(s) from the inventory daemon.")
+    else:
+        print("[poll] Updated cache from the inventory daemon.")
+    return True
+
+
+def poll_openstack_resources(
+    verbose=True,
+    log_file=None,
+    max_workers=MAX_POLL_WORKERS,
+    incremental=False,
+    resources=None,
+    use_daemon=True,
+    quiet=False,
+):
+    """
+    Polls various OpenStack endpoints concurrently to gather resource information
     and saves it to a JSON file.
+
+    When ``incremental`` is set and a previous snapshot exists, only changes since
+    the last poll are downloaded and merged into it (see ``_fetch_resource``).
+    ``resources`` limits the poll to some resource types; the other sections of
+    the snapshot are carried over unchanged. With ``OPENSTACK_INVENTORY_DAEMON``
+    set (and ``use_daemon``), the daemon polls instead and its snapshot is copied.
+    ``quiet`` drops the "Updating cache" console line for frequent background polls.
     """
+    if use_daemon and get_daemon_client() and _poll_via_daemon(resources, verbose):
+        return
+    selected = [resource_name for resource_name in RESOURCES if not resources or resource_name in resources]
     log_entries = []
+    writer = None
 
     def _emit(message, console=None):
         timestamp = datetime.utcnow().isoformat()
@@ -24,51 +216,71 @@ def poll_openstack_resources(verbose=True, log_file=None):
         if verbose:
             _emit("[poll] Attempting to get OpenStack token...", console=True)
         else:
-            _emit("[poll] Updating cache from OpenStack...", console=True)
+            _emit("[poll] Updating cache from OpenStack...", console=not quiet)
 
         token = get_openstack_token()
-        headers = {"X-Auth-Token": token}
 
         if verbose:
             _emit("[poll] Token acquired successfully.", console=True)
 
-        resources = {
-            "flavors": "https://cloud-compute.uitiot.vn/v2.1/flavors/detail",
-            "images": "https://cloud-compute.uitiot.vn/v2.1/images",
-            "keypairs": "https://cloud-compute.uitiot.vn/v2.1/os-keypairs",
-            "networks": "https://cloud-network.uitiot.vn/v2.0/networks",
-            "servers": "https://cloud-compute.uitiot.vn/v2.1/servers/detail",
-            "security_groups": "https://cloud-network.uitiot.vn/v2.0/security-groups",
-            "routers": "https://cloud-network.uitiot.vn/v2.0/routers",
-            "subnets": "https://cloud-network.uitiot.vn/v2.0/subnets",
-            "floating_ips": "https://cloud-network.uitiot.vn/v2.0/floatingips",
-            "ports": "https://cloud-network.uitiot.vn/v2.0/ports"
-        }
-
-        all_data = {}
-
-        for resource_name, url in resources.items():
-            _emit(f"[poll] Polling {resource_name} from {url}...")
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                all_data[resource_name] = response.json()
-                _emit(f"[poll] Successfully fetched {resource_name}.")
-            else:
-                _emit(f"[poll] Failed to fetch {resource_name}. Status: {response.status_code}, Body: {response.text}")
-                all_data[resource_name] = None
-
-        output_filename = "openstack_data.json"
-        _emit(f"[poll] Writing all resource data to {output_filename}...", console=verbose)
-        with open(output_filename, "w", encoding='utf-8') as f:
-            json.dump(all_data, f, indent=2, ensure_ascii=False)
-        
+        previous_data = load_snapshot(resource_names=selected) if incremental else {}
+        poll_state = _load_json(POLL_STATE_FILE)
+        writer = open_snapshot_writer()
+        fetched = 0
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = []
+            for resource_name in selected:
+                url = RESOURCES[resource_name]
+                _emit(f"[poll] Polling {resource_name} from {url}...")
+                futures.append(
+                    executor.submit(
+                        _fetch_resource,
+                        resource_name,
+                        url,
+                        token,
+                        writer,
+                        previous_data.get(resource_name),
+                        poll_state.get(resource_name),
+                    )
+                )
+
+            for future in as_completed(futures):
+                resource_name, message, _, resource_state = future.result()
+                fetched += 1
+                poll_state[resource_name] = resource_state
+                _emit(message)
+
+        _emit(f"[poll] Fetched {fetched} resource types in {time.perf_counter() - started:.2f}s.")
+
+        # Another poll may commit while this one runs: carry sections over, commit and
+        # merge the change markers of the polled resources under one lock.
+        with snapshot_lock(writer.path):
+            if len(selected) < len(RESOURCES):
+                with SnapshotReader(writer.path) as reader:
+                    for resource_name in RESOURCES:
+                        if resource_name not in selected:
+                            writer.copy_section(resource_name, reader)
+
+            # Keep the historical key order of openstack_data.json regardless of completion order.
+            _emit(f"[poll] Writing all resource data to {writer.path}...", console=verbose)
+            writer.commit(list(RESOURCES))
+
+            saved_state = _load_json(POLL_STATE_FILE)
+            saved_state.update({resource_name: poll_state.get(resource_name) for resource_name in selected})
+            with open(f"{POLL_STATE_FILE}.tmp", "w", encoding="utf-8") as f:
+                json.dump(saved_state, f, indent=2)
+            os.replace(f"{POLL_STATE_FILE}.tmp", POLL_STATE_FILE)
+
         _emit("[poll] Polling complete. Data saved.", console=verbose)
 
     except Exception as e:
         _emit(f"[poll] An error occurred: {e}", console=True)
 
     finally:
+        if writer is not None:
+            writer.discard()
         if log_file and log_entries:
             try:
                 with open(log_file, "a", encoding="utf-8") as log_handle:
@@ -79,5 +291,19 @@ def poll_openstack_resources(verbose=True, log_file=None):
                 print(f"[poll] Warning: Failed to write poll log ({exc}).")
 
 
+def get_deleted_resources(resource_name):
+    """Return {id: deleted_at} for resources seen disappearing in recent polls."""
+    return dict(_load_json(POLL_STATE_FILE).get(resource_name, {}).get("deleted") or {})
+
+
 if __name__ == "__main__":
-    poll_openstack_resources()
+    parser = argparse.ArgumentParser(description="Poll OpenStack resources into the local snapshot (openstack_data.json or SQLite).")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only download changes since the last poll and merge them into the existing snapshot.",
+    )
+    args = parser.parse_args()
+    poll_openstack_resources(incremental=args.incremental)
+    print(metrics.format_summary())
+    write_prometheus()
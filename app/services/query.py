@@ -0,0 +1,94 @@
+import re
+
+from .http_client import COMPUTE_BASE_URL, NETWORK_BASE_URL
+from .pagination import PAGE_SIZE, CollectionPager
+from .snapshot import COLLECTION_KEYS
+
+# Neutron honours attribute filters and repeated ``fields=`` parameters on every list endpoint.
+NEUTRON_ENDPOINTS = {
+    "networks": f"{NETWORK_BASE_URL}/networks",
+    "subnets": f"{NETWORK_BASE_URL}/subnets",
+    "ports": f"{NETWORK_BASE_URL}/ports",
+    "routers": f"{NETWORK_BASE_URL}/routers",
+    "floating_ips": f"{NETWORK_BASE_URL}/floatingips",
+    "security_groups": f"{NETWORK_BASE_URL}/security-groups",
+}
+# Nova ignores ``fields=``; its summary listings (id and name only) are the small variant.
+NOVA_ENDPOINTS = {
+    "servers": (f"{COMPUTE_BASE_URL}/servers", f"{COMPUTE_BASE_URL}/servers/detail"),
+    "flavors": (f"{COMPUTE_BASE_URL}/flavors", f"{COMPUTE_BASE_URL}/flavors/detail"),
+}
+SUMMARY_FIELDS = {"id", "name"}
+
+_REGEX_SPECIALS = re.compile(r"([.^$*+?{}\[\]\\|()])")
+
+
+def _nova_name_pattern(names):
+    """Nova matches ``name`` as a regular expression; anchor and escape it for exact names."""
+    escaped = [_REGEX_SPECIALS.sub(r"\\\1", name) for name in names]
+    return f"^{escaped[0]}$" if len(escaped) == 1 else "^(" + "|".join(escaped) + ")$"
+
+
+def list_resources(resource_name, filters=None, fields=None, limit=None, token=None):
+    """
+    Query a Nova/Neutron list endpoint with server-side filters.
+
+    Filters become query parameters; a list value is sent as repeated
+    parameters, which Neutron treats as "any of". Neutron returns only
+    ``fields``. For Nova servers and flavors the summary listing is used when
+    ``fields`` only asks for id and name, and name filters are sent as an
+    anchored regex and re-checked locally, since Nova matches them loosely.
+
+    Args:
+        resource_name (str): Key from ``NEUTRON_ENDPOINTS`` or ``NOVA_ENDPOINTS``.
+        filters (dict, optional): Attribute filters, e.g. {"device_id": server_id}.
+        fields (list, optional): Attributes to return (Neutron) or that are needed (Nova).
+        limit (int, optional): Stop after this many matches.
+        token (str, optional): Keystone token; fetched via auth when omitted.
+
+    Returns:
+        list[dict]: Matching items.
+
+    Raises:
+        requests.RequestException: On transport failures.
+        PageFetchError: When the service answers with an error status.
+    """
+    params = {key: value for key, value in (filters or {}).items() if value is not None}
+    names = None
+    if resource_name in NEUTRON_ENDPOINTS:
+        url = NEUTRON_ENDPOINTS[resource_name]
+        if fields:
+            params["fields"] = list(fields)
+    elif resource_name in NOVA_ENDPOINTS:
+        summary_url, detail_url = NOVA_ENDPOINTS[resource_name]
+        url = summary_url if fields and set(fields) <= SUMMARY_FIELDS else detail_url
+        if "name" in params:
+            names = params["name"] if isinstance(params["name"], (list, tuple, set)) else [params["name"]]
+            names = set(names)
+            if not names:
+                return []
+            params["name"] = _nova_name_pattern(sorted(names))
+    else:
+        raise ValueError(f"No query endpoint for {resource_name}")
+
+    if token is None:
+        from .auth import get_openstack_token
+
+        token = get_openstack_token()
+
+    # The local name re-check can drop items, so only trust the limit for exact filters.
+    page_size = min(limit, PAGE_SIZE) if limit and names is None else PAGE_SIZE
+    pager = CollectionPager(url, token, COLLECTION_KEYS[resource_name], params=params, page_size=page_size)
+    matches = []
+    for page in pager:
+        if names is not None:
+            page = [item for item in page if item.get("name") in names]
+        matches.extend(page)
+        if limit and len(matches) >= limit:
+            return matches[:limit]
+    return matches
+
+
+def exists(resource_name, token=None, **filters):
+    """Return True if at least one resource matches ``filters`` (fetches a single ID)."""
+    return bool(list_resources(resource_name, filters, fields=["id", "name"], limit=1, token=token))
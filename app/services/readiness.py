@@ -0,0 +1,81 @@
+import time
+
+import requests
+
+from . import http_client
+from .http_client import COMPUTE_BASE_URL, NETWORK_BASE_URL
+
+# Overall budget for a new server's port to come up, and the backoff between checks.
+READY_TIMEOUT = 300.0
+INITIAL_DELAY = 0.5
+MAX_DELAY = 5.0
+BACKOFF_FACTOR = 1.5
+
+
+def _server_status(token, server_id):
+    response = http_client.get(f"{COMPUTE_BASE_URL}/servers/{server_id}", token=token)
+    if response.status_code == 200:
+        return response.json().get("server", {}).get("status")
+    if response.status_code == 404:
+        return "DELETED"
+    return None
+
+
+def _active_port(token, server_id):
+    response = http_client.get(
+        f"{NETWORK_BASE_URL}/ports", token=token, params={"device_id": server_id, "fields": ["id", "status"]}
+    )
+    if response.status_code != 200:
+        return None
+    for port in response.json().get("ports", []):
+        if port.get("id") and port.get("status") == "ACTIVE":
+            return port
+    return None
+
+
+def wait_for_server_port(token, server_id, timeout=READY_TIMEOUT, initial_delay=INITIAL_DELAY, max_delay=MAX_DELAY):
+    """
+    Wait until a server has an ACTIVE Neutron port.
+
+    The port is checked first on every round (it is what floating IP association
+    needs); the server itself is only queried to stop early if it went to ERROR
+    or disappeared. The delay between rounds grows by ``BACKOFF_FACTOR`` up to
+    ``max_delay``.
+
+    Args:
+        token (str): The OpenStack authentication token.
+        server_id (str): The Nova server ID.
+        timeout (float): Overall deadline in seconds.
+
+    Returns:
+        dict: The ACTIVE port, or None if the deadline passed or the server failed.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    delay = initial_delay
+    last_status = None
+    while True:
+        try:
+            port = _active_port(token, server_id)
+            if port:
+                print(
+                    f"[ports] Port {port['id']} for server {server_id} is ACTIVE "
+                    f"after {time.monotonic() - started:.1f}s."
+                )
+                return port
+            status = _server_status(token, server_id)
+            if status != last_status and status:
+                print(f"[ports] Server {server_id} status: {status}.")
+                last_status = status
+            if status in ("ERROR", "DELETED"):
+                print(f"[ports] Server {server_id} is {status}; giving up on port readiness.")
+                return None
+        except requests.RequestException as exc:
+            print(f"[ports] Exception while waiting for server {server_id}: {exc}")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            print(f"[ports] Timed out after {timeout:.0f}s waiting for an ACTIVE port on server {server_id}.")
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * BACKOFF_FACTOR, max_delay)
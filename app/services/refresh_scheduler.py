@@ -0,0 +1,197 @@
+import hashlib
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from . import events
+from .snapshot import COLLECTION_KEYS, load_section_bytes
+
+load_dotenv()
+
+# Base refresh interval per resource type, in seconds. Volatile resources come first.
+DEFAULT_TTLS = {
+    "servers": 15,
+    "ports": 15,
+    "floating_ips": 20,
+    "networks": 60,
+    "subnets": 60,
+    "routers": 60,
+    "security_groups": 120,
+    "images": 600,
+    "keypairs": 600,
+    "flavors": 1800,
+}
+# Set to 0 to refresh only on demand (Refresh button and after actions).
+AUTO_REFRESH = os.getenv("OPENSTACK_AUTO_REFRESH", "1") != "0"
+# Each refresh that finds nothing new (or fails) multiplies the interval by this factor...
+BACKOFF_FACTOR = 2.0
+# ...up to this multiple of the base TTL, and never beyond MAX_INTERVAL seconds.
+MAX_BACKOFF = 8
+MAX_INTERVAL = 3600.0
+# Resources due within this many seconds are folded into the same poll.
+BATCH_WINDOW = 5.0
+
+
+def parse_ttls(spec):
+    """
+    Parse ``OPENSTACK_REFRESH_TTLS`` ("servers=10,flavors=3600") into {resource: seconds}.
+
+    Unknown resource names and malformed entries are skipped with a warning.
+    """
+    ttls = {}
+    for entry in (spec or "").split(","):
+        if not entry.strip():
+            continue
+        name, _, value = entry.partition("=")
+        name = name.strip()
+        try:
+            seconds = float(value)
+        except ValueError:
+            seconds = None
+        if name not in COLLECTION_KEYS or not seconds or seconds <= 0:
+            print(f"[poll] Warning: Ignoring refresh TTL entry '{entry.strip()}'.")
+            continue
+        ttls[name] = seconds
+    return ttls
+
+
+REFRESH_TTLS = {**DEFAULT_TTLS, **parse_ttls(os.getenv("OPENSTACK_REFRESH_TTLS", ""))}
+
+
+class RefreshScheduler:
+    """
+    Keep the local snapshot fresh with per-resource, adaptive refresh intervals.
+
+    Every resource type starts at its base TTL. A refresh whose section came
+    back byte-for-byte identical (nothing changed, or the fetch failed and the
+    previous data was kept) doubles the interval, up to ``MAX_BACKOFF`` times
+    the TTL; a change resets it. Due resources are fetched together with one
+    incremental ``poll_openstack_resources`` call, and ``on_change`` is called
+    from the scheduler thread with the names of the sections that changed.
+    Resources published through ``events`` (after a create) are reset to
+    their base TTL, since activity tends to come in bursts.
+    """
+
+    def __init__(self, on_change=None, ttls=None, lock=None, log_file=None):
+        self.on_change = on_change
+        self.ttls = dict(ttls or REFRESH_TTLS)
+        self.lock = lock or threading.Lock()
+        self.log_file = log_file
+        now = time.monotonic()
+        self.intervals = dict(self.ttls)
+        self.due = {name: now + ttl for name, ttl in self.ttls.items()}
+        self.refreshes = {name: 0 for name in self.ttls}
+        self.changes = {name: 0 for name in self.ttls}
+        self._hashes = {}
+        self._state_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        for resource_name in self.ttls:
+            self._hashes[resource_name] = self._section_hash(resource_name)
+        events.subscribe(self._on_event)
+        self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+        volatile = min(self.ttls, key=self.ttls.get)
+        print(f"[poll] Auto-refresh started ({volatile} every {self.ttls[volatile]:g}s at most).")
+
+    def stop(self):
+        self._stopped = True
+        events.unsubscribe(self._on_event)
+        self._wakeup.set()
+
+    def touch(self, resource_name):
+        """Reset a resource to its base TTL, counting from now."""
+        with self._state_lock:
+            if resource_name not in self.ttls:
+                return
+            self.intervals[resource_name] = self.ttls[resource_name]
+            self.due[resource_name] = time.monotonic() + self.ttls[resource_name]
+        self._wakeup.set()
+
+    def _on_event(self, resource_name, item=None):
+        self.touch(resource_name)
+
+    def status(self):
+        """Return {resource: {"interval", "due_in", "refreshes", "changes"}} for display."""
+        now = time.monotonic()
+        with self._state_lock:
+            return {
+                name: {
+                    "interval": self.intervals[name],
+                    "due_in": max(0.0, self.due[name] - now),
+                    "refreshes": self.refreshes[name],
+                    "changes": self.changes[name],
+                }
+                for name in self.ttls
+            }
+
+    def _section_hash(self, resource_name):
+        try:
+            return hashlib.sha1(load_section_bytes(resource_name)).hexdigest()
+        except Exception:
+            return None
+
+    def _take_due(self):
+        """Return the resources due now (plus those due within BATCH_WINDOW) and the wait until the next one."""
+        now = time.monotonic()
+        with self._state_lock:
+            next_due = min(self.due.values())
+            if next_due > now:
+                return [], next_due - now
+            return sorted(name for name, due in self.due.items() if due <= now + BATCH_WINDOW), 0.0
+
+    def _run(self):
+        from .poll_resources import poll_openstack_resources
+
+        while not self._stopped:
+            due, wait = self._take_due()
+            if not due:
+                self._wakeup.wait(timeout=wait)
+                self._wakeup.clear()
+                continue
+            with self.lock:
+                try:
+                    poll_openstack_resources(
+                        verbose=False,
+                        log_file=self.log_file,
+                        incremental=True,
+                        resources=due,
+                        use_daemon=False,
+                        quiet=True,
+                    )
+                except Exception as exc:
+                    print(f"[poll] Error: Scheduled refresh of {', '.join(due)} failed: {exc}")
+                changed = []
+                for resource_name in due:
+                    digest = self._section_hash(resource_name)
+                    if digest != self._hashes.get(resource_name):
+                        changed.append(resource_name)
+                    self._hashes[resource_name] = digest
+            self._reschedule(due, changed)
+            if changed:
+                print(f"[poll] Auto-refresh: {', '.join(changed)} changed.")
+                if self.on_change:
+                    try:
+                        self.on_change(changed)
+                    except Exception as exc:
+                        print(f"Warning: Auto-refresh listener failed: {exc}")
+
+    def _reschedule(self, due, changed):
+        now = time.monotonic()
+        with self._state_lock:
+            for resource_name in due:
+                ttl = self.ttls[resource_name]
+                self.refreshes[resource_name] += 1
+                if resource_name in changed:
+                    self.changes[resource_name] += 1
+                    interval = ttl
+                else:
+                    backed_off = min(self.intervals[resource_name] * BACKOFF_FACTOR, ttl * MAX_BACKOFF, MAX_INTERVAL)
+                    interval = max(ttl, backed_off)
+                self.intervals[resource_name] = interval
+                self.due[resource_name] = now + interval
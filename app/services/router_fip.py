@@ -1,35 +1,25 @@
 import os
-import json
 import requests
 from dotenv import load_dotenv
 
-load_dotenv()
-
-NETWORK_BASE_URL = "https://cloud-network.uitiot.vn/v2.0"
+from . import events, http_client
+from .http_client import NETWORK_BASE_URL
 
+load_dotenv()
 
-def _network_headers(token):
-    return {
-        "X-Auth-Token": token,
-        "Content-Type": "application/json",
-    }
+# Network providing router gateways and floating IPs.
+EXTERNAL_NETWORK_ID = os.getenv("OPENSTACK_EXTERNAL_NETWORK_ID") or "c3455e8f-ea16-4f5d-ad5e-5c4292015a0d"
 
 
-def create_router(token, router_name, external_network_id=None, project_id=None):
-    """
-    Create a Neutron router attached to the external network.
-    """
+def build_router_payload(router_name, external_network_id=None, project_id=None):
+    """Build the Neutron create-router body shared by the blocking and async APIs."""
     project_id = project_id or os.getenv("OPENSTACK_PROJECT_ID")
     if not project_id:
         raise ValueError("Missing OPENSTACK_PROJECT_ID in environment.")
 
-    external_network_id = (
-        external_network_id
-        or os.getenv("OPENSTACK_EXTERNAL_NETWORK_ID")
-        or "c3455e8f-ea16-4f5d-ad5e-5c4292015a0d"
-    )
+    external_network_id = external_network_id or EXTERNAL_NETWORK_ID
 
-    payload = {
+    return {
         "router": {
             "name": router_name,
             "project_id": project_id,
@@ -40,12 +30,20 @@ def create_router(token, router_name, external_network_id=None, project_id=None)
         }
     }
 
+
+def create_router(token, router_name, external_network_id=None, project_id=None):
+    """
+    Create a Neutron router attached to the external network.
+    """
+    payload = build_router_payload(router_name, external_network_id, project_id)
+
     url = f"{NETWORK_BASE_URL}/routers"
     try:
-        response = requests.post(url, headers=_network_headers(token), data=json.dumps(payload))
+        response = http_client.post(url, token=token, json_body=payload)
         if response.status_code == 201:
             router = response.json().get("router", {})
             router_id = router.get("id")
+            events.publish("routers", router)
             print(f"[router] Created router '{router_name}' (ID: {router_id}).")
             return router_id
 
@@ -64,9 +62,11 @@ def add_subnet_interface(token, router_id, subnet_id):
     payload = {"subnet_id": subnet_id}
 
     try:
-        response = requests.put(url, headers=_network_headers(token), data=json.dumps(payload))
+        response = http_client.put(url, token=token, json_body=payload)
         if response.status_code in (200, 201):
             print(f"[router] Attached subnet {subnet_id} to router {router_id}.")
+            # The response describes the interface, not the new port.
+            events.publish("ports")
             return response.json()
 
         print(
@@ -79,6 +79,34 @@ def add_subnet_interface(token, router_id, subnet_id):
     return None
 
 
+def allocate_floating_ip(token, floating_network_id=None):
+    """
+    Allocate a new, unbound floating IP from the external network.
+
+    Returns:
+        dict: The floating IP document, or None on failure (e.g. quota exhausted).
+    """
+    url = f"{NETWORK_BASE_URL}/floatingips"
+    payload = {"floatingip": {"floating_network_id": floating_network_id or EXTERNAL_NETWORK_ID}}
+
+    try:
+        response = http_client.post(url, token=token, json_body=payload)
+        if response.status_code == 201:
+            floating_ip = response.json().get("floatingip", {})
+            events.publish("floating_ips", floating_ip)
+            print(
+                f"[floating-ip] Allocated floating IP {floating_ip.get('floating_ip_address')} "
+                f"(ID: {floating_ip.get('id')})."
+            )
+            return floating_ip
+
+        print(f"[floating-ip] Failed to allocate a floating IP. Status: {response.status_code}")
+        print(f"[floating-ip] Response: {response.text}")
+    except requests.RequestException as exc:
+        print(f"[floating-ip] Exception during allocation: {exc}")
+    return None
+
+
 def associate_floating_ip(token, floating_ip_id, port_id):
     """
     Associate a floating IP with a specific Neutron port.
@@ -87,10 +115,12 @@ def associate_floating_ip(token, floating_ip_id, port_id):
     payload = {"floatingip": {"port_id": port_id}}
 
     try:
-        response = requests.put(url, headers=_network_headers(token), data=json.dumps(payload))
+        response = http_client.put(url, token=token, json_body=payload)
         if response.status_code == 200:
             print(f"[floating-ip] Associated floating IP {floating_ip_id} with port {port_id}.")
-            return response.json()
+            association = response.json()
+            events.publish("floating_ips", association.get("floatingip"))
+            return association
 
         print(
             f"[floating-ip] Failed to associate floating IP {floating_ip_id}. "
@@ -102,15 +132,19 @@ def associate_floating_ip(token, floating_ip_id, port_id):
     return None
 
 
-def get_ports_for_device(token, device_id):
+def get_ports_for_device(token, device_id, fields=None):
     """
     Return Neutron ports that belong to a specific device (instance).
+
+    ``fields`` limits the attributes Neutron sends back (e.g. ("id", "status")).
     """
     url = f"{NETWORK_BASE_URL}/ports"
     params = {"device_id": device_id}
+    if fields:
+        params["fields"] = list(fields)
 
     try:
-        response = requests.get(url, headers={"X-Auth-Token": token}, params=params)
+        response = http_client.get(url, token=token, params=params)
         if response.status_code == 200:
             ports = response.json().get("ports", [])
             print(f"[ports] Fetched {len(ports)} port(s) for device {device_id}.")
@@ -121,3 +155,34 @@ def get_ports_for_device(token, device_id):
     except requests.RequestException as exc:
         print(f"[ports] Exception while fetching ports: {exc}")
     return []
+
+
+def get_ports_for_devices(token, device_ids, chunk_size=50, fields=None):
+    """
+    Return Neutron ports for many devices at once, grouped by device ID.
+
+    Neutron accepts repeated ``device_id`` filters, so one request covers a whole
+    chunk of instances instead of one request per instance. ``fields`` limits the
+    attributes returned; ``device_id`` is always included for the grouping.
+    """
+    fields = sorted(set(fields) | {"device_id"}) if fields else None
+    ports_by_device = {device_id: [] for device_id in device_ids}
+    url = f"{NETWORK_BASE_URL}/ports"
+    device_ids = list(device_ids)
+
+    for start in range(0, len(device_ids), chunk_size):
+        chunk = device_ids[start:start + chunk_size]
+        try:
+            params = {"device_id": chunk}
+            if fields:
+                params["fields"] = fields
+            response = http_client.get(url, token=token, params=params)
+            if response.status_code != 200:
+                print(f"[ports] Failed to fetch ports for {len(chunk)} device(s). Status: {response.status_code}")
+                print(f"[ports] Response: {response.text}")
+                continue
+            for port in response.json().get("ports", []):
+                ports_by_device.setdefault(port.get("device_id"), []).append(port)
+        except requests.RequestException as exc:
+            print(f"[ports] Exception while fetching ports: {exc}")
+    return ports_by_device
@@ -0,0 +1,475 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "gzip" stores the snapshot as openstack_data.json.gz, one gzip member per section.
+SNAPSHOT_COMPRESSION = os.getenv("OPENSTACK_SNAPSHOT_COMPRESSION", "").strip().lower()
+OUTPUT_FILE = "openstack_data.json.gz" if SNAPSHOT_COMPRESSION == "gzip" else "openstack_data.json"
+COMPRESS_LEVEL = 6
+COPY_CHUNK_SIZE = 1024 * 1024
+# The snapshot is read by programs, so items are written without optional whitespace.
+ITEM_SEPARATORS = (",", ":")
+# "json" keeps openstack_data.json; "sqlite" stores the inventory in OPENSTACK_SQLITE_PATH.
+STORE_BACKEND = os.getenv("OPENSTACK_STORE", "json").strip().lower()
+
+# Key of the item list inside each resource payload.
+COLLECTION_KEYS = {
+    "flavors": "flavors",
+    "images": "images",
+    "keypairs": "keypairs",
+    "networks": "networks",
+    "servers": "servers",
+    "security_groups": "security_groups",
+    "routers": "routers",
+    "subnets": "subnets",
+    "floating_ips": "floatingips",
+    "ports": "ports",
+}
+
+
+def manifest_path_for(path):
+    root, _ = os.path.splitext(path[:-3] if path.endswith(".gz") else path)
+    return f"{root}.manifest.json"
+
+
+def lock_path_for(path):
+    root, _ = os.path.splitext(path[:-3] if path.endswith(".gz") else path)
+    return f"{root}.lock"
+
+
+_process_lock = threading.RLock()
+
+
+@contextmanager
+def snapshot_lock(path=OUTPUT_FILE):
+    """
+    Serialize snapshot rewrites between threads and processes.
+
+    Polls that carry sections over, commit and update poll state hold this
+    lock, so one poll cannot overwrite another's sections or change markers.
+    """
+    with _process_lock:
+        with open(lock_path_for(path), "a+b") as handle:
+            if fcntl:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _encode_item(item):
+    return json.dumps(item, ensure_ascii=False, separators=ITEM_SEPARATORS)
+
+
+def _write_member(out, data):
+    """Write ``data`` to ``out`` as one complete gzip member."""
+    out.write(gzip.compress(data, COMPRESS_LEVEL))
+
+
+def _copy_member(source, out):
+    """Stream a file into ``out`` as one gzip member."""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in iter(lambda: source.read(COPY_CHUNK_SIZE), b""):
+        out.write(compressor.compress(chunk))
+    out.write(compressor.flush())
+
+
+class SnapshotWriter:
+    """
+    Assemble ``openstack_data.json`` from per-resource sections.
+
+    Each section is streamed item by item into a spool file next to the
+    snapshot, so a resource with many pages never has to be held in memory.
+    ``commit()`` stitches the spools together in the requested key order,
+    atomically replaces the previous snapshot and writes a small manifest with
+    the byte range of every section so readers can load sections lazily.
+
+    For a ``.gz`` path every section (and every separator between them) is
+    written as its own gzip member. The file as a whole is still an ordinary
+    gzip stream of the JSON document, and each manifest byte range is a
+    member that decompresses on its own.
+    """
+
+    def __init__(self, path=OUTPUT_FILE):
+        self.path = path
+        self._directory = os.path.dirname(os.path.abspath(path))
+        self.compressed = path.endswith(".gz")
+        self._sections = {}
+        self._counts = {}
+        self._precompressed = set()
+        self._lock = threading.Lock()
+
+    def _new_spool(self, resource_name, binary=False):
+        fd, spool_path = tempfile.mkstemp(prefix=f".{resource_name}.", suffix=".part", dir=self._directory)
+        if binary:
+            return os.fdopen(fd, "wb"), spool_path
+        return os.fdopen(fd, "w", encoding="utf-8"), spool_path
+
+    def _set_section(self, resource_name, spool_path, count=None, precompressed=False):
+        with self._lock:
+            previous = self._sections.get(resource_name)
+            self._sections[resource_name] = spool_path
+            self._counts[resource_name] = count
+            if precompressed:
+                self._precompressed.add(resource_name)
+            else:
+                self._precompressed.discard(resource_name)
+        if previous:
+            os.remove(previous)
+
+    def write_section(self, resource_name, collection_key, pages):
+        """
+        Stream an iterable of item pages into the section for ``resource_name``.
+
+        The spool holds the header, each item and the footer on separate lines.
+
+        Returns:
+            int: Number of items written.
+        """
+        handle, spool_path = self._new_spool(resource_name)
+        count = 0
+        try:
+            with handle:
+                handle.write("{" + json.dumps(collection_key) + ":[")
+                for page in pages:
+                    for item in page:
+                        handle.write(",\n" if count else "\n")
+                        handle.write(_encode_item(item))
+                        count += 1
+                handle.write("\n]}")
+        except BaseException:
+            os.remove(spool_path)
+            raise
+        self._set_section(resource_name, spool_path, count)
+        return count
+
+    def write_payload(self, resource_name, payload):
+        """Store an already materialized payload (or None for a failed resource)."""
+        if payload is None:
+            self._set_section(resource_name, None)
+            return
+        collection_key = COLLECTION_KEYS[resource_name]
+        self.write_section(resource_name, collection_key, [payload.get(collection_key) or []])
+
+    def write_raw_section(self, resource_name, raw, count=None, precompressed=False):
+        """
+        Store a section that is already encoded in the spool format (b"null" marks a failure).
+
+        With ``precompressed``, ``raw`` is a gzip member copied verbatim into a ``.gz`` snapshot.
+        """
+        if raw == b"null":
+            self._set_section(resource_name, None)
+            return
+        handle, spool_path = self._new_spool(resource_name, binary=True)
+        try:
+            with handle:
+                handle.write(raw)
+        except BaseException:
+            os.remove(spool_path)
+            raise
+        self._set_section(resource_name, spool_path, count, precompressed)
+
+    def copy_section(self, resource_name, reader):
+        """
+        Carry a section over from an existing snapshot, byte for byte when possible.
+
+        Open ``reader`` (``with SnapshotReader(path) as reader``) when copying
+        several sections, so they all come from the same file even if another
+        poll replaces it meanwhile.
+        """
+        if not reader.exists():
+            self._set_section(resource_name, None)
+            return
+        if self.compressed and reader.compressed:
+            member = reader.read_section_bytes(resource_name, decompress=False)
+            if member is not None:
+                self.write_raw_section(resource_name, member, reader.item_count(resource_name), precompressed=True)
+                return
+        raw = reader.read_section_bytes(resource_name)
+        if raw is None:
+            self.write_payload(resource_name, reader.read_section(resource_name))
+            return
+        self.write_raw_section(resource_name, raw, reader.item_count(resource_name))
+
+    def commit(self, order):
+        """Write sections in ``order`` to the snapshot file and clean up the spools."""
+        fd, tmp_path = tempfile.mkstemp(prefix=".openstack_data.", suffix=".tmp", dir=self._directory)
+        sections = {}
+        try:
+            with os.fdopen(fd, "wb") as out:
+                write = (lambda data: _write_member(out, data)) if self.compressed else out.write
+                write(b"{")
+                for index, resource_name in enumerate(order):
+                    write((",\n" if index else "\n").encode("utf-8") + f"{json.dumps(resource_name)}: ".encode("utf-8"))
+                    spool_path = self._sections.get(resource_name)
+                    offset = out.tell()
+                    if not spool_path:
+                        write(b"null")
+                        sections[resource_name] = {"offset": offset, "length": out.tell() - offset, "items": None}
+                        continue
+                    with open(spool_path, "rb") as section:
+                        if self.compressed and resource_name not in self._precompressed:
+                            _copy_member(section, out)
+                        else:
+                            shutil.copyfileobj(section, out)
+                    sections[resource_name] = {
+                        "offset": offset,
+                        "length": out.tell() - offset,
+                        "items": self._counts.get(resource_name),
+                    }
+                write(b"\n}\n")
+            os.replace(tmp_path, self.path)
+            self._write_manifest(sections)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            self.discard()
+
+    def _write_manifest(self, sections):
+        stat = os.stat(self.path)
+        manifest = {
+            "version": time.time_ns(),
+            "snapshot": os.path.basename(self.path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "compression": "gzip" if self.compressed else None,
+            "sections": sections,
+        }
+        manifest_path = manifest_path_for(self.path)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    def discard(self):
+        """Remove any spool files that were not committed."""
+        with self._lock:
+            spools = [path for path in self._sections.values() if path]
+            self._sections = {}
+            self._counts = {}
+            self._precompressed = set()
+        for spool_path in spools:
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+
+
+class SnapshotReader:
+    """
+    Read individual resource sections of ``openstack_data.json``.
+
+    When the manifest matches the snapshot on disk, a section is loaded by
+    seeking to its byte range, so callers only pay for what they read. Without
+    a usable manifest (older snapshots, hand edits) the whole file is parsed
+    once and served from memory.
+    """
+
+    def __init__(self, path=OUTPUT_FILE):
+        self.path = path
+        self.manifest = self._load_manifest()
+        self._full = None
+        self._handle = None
+        self._pinned = False
+
+    def _load_manifest(self, stat=None):
+        try:
+            with open(manifest_path_for(self.path), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            stat = stat or os.stat(self.path)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not self._matches(manifest, stat):
+            return None
+        return manifest
+
+    @staticmethod
+    def _matches(manifest, stat):
+        return bool(manifest) and manifest.get("size") == stat.st_size and manifest.get("mtime_ns") == stat.st_mtime_ns
+
+    def open(self):
+        """
+        Pin the snapshot file currently on disk.
+
+        Until ``close()``, every read comes from this one handle, checked
+        against the manifest with ``fstat``, so a snapshot replaced by another
+        poll cannot be read at stale offsets.
+        """
+        self.close()
+        self._pinned = True
+        self._full = None
+        try:
+            self._handle = open(self.path, "rb")
+        except OSError:
+            self.manifest = None
+            return self
+        self.manifest = self._load_manifest(os.fstat(self._handle.fileno()))
+        return self
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+        self._handle = None
+        self._pinned = False
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def version(self):
+        """Identifier that changes whenever the snapshot is rewritten (None if absent)."""
+        if self.manifest:
+            return self.manifest["version"]
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def exists(self):
+        if self._pinned:
+            return self._handle is not None
+        return os.path.exists(self.path)
+
+    def item_count(self, resource_name):
+        """Item count recorded in the manifest, or None if unknown."""
+        if not self.manifest:
+            return None
+        return self.manifest["sections"].get(resource_name, {}).get("items")
+
+    @staticmethod
+    def _parse(f):
+        compressed = f.read(2) == b"\x1f\x8b"
+        f.seek(0)
+        if compressed:
+            with gzip.GzipFile(fileobj=f) as unzipped:
+                return json.load(unzipped)
+        return json.load(f)
+
+    def _load_full(self):
+        if self._full is None:
+            if self._handle is not None:
+                self._handle.seek(0)
+                self._full = self._parse(self._handle)
+            else:
+                with open(self.path, "rb") as f:
+                    self._full = self._parse(f)
+        return self._full
+
+    @property
+    def compressed(self):
+        """Whether the manifest describes per-section gzip members."""
+        return bool(self.manifest and self.manifest.get("compression") == "gzip")
+
+    def read_section_bytes(self, resource_name, decompress=True):
+        """
+        Return the raw bytes of a section, or None when there is no usable manifest.
+
+        For a compressed snapshot the gzip member is returned as stored when ``decompress`` is False.
+        An unpinned reader checks the file against the manifest before every read and
+        drops the manifest (falling back to a full parse) once the snapshot was replaced.
+        """
+        section = self.manifest["sections"].get(resource_name) if self.manifest else None
+        if section is None:
+            return None
+        if self._handle is not None:
+            self._handle.seek(section["offset"])
+            raw = self._handle.read(section["length"])
+        else:
+            with open(self.path, "rb") as f:
+                if not self._matches(self.manifest, os.fstat(f.fileno())):
+                    self.manifest = None
+                    return None
+                f.seek(section["offset"])
+                raw = f.read(section["length"])
+        return gzip.decompress(raw) if decompress and self.compressed else raw
+
+    def read_section(self, resource_name):
+        """
+        Return the payload for one resource, or None if missing/failed.
+
+        Raises:
+            OSError, json.JSONDecodeError: When the snapshot cannot be read.
+        """
+        raw = self.read_section_bytes(resource_name)
+        if raw is None:
+            return self._load_full().get(resource_name)
+        return json.loads(raw.decode("utf-8"))
+
+
+def encode_section(resource_name, payload):
+    """Encode a payload in the line-per-item section format used by ``SnapshotWriter``."""
+    if payload is None:
+        return b"null"
+    collection_key = COLLECTION_KEYS[resource_name]
+    items = payload.get(collection_key) or []
+    lines = ["{" + json.dumps(collection_key) + ":["]
+    lines.append(",\n".join(_encode_item(item) for item in items))
+    return ("\n".join(lines) + "\n]}" if items else lines[0] + "\n]}").encode("utf-8")
+
+
+def open_snapshot_writer(path=OUTPUT_FILE):
+    """Return the writer for the configured store backend."""
+    if STORE_BACKEND == "sqlite":
+        from .sqlite_store import SqliteSnapshotWriter, get_store
+
+        return SqliteSnapshotWriter(get_store())
+    return SnapshotWriter(path)
+
+
+def load_snapshot(path=OUTPUT_FILE, resource_names=None):
+    """
+    Return the last stored snapshot as {resource_name: payload}, or {} if unavailable.
+
+    Only the sections in ``resource_names`` are read when it is given.
+    """
+    resource_names = list(resource_names or COLLECTION_KEYS)
+    if STORE_BACKEND == "sqlite":
+        from .sqlite_store import get_store
+
+        store = get_store()
+        return {resource_name: store.payload(resource_name) for resource_name in resource_names}
+    reader = SnapshotReader(path)
+    if not reader.exists():
+        return {}
+    try:
+        return {resource_name: reader.read_section(resource_name) for resource_name in resource_names}
+    except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+        return {}
+
+
+def load_section_bytes(resource_name, path=OUTPUT_FILE):
+    """Return one stored section in the line-per-item encoding (cheap to hash or serve)."""
+    if STORE_BACKEND != "sqlite":
+        reader = SnapshotReader(path)
+        raw = reader.read_section_bytes(resource_name) if reader.exists() else None
+        if raw is not None:
+            return raw
+    return encode_section(resource_name, load_snapshot(path, [resource_name]).get(resource_name))
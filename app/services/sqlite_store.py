@@ -0,0 +1,272 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+from .snapshot import COLLECTION_KEYS, SnapshotWriter
+
+load_dotenv()
+
+SQLITE_PATH = os.getenv("OPENSTACK_SQLITE_PATH", "openstack_data.db")
+BUSY_TIMEOUT_MS = 10000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    network_id TEXT,
+    device_id TEXT,
+    port_id TEXT,
+    position INTEGER NOT NULL,
+    generation INTEGER NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_name ON {table} (name);
+CREATE INDEX IF NOT EXISTS idx_{table}_network_id ON {table} (network_id);
+CREATE INDEX IF NOT EXISTS idx_{table}_device_id ON {table} (device_id);
+CREATE INDEX IF NOT EXISTS idx_{table}_port_id ON {table} (port_id);
+"""
+
+_META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resource_meta (
+    resource TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+def _row_for(resource_name, item, position, generation):
+    if resource_name == "keypairs":
+        # Key pairs are wrapped and have no id; their name is unique per user.
+        inner = item.get("keypair", item)
+        item_id = inner.get("name")
+        name = inner.get("name")
+    else:
+        inner = item
+        item_id = item.get("id")
+        name = item.get("name")
+    return (
+        item_id,
+        name,
+        inner.get("network_id") or inner.get("floating_network_id"),
+        inner.get("device_id"),
+        inner.get("port_id"),
+        position,
+        generation,
+        json.dumps(item, ensure_ascii=False),
+    )
+
+
+class SqliteStore:
+    """
+    SQLite-backed inventory: one table per resource type with indexed id, name,
+    network_id, device_id and port_id columns next to the raw JSON document.
+
+    WAL mode lets the GUI read while a CLI poll writes. Connections are kept
+    per thread.
+    """
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            conn.executescript(_META_SCHEMA)
+            for resource_name in COLLECTION_KEYS:
+                conn.executescript(_SCHEMA.format(table=resource_name))
+            self._schema_ready = True
+
+    # -- writes ------------------------------------------------------------
+
+    def write_resources(self, sections):
+        """
+        Replace resources in a single transaction.
+
+        Args:
+            sections (dict): resource_name -> iterable of items, or None to mark the
+                resource as failed while keeping its previous rows.
+        """
+        conn = self.connection()
+        now = datetime.now(timezone.utc).isoformat()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for resource_name, items in sections.items():
+                row = conn.execute(
+                    "SELECT generation FROM resource_meta WHERE resource = ?", (resource_name,)
+                ).fetchone()
+                generation = (row[0] if row else 0) + 1
+                if items is None:
+                    conn.execute(
+                        "INSERT INTO resource_meta (resource, status, generation, updated_at) VALUES (?, 'failed', ?, ?) "
+                        "ON CONFLICT(resource) DO UPDATE SET status = 'failed', updated_at = excluded.updated_at",
+                        (resource_name, generation - 1, now),
+                    )
+                    continue
+                conn.executemany(
+                    f"INSERT INTO {resource_name} (id, name, network_id, device_id, port_id, position, generation, doc) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET name = excluded.name, network_id = excluded.network_id, "
+                    "device_id = excluded.device_id, port_id = excluded.port_id, position = excluded.position, "
+                    "generation = excluded.generation, doc = excluded.doc",
+                    (
+                        _row_for(resource_name, item, position, generation)
+                        for position, item in enumerate(items)
+                    ),
+                )
+                conn.execute(f"DELETE FROM {resource_name} WHERE generation != ?", (generation,))
+                conn.execute(
+                    "INSERT INTO resource_meta (resource, status, generation, updated_at) VALUES (?, 'ok', ?, ?) "
+                    "ON CONFLICT(resource) DO UPDATE SET status = 'ok', generation = excluded.generation, "
+                    "updated_at = excluded.updated_at",
+                    (resource_name, generation, now),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def upsert_items(self, resource_name, items):
+        """Insert or update individual items without touching the rest of the table."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT generation FROM resource_meta WHERE resource = ?", (resource_name,)
+            ).fetchone()
+            generation = row[0] if row else 0
+            position = conn.execute(f"SELECT COALESCE(MAX(position), -1) FROM {resource_name}").fetchone()[0]
+            conn.executemany(
+                f"INSERT INTO {resource_name} (id, name, network_id, device_id, port_id, position, generation, doc) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, network_id = excluded.network_id, "
+                "device_id = excluded.device_id, port_id = excluded.port_id, doc = excluded.doc",
+                (
+                    _row_for(resource_name, item, position + offset, generation)
+                    for offset, item in enumerate(items, start=1)
+                ),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # -- reads -------------------------------------------------------------
+
+    def version(self):
+        """A value that changes whenever any resource is rewritten."""
+        row = self.connection().execute(
+            "SELECT COALESCE(SUM(generation), 0), COALESCE(MAX(updated_at), '') FROM resource_meta"
+        ).fetchone()
+        return tuple(row)
+
+    def has_data(self):
+        return self.connection().execute("SELECT 1 FROM resource_meta WHERE status = 'ok' LIMIT 1").fetchone() is not None
+
+    def _docs(self, sql, params=()):
+        return [json.loads(row[0]) for row in self.connection().execute(sql, params)]
+
+    def items(self, resource_name):
+        return self._docs(f"SELECT doc FROM {resource_name} ORDER BY position")
+
+    def payload(self, resource_name):
+        """Return the resource in snapshot form ({collection_key: [...]}) or None."""
+        if self.connection().execute(
+            "SELECT 1 FROM resource_meta WHERE resource = ?", (resource_name,)
+        ).fetchone() is None:
+            return None
+        return {COLLECTION_KEYS[resource_name]: self.items(resource_name)}
+
+    def get(self, resource_name, item_id):
+        docs = self._docs(f"SELECT doc FROM {resource_name} WHERE id = ?", (item_id,))
+        return docs[0] if docs else None
+
+    def find_by_name(self, resource_name, name):
+        docs = self._docs(
+            f"SELECT doc FROM {resource_name} WHERE name = ? ORDER BY position LIMIT 1", (name,)
+        )
+        return docs[0] if docs else None
+
+    def ports_for_device(self, device_id):
+        return self._docs("SELECT doc FROM ports WHERE device_id = ? ORDER BY position", (device_id,))
+
+    def unassociated_floating_ips(self):
+        return self._docs(
+            "SELECT doc FROM floating_ips WHERE port_id IS NULL OR port_id = '' ORDER BY position"
+        )
+
+
+class SqliteSnapshotWriter(SnapshotWriter):
+    """
+    Drop-in replacement for ``SnapshotWriter`` that commits the poll into SQLite.
+
+    Sections are still spooled to disk while pages arrive from the worker
+    threads; ``commit()`` streams the spooled items into the store in one
+    transaction instead of rewriting a JSON file.
+    """
+
+    def __init__(self, store):
+        super().__init__(store.path)
+        self.store = store
+
+    @staticmethod
+    def _iter_spooled_items(spool_path):
+        # write_section() puts the header, each item and the footer on their own lines.
+        with open(spool_path, "r", encoding="utf-8") as section:
+            for line in section:
+                line = line.rstrip("\n").rstrip(",")
+                if line.startswith("{") and line.endswith("["):
+                    continue
+                if line == "]}":
+                    break
+                yield json.loads(line)
+
+    def copy_section(self, resource_name, reader):
+        # Rows for resources that were not polled are already in the store.
+        pass
+
+    def commit(self, order):
+        try:
+            sections = {}
+            for resource_name in order:
+                if resource_name not in self._sections:
+                    continue
+                spool_path = self._sections.get(resource_name)
+                sections[resource_name] = self._iter_spooled_items(spool_path) if spool_path else None
+            self.store.write_resources(sections)
+        finally:
+            self.discard()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide SQLite store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SqliteStore()
+    return _store
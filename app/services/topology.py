@@ -0,0 +1,302 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dotenv import load_dotenv
+
+from .auth import get_openstack_token
+from .batch_provision import expand_names
+from .create_instance import create_instance
+from .create_net_subnet import create_network, create_subnet
+from .poll_resources import poll_openstack_resources
+from .router_fip import add_subnet_interface, create_router
+from ..utils.inventory import get_inventory
+
+load_dotenv()
+
+TOPOLOGY_CONCURRENCY = int(os.getenv("OPENSTACK_TOPOLOGY_CONCURRENCY", "10"))
+
+
+class TopologyError(ValueError):
+    """Raised when a manifest is invalid or references unknown resources."""
+
+
+class _Task:
+    def __init__(self, key, deps, action):
+        self.key = key
+        self.deps = list(deps)
+        self.action = action
+
+    @property
+    def label(self):
+        return " ".join(self.key)
+
+
+def _resolve_existing(inventory, resource_name, name_or_id):
+    """Return the ID for an existing resource referenced by name or ID."""
+    if inventory.get(resource_name, name_or_id):
+        return name_or_id
+    return inventory.id_for_name(resource_name, name_or_id)
+
+
+def _find_subnet(inventory, name, network_id):
+    """Return the ID of the subnet called ``name`` on ``network_id`` (names repeat across networks)."""
+    for subnet in inventory.items("subnets"):
+        if subnet.get("name") == name and subnet.get("network_id") == network_id:
+            return subnet.get("id")
+    return None
+
+
+def _subnet_attached(inventory, router_id, subnet_id):
+    for port in inventory.ports_for_device(router_id):
+        if any(ip.get("subnet_id") == subnet_id for ip in port.get("fixed_ips", [])):
+            return True
+    return False
+
+
+def build_tasks(manifest, token, inventory=None):
+    """
+    Translate a manifest into tasks keyed by (kind, name[, ...]).
+
+    A subnet depends on its network, a router interface on its router and
+    subnet, and an instance on its network's subnets (it needs one for a port).
+    Each task reuses a same-named resource from the inventory if one exists
+    (for a subnet, a same-named one on the same network).
+
+    Raises:
+        TopologyError: On duplicate names or references that are neither in the
+            manifest nor in the inventory.
+    """
+    inventory = inventory or get_inventory()
+    tasks = {}
+
+    def _add(task):
+        if task.key in tasks:
+            raise TopologyError(f"Duplicate {task.key[0]} '{task.key[1]}' in manifest.")
+        tasks[task.key] = task
+
+    def _id_of(results, key, resource_name):
+        # Dependencies in the manifest were resolved by the executor; others come from the inventory.
+        return results.get(key) or _resolve_existing(inventory, resource_name, key[1])
+
+    subnets_by_network = {}
+
+    for network in manifest.get("networks", []):
+        net_name = network["name"]
+        net_key = ("network", net_name)
+
+        def _network_action(results, net_name=net_name):
+            existing = inventory.id_for_name("networks", net_name)
+            if existing:
+                print(f"Info: Reusing existing network '{net_name}' ({existing}).")
+                return existing
+            return create_network(token, net_name)
+
+        _add(_Task(net_key, [], _network_action))
+
+        for subnet in network.get("subnets", []):
+            subnet_name, cidr = subnet["name"], subnet["cidr"]
+            subnet_key = ("subnet", subnet_name)
+            subnets_by_network.setdefault(net_name, []).append(subnet_key)
+
+            def _subnet_action(results, subnet_name=subnet_name, cidr=cidr, net_key=net_key):
+                existing = _find_subnet(inventory, subnet_name, results[net_key])
+                if existing:
+                    print(f"Info: Reusing existing subnet '{subnet_name}' ({existing}).")
+                    return existing
+                return create_subnet(token, subnet_name, results[net_key], cidr)
+
+            _add(_Task(subnet_key, [net_key], _subnet_action))
+
+    for router in manifest.get("routers", []):
+        router_name = router["name"]
+        router_key = ("router", router_name)
+        external_network_id = router.get("external_network_id")
+
+        def _router_action(results, router_name=router_name, external_network_id=external_network_id):
+            existing = inventory.id_for_name("routers", router_name)
+            if existing:
+                print(f"Info: Reusing existing router '{router_name}' ({existing}).")
+                return existing
+            return create_router(token, router_name, external_network_id=external_network_id)
+
+        _add(_Task(router_key, [], _router_action))
+
+        for subnet_name in router.get("subnets", []):
+            subnet_key = ("subnet", subnet_name)
+            deps = [router_key]
+            if subnet_key in tasks:
+                deps.append(subnet_key)
+            elif not _resolve_existing(inventory, "subnets", subnet_name):
+                raise TopologyError(f"Router '{router_name}' references unknown subnet '{subnet_name}'.")
+
+            def _interface_action(results, router_key=router_key, subnet_key=subnet_key):
+                router_id = results[router_key]
+                subnet_id = _id_of(results, subnet_key, "subnets")
+                if _subnet_attached(inventory, router_id, subnet_id):
+                    print(f"Info: Subnet '{subnet_key[1]}' already attached to router '{router_key[1]}'.")
+                    return subnet_id
+                return subnet_id if add_subnet_interface(token, router_id, subnet_id) else None
+
+            _add(_Task(("interface", router_name, subnet_name), deps, _interface_action))
+
+    for instance in manifest.get("instances", []):
+        count = int(instance.get("count", 1))
+        names = expand_names(instance["name"], count) if count > 1 else [instance["name"]]
+        network_name = instance["network"]
+        net_key = ("network", network_name)
+        if net_key in tasks:
+            # A server needs a subnet on its network to get a port.
+            deps = [net_key] + subnets_by_network.get(network_name, [])
+        elif _resolve_existing(inventory, "networks", network_name):
+            deps = []
+        else:
+            raise TopologyError(f"Instance '{instance['name']}' references unknown network '{network_name}'.")
+
+        image_id = _resolve_existing(inventory, "images", instance["image"])
+        flavor_id = _resolve_existing(inventory, "flavors", instance["flavor"])
+        if not image_id or not flavor_id:
+            raise TopologyError(
+                f"Instance '{instance['name']}' references unknown image/flavor "
+                f"'{instance['image']}'/'{instance['flavor']}'."
+            )
+        user_data = instance.get("user_data")
+
+        for name in names:
+            def _instance_action(results, name=name, net_key=net_key, image_id=image_id, flavor_id=flavor_id,
+                                 user_data=user_data):
+                existing = inventory.id_for_name("servers", name)
+                if existing:
+                    print(f"Info: Reusing existing instance '{name}' ({existing}).")
+                    return existing
+                network_id = _id_of(results, net_key, "networks")
+                return create_instance(token, name, image_id, flavor_id, network_id, user_data=user_data)
+
+            _add(_Task(("instance", name), deps, _instance_action))
+
+    for task in tasks.values():
+        for dep in task.deps:
+            if dep not in tasks:
+                raise TopologyError(f"Task '{task.label}' depends on unknown '{' '.join(dep)}'.")
+    return tasks
+
+
+def execution_levels(tasks):
+    """Group tasks into levels where each level only depends on earlier ones."""
+    remaining = dict(tasks)
+    done = set()
+    levels = []
+    while remaining:
+        level = [key for key, task in remaining.items() if all(dep in done for dep in task.deps)]
+        if not level:
+            raise TopologyError(f"Dependency cycle among: {', '.join(' '.join(key) for key in remaining)}")
+        levels.append(level)
+        for key in level:
+            del remaining[key]
+        done.update(level)
+    return levels
+
+
+def execute_tasks(tasks, max_workers=TOPOLOGY_CONCURRENCY):
+    """
+    Run tasks as soon as their dependencies have succeeded.
+
+    Returns:
+        tuple: (results {key: id}, failed set of keys, timings {key: seconds})
+    """
+    execution_levels(tasks)  # fail fast on cycles before creating anything
+    pending = dict(tasks)
+    results = {}
+    failed = set()
+    timings = {}
+
+    def _run(task):
+        started = time.monotonic()
+        resource_id = task.action(results)
+        return resource_id, time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        running = {}
+        while pending or running:
+            for key, task in list(pending.items()):
+                if any(dep in failed for dep in task.deps):
+                    print(f"Warning: Skipping {task.label} because a dependency failed.")
+                    failed.add(key)
+                    del pending[key]
+            for key, task in list(pending.items()):
+                if all(dep in results for dep in task.deps):
+                    del pending[key]
+                    running[executor.submit(_run, task)] = task
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                try:
+                    resource_id, elapsed = future.result()
+                except Exception as exc:
+                    print(f"Error: {task.label} raised {exc}")
+                    resource_id, elapsed = None, None
+                timings[task.key] = elapsed
+                if resource_id:
+                    results[task.key] = resource_id
+                else:
+                    print(f"Warning: {task.label} failed.")
+                    failed.add(task.key)
+    return results, failed, timings
+
+
+def apply_topology(manifest, token=None, max_workers=TOPOLOGY_CONCURRENCY, dry_run=False):
+    """
+    Build and execute a manifest, reusing resources already in the inventory.
+
+    Without a stored inventory (e.g. a first run from the command line) OpenStack
+    is polled first, so images, flavors and existing resources can be resolved.
+
+    Returns:
+        tuple: (results, failed, timings) as returned by ``execute_tasks``.
+    """
+    token = token or get_openstack_token()
+    inventory = get_inventory()
+    if not inventory.loaded:
+        print("Info: No inventory snapshot found; polling OpenStack before resolving the manifest...")
+        poll_openstack_resources(verbose=False)
+        inventory.refresh(force=True)
+    tasks = build_tasks(manifest, token, inventory)
+    levels = execution_levels(tasks)
+    print(f"--> Topology: {len(tasks)} task(s) in {len(levels)} dependency level(s).")
+    if dry_run:
+        for depth, level in enumerate(levels, start=1):
+            print(f"    level {depth}: {', '.join(' '.join(key) for key in level)}")
+        return {}, set(), {}
+
+    started = time.monotonic()
+    results, failed, timings = execute_tasks(tasks, max_workers=max_workers)
+    elapsed = time.monotonic() - started
+    serial = sum(value for value in timings.values() if value)
+    print(
+        f"--> Topology applied in {elapsed:.1f}s (sequential would take ~{serial:.1f}s): "
+        f"{len(results)} succeeded, {len(failed)} failed or skipped."
+    )
+    return results, failed, timings
+
+
+def load_manifest(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply a JSON topology manifest to OpenStack.")
+    parser.add_argument("manifest", help="Path to the topology manifest (JSON).")
+    parser.add_argument("--workers", type=int, default=TOPOLOGY_CONCURRENCY, help="Maximum concurrent API calls.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the execution plan without creating anything.")
+    args = parser.parse_args()
+
+    _, failed_tasks, _ = apply_topology(load_manifest(args.manifest), max_workers=args.workers, dry_run=args.dry_run)
+    if not args.dry_run:
+        poll_openstack_resources(verbose=False, incremental=True)
+    raise SystemExit(1 if failed_tasks else 0)
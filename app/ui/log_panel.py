@@ -1,11 +1,15 @@
 import customtkinter
 
+from .logging import LOG_TAGS
+
+ALL_TAGS_OPTION = "All"
+
 
 class LogPanel:
-    def __init__(self, master, on_refresh, on_clear, on_save):
+    def __init__(self, master, on_refresh, on_clear, on_save, on_filter=None):
         self.frame = customtkinter.CTkFrame(master)
         self.frame.grid(row=0, column=1, sticky="nsew", padx=(5, 10), pady=10)
-        self.frame.grid_rowconfigure(1, weight=1)
+        self.frame.grid_rowconfigure(2, weight=1)
         self.frame.grid_columnconfigure(0, weight=1)
         self.frame.grid_columnconfigure(1, weight=0)
         self.frame.grid_columnconfigure(2, weight=0)
@@ -23,8 +27,37 @@ class LogPanel:
         self.save_button = customtkinter.CTkButton(self.frame, text="Save", command=on_save, width=80)
         self.save_button.grid(row=0, column=3, padx=5, pady=(10, 5), sticky="e")
 
+        self.search_entry = customtkinter.CTkEntry(self.frame, placeholder_text="Search logs")
+        self.search_entry.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+
+        self.tag_option = customtkinter.CTkOptionMenu(self.frame, values=[ALL_TAGS_OPTION, *LOG_TAGS], width=100)
+        self.tag_option.grid(row=1, column=1, padx=10, pady=5, sticky="e")
+
+        self.filter_button = customtkinter.CTkButton(self.frame, text="Filter", width=80)
+        self.filter_button.grid(row=1, column=2, padx=5, pady=5, sticky="e")
+
+        self.reset_filter_button = customtkinter.CTkButton(self.frame, text="Show all", width=80)
+        self.reset_filter_button.grid(row=1, column=3, padx=5, pady=5, sticky="e")
+
+        if on_filter:
+            self.filter_button.configure(command=lambda: on_filter(self.selected_tag, self.search_entry.get()))
+            self.search_entry.bind("<Return>", lambda _event: on_filter(self.selected_tag, self.search_entry.get()))
+            self.tag_option.configure(command=lambda _value: on_filter(self.selected_tag, self.search_entry.get()))
+            self.reset_filter_button.configure(command=lambda: self._reset_filter(on_filter))
+
         self.textbox = customtkinter.CTkTextbox(self.frame)
-        self.textbox.grid(row=1, column=0, columnspan=4, padx=10, pady=(5, 10), sticky="nsew")
+        self.textbox.grid(row=2, column=0, columnspan=4, padx=10, pady=(5, 5), sticky="nsew")
         self.textbox.configure(state="disabled")
 
+        self.metrics_label = customtkinter.CTkLabel(self.frame, text="API: no calls yet", anchor="w")
+        self.metrics_label.grid(row=3, column=0, columnspan=4, padx=10, pady=(0, 10), sticky="ew")
+
+    @property
+    def selected_tag(self):
+        tag = self.tag_option.get()
+        return None if tag == ALL_TAGS_OPTION else tag
 
+    def _reset_filter(self, on_filter):
+        self.search_entry.delete(0, "end")
+        self.tag_option.set(ALL_TAGS_OPTION)
+        on_filter(None, "")
@@ -1,17 +1,270 @@
+import os
+import queue
+import shutil
+import threading
+from collections import deque
+
 import customtkinter
+from dotenv import load_dotenv
 
+load_dotenv()
 
-class TextboxStream:
-    """A stream-like object that writes to a CTkTextbox via the hosting app."""
-    def __init__(self, app):
+# How often queued log text is flushed to the widget, and the most segments per flush.
+FLUSH_INTERVAL_MS = 50
+MAX_SEGMENTS_PER_FLUSH = 5000
+
+# Lines kept in the log widget; everything is also written to the session log on disk.
+SCROLLBACK_LINES = int(os.getenv("OPENSTACK_LOG_SCROLLBACK", "5000"))
+# Recent lines kept in memory for tag/text search.
+LOG_INDEX_LINES = int(os.getenv("OPENSTACK_LOG_INDEX_LINES", "50000"))
+SESSION_LOG_PATH = os.getenv("OPENSTACK_SESSION_LOG", "session.log")
+SESSION_LOG_MAX_BYTES = int(os.getenv("OPENSTACK_SESSION_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+SESSION_LOG_BACKUPS = int(os.getenv("OPENSTACK_SESSION_LOG_BACKUPS", "3"))
+
+# Tags produced by infer_log_tag(), in the order the filter menu lists them.
+LOG_TAGS = ("ERROR", "WARNING", "INFO", "SUCCESS", "POLL", "ROUTER", "FLOATING", "PORTS", "AUTH", "CIRCUIT", "POOL", "UI")
+
+
+class SessionLog:
+    """
+    Append-only log of everything printed this session, rotated by size.
+
+    When the file reaches ``max_bytes`` it is renamed to ``<path>.1`` (older
+    backups shift up, at most ``backups`` are kept). The previous session's
+    log is rotated away on start-up.
+    """
+
+    def __init__(self, path=SESSION_LOG_PATH, max_bytes=SESSION_LOG_MAX_BYTES, backups=SESSION_LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._rotations = 0
+        self._file = None
+        if os.path.exists(path) and os.path.getsize(path):
+            self._rotate()
+        self._rotations = 0
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _rotate(self):
+        if self._file:
+            self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        self._rotations += 1
+        if self._file:
+            self._file = open(self.path, "w", encoding="utf-8")
+
+    def append(self, text):
+        try:
+            # tell() is in bytes; non-ASCII text is longer encoded than in characters.
+            if self._file.tell() + len(text.encode("utf-8")) > self.max_bytes:
+                self._rotate()
+            self._file.write(text)
+            self._file.flush()
+        except OSError:
+            # The UI must keep working even if the disk is full or the file vanished.
+            pass
+
+    def files(self):
+        """This session's log files, oldest first."""
+        kept = min(self._rotations, self.backups)
+        backups = [f"{self.path}.{index}" for index in range(kept, 0, -1)]
+        return [path for path in backups if os.path.exists(path)] + [self.path]
+
+    def save_to(self, filename):
+        """Stream this session's log files into ``filename``."""
+        self._file.flush()
+        with open(filename, "wb") as target:
+            for path in self.files():
+                with open(path, "rb") as source:
+                    shutil.copyfileobj(source, target)
+
+
+class LogIndex:
+    """The most recent log lines with a per-tag index for filtering."""
+
+    def __init__(self, max_lines=LOG_INDEX_LINES):
+        self.max_lines = max_lines
+        self._next_seq = 0
+        self._order = deque()
+        self._lines = {}
+        self._by_tag = {}
+
+    def add(self, text, tag):
+        seq = self._next_seq
+        self._next_seq += 1
+        self._order.append(seq)
+        self._lines[seq] = (text, tag)
+        self._by_tag.setdefault(tag, deque()).append(seq)
+        while len(self._order) > self.max_lines:
+            oldest = self._order.popleft()
+            _, oldest_tag = self._lines.pop(oldest)
+            self._by_tag[oldest_tag].popleft()
+
+    def search(self, tag=None, text=None, limit=None):
+        """
+        Return the newest matching lines as (text, tag) pairs, oldest first.
+
+        Args:
+            tag (str): Only lines with this tag, or None for all lines.
+            text (str): Case-insensitive substring, or None/"" for any text.
+            limit (int): Maximum number of lines to return.
+        """
+        seqs = self._by_tag.get(tag, ()) if tag else self._order
+        needle = text.lower() if text else None
+        matches = []
+        for seq in reversed(seqs):
+            line = self._lines[seq]
+            if needle and needle not in line[0].lower():
+                continue
+            matches.append(line)
+            if limit and len(matches) >= limit:
+                break
+        matches.reverse()
+        return matches
+
+
+class LogSink:
+    """
+    Collects log text from any thread and writes it to a CTkTextbox in batches.
+
+    ``write`` only tags complete lines and puts them on a queue. A timer on
+    the Tk loop drains the queue every ``FLUSH_INTERVAL_MS``, appends the batch
+    to the session log and the search index, and inserts the visible lines in
+    one call. The widget keeps at most ``scrollback`` lines.
+    """
+
+    def __init__(
+        self,
+        app,
+        textbox,
+        interval_ms=FLUSH_INTERVAL_MS,
+        max_segments=MAX_SEGMENTS_PER_FLUSH,
+        scrollback=SCROLLBACK_LINES,
+        session_log=None,
+        index=None,
+    ):
         self.app = app
+        self.textbox = textbox
+        self.interval_ms = interval_ms
+        self.max_segments = max_segments
+        self.scrollback = scrollback
+        self.session_log = session_log or SessionLog()
+        self.index = index or LogIndex()
+        self.filter_tag = None
+        self.filter_text = ""
+        self._queue = queue.SimpleQueue()
+        self._partial = threading.local()
+        self._widget_lines = 0
+
+    def write(self, text):
+        if not text:
+            return
+        # print() writes the message and the newline separately; tag whole lines only.
+        pending = getattr(self._partial, "text", "") + text
+        lines = pending.splitlines(keepends=True)
+        self._partial.text = lines.pop() if not lines[-1].endswith(("\n", "\r")) else ""
+        if lines:
+            self._queue.put([(line, infer_log_tag(line)) for line in lines])
+
+    def flush(self):
+        pending = getattr(self._partial, "text", "")
+        if pending:
+            self._partial.text = ""
+            self._queue.put([(pending, infer_log_tag(pending))])
+
+    def start(self):
+        self.app.after(self.interval_ms, self._flush)
+
+    def _drain(self):
+        segments = []
+        while len(segments) < self.max_segments:
+            try:
+                segments.extend(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return segments
+
+    def _flush(self):
+        try:
+            segments = self._ingest()
+            visible = [segment for segment in segments if self._matches(*segment)]
+            if visible:
+                self._insert(visible)
+        finally:
+            self.app.after(self.interval_ms, self._flush)
+
+    def _matches(self, line, tag):
+        if self.filter_tag and tag != self.filter_tag:
+            return False
+        return not self.filter_text or self.filter_text.lower() in line.lower()
+
+    def set_filter(self, tag=None, text=""):
+        """Show only indexed lines matching ``tag`` and ``text``; new lines are filtered too."""
+        self.filter_tag = tag or None
+        self.filter_text = text or ""
+        self._ingest()
+        matches = self.index.search(self.filter_tag, self.filter_text, limit=self.scrollback)
+        self.clear()
+        if matches:
+            self._insert(matches)
+        return len(matches)
+
+    def _ingest(self):
+        """Drain the queue into the session log and the index; return the drained lines."""
+        segments = self._drain()
+        if segments:
+            self.session_log.append("".join(line for line, _ in segments))
+            for line, tag in segments:
+                self.index.add(line, tag)
+        return segments
+
+    def clear(self):
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.configure(state="disabled")
+        self._widget_lines = 0
+
+    def _insert(self, segments):
+        # Merge runs with the same tag, then hand Tk one insert of alternating text/tag arguments.
+        args = []
+        current_text, current_tag = [], None
+        for line, tag in segments:
+            if current_text and tag != current_tag:
+                args.extend(("".join(current_text), (current_tag,) if current_tag else ()))
+                current_text = []
+            current_text.append(line)
+            current_tag = tag
+        if current_text:
+            args.extend(("".join(current_text), (current_tag,) if current_tag else ()))
+
+        self.textbox.configure(state="normal")
+        # CTkTextbox.insert only takes one text/tag pair; the wrapped tk.Text takes many.
+        self.textbox._textbox.insert("end", *args)
+        self._widget_lines += len(segments)
+        excess = self._widget_lines - self.scrollback
+        if excess > 0:
+            self.textbox.delete("1.0", f"{excess + 1}.0")
+            self._widget_lines -= excess
+        self.textbox.see("end")
+        self.textbox.configure(state="disabled")
+
+
+class TextboxStream:
+    """A stream-like object that forwards writes to a LogSink."""
+    def __init__(self, sink):
+        self.sink = sink
 
     def write(self, text):
-        # Delegate to the app to handle parsing/coloring and thread-safety
-        self.app.after(0, self.app._append_log, text)
+        # The sink is thread-safe; coloring and widget updates happen on the Tk loop
+        self.sink.write(text)
 
     def flush(self):
-        pass
+        self.sink.flush()
 
 
 def configure_log_widget(textbox: customtkinter.CTkTextbox):
@@ -25,6 +278,8 @@ def configure_log_widget(textbox: customtkinter.CTkTextbox):
     textbox.tag_config("FLOATING", foreground="#0891b2")  # cyan-600
     textbox.tag_config("PORTS", foreground="#0ea5e9")     # sky-600
     textbox.tag_config("AUTH", foreground="#22c55e")      # green-500
+    textbox.tag_config("CIRCUIT", foreground="#e11d48")   # rose-600
+    textbox.tag_config("POOL", foreground="#ca8a04")      # yellow-600
     textbox.tag_config("UI", foreground="#a855f7")        # purple-500
 
 
@@ -48,6 +303,10 @@ def infer_log_tag(line: str):
         return "PORTS"
     if s.startswith("[auth]"):
         return "AUTH"
+    if s.startswith("[circuit]"):
+        return "CIRCUIT"
+    if s.startswith("[pool]"):
+        return "POOL"
     if s.startswith("[ui]"):
         return "UI"
     lowered = s.lower()
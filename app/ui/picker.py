@@ -0,0 +1,288 @@
+import tkinter
+
+import customtkinter
+
+from ..utils.search_index import SearchIndex
+
+# Rows drawn in the dropdown; only this window of the matches is ever rendered.
+VISIBLE_ROWS = 12
+# Pause after a keystroke before the matches are recomputed.
+SEARCH_DELAY_MS = 120
+# Dropdown colours per appearance mode: background, text, selected row, empty-list text.
+LIST_COLORS = {
+    "Dark": ("#2b2b2b", "#dce4ee", "#1f6aa5", "#8a8f98"),
+    "Light": ("#f9f9fa", "#1a1a1a", "#3b8ed0", "#6b7280"),
+}
+
+
+class ResourcePicker:
+    """
+    Type-ahead picker for resource lists with thousands of entries.
+
+    A drop-in for ``CTkComboBox`` (``get``/``set``) whose values live in a
+    ``SearchIndex``. Typing filters the values by prefix, then substring; the
+    dropdown only ever holds ``VISIBLE_ROWS`` rows and swaps their text as the
+    match list scrolls, so opening it costs the same for ten values or ten
+    thousand. ``set_values`` updates the index incrementally and leaves the
+    widgets alone unless the dropdown is open.
+    """
+
+    def __init__(self, master, command=None, placeholder_text="Type to search", empty_text="No matches"):
+        self.command = command
+        self.empty_text = empty_text
+        self.index = SearchIndex()
+        self.pinned = []
+        self._selection = ""
+        self._matches = []
+        self._offset = 0
+        self._active = 0
+        self._popup = None
+        self._listbox = None
+        self._scrollbar = None
+        self._search_job = None
+
+        self.frame = customtkinter.CTkFrame(master, fg_color="transparent")
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        self.entry = customtkinter.CTkEntry(self.frame, placeholder_text=placeholder_text)
+        self.entry.grid(row=0, column=0, sticky="ew")
+        self.toggle_button = customtkinter.CTkButton(self.frame, text="▾", width=28, command=self.toggle)
+        self.toggle_button.grid(row=0, column=1, padx=(4, 0))
+
+        self.entry.bind("<KeyRelease>", self._on_key_release)
+        self.entry.bind("<Down>", lambda _event: self._move(1))
+        self.entry.bind("<Up>", lambda _event: self._move(-1))
+        self.entry.bind("<Next>", lambda _event: self._move(VISIBLE_ROWS))
+        self.entry.bind("<Prior>", lambda _event: self._move(-VISIBLE_ROWS))
+        self.entry.bind("<Return>", self._on_return)
+        self.entry.bind("<Escape>", lambda _event: self.close())
+        self.entry.bind("<FocusOut>", lambda _event: self.frame.after(150, self._close_if_unfocused))
+        root = self.frame.winfo_toplevel()
+        root.bind("<Button-1>", self._on_root_click, add="+")
+        root.bind("<Configure>", lambda event: event.widget is root and self.close(), add="+")
+
+    # -- values --------------------------------------------------------------
+
+    def set_values(self, values, default=None, pinned=()):
+        """
+        Replace the offered values, keeping the current choice if it survives.
+
+        Args:
+            values (list[str]): Values to offer; only the difference to the
+                current values is applied to the index.
+            default (str, optional): Choice to fall back to when the current
+                one is gone; otherwise the first of ``pinned + values``.
+            pinned (list[str]): Values always listed first, whatever the query.
+        """
+        values = list(values)
+        self.index.update(values)
+        self.pinned = list(pinned)
+        offered = self.pinned + values
+        if offered and not self._offers(self._selection):
+            self.set(default if default is not None and self._offers(default) else offered[0])
+        if self.is_open:
+            self._refresh_matches()
+
+    def _offers(self, value):
+        return value in self.index or value in self.pinned
+
+    def get(self):
+        return self._selection
+
+    def set(self, value):
+        self._selection = value
+        self._show_text(value)
+
+    def _show_text(self, text):
+        self.entry.delete(0, "end")
+        if text:
+            self.entry.insert(0, text)
+
+    def _choose(self, value):
+        self.set(value)
+        self.close()
+        if self.command:
+            self.command(value)
+
+    # -- dropdown ------------------------------------------------------------
+
+    @property
+    def is_open(self):
+        return self._popup is not None
+
+    def toggle(self):
+        if self.is_open:
+            self.close()
+        else:
+            self.open(query="")
+            self.entry.focus_set()
+
+    def open(self, query=None):
+        if self._popup is None:
+            self._build_popup()
+        self._place_popup()
+        self._refresh_matches(query)
+
+    def close(self):
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+            self._search_job = None
+        if self._popup is None:
+            return
+        self._popup.destroy()
+        self._popup = self._listbox = self._scrollbar = None
+        self._show_text(self._selection)
+
+    def _build_popup(self):
+        background, text, selected, _ = LIST_COLORS.get(customtkinter.get_appearance_mode(), LIST_COLORS["Dark"])
+        self._popup = tkinter.Toplevel(self.frame)
+        self._popup.overrideredirect(True)
+        self._popup.configure(background=background)
+        self._popup.grid_columnconfigure(0, weight=1)
+
+        self._listbox = tkinter.Listbox(
+            self._popup,
+            height=VISIBLE_ROWS,
+            activestyle="none",
+            exportselection=False,
+            takefocus=0,
+            borderwidth=0,
+            highlightthickness=0,
+            background=background,
+            foreground=text,
+            selectbackground=selected,
+            selectforeground="#ffffff",
+        )
+        self._listbox.grid(row=0, column=0, sticky="nsew", padx=(4, 0), pady=4)
+        self._listbox.bind("<ButtonRelease-1>", self._on_list_click)
+        self._listbox.bind("<Motion>", lambda event: self._highlight(self._offset + self._listbox.nearest(event.y)))
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self._listbox.bind(sequence, self._on_wheel)
+
+        self._scrollbar = customtkinter.CTkScrollbar(self._popup, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns", pady=4)
+
+    def _place_popup(self):
+        self.frame.update_idletasks()
+        x = self.frame.winfo_rootx()
+        y = self.frame.winfo_rooty() + self.frame.winfo_height() + 2
+        self._popup.geometry(f"{self.frame.winfo_width()}x{self._listbox.winfo_reqheight() + 8}+{x}+{y}")
+        self._popup.lift()
+
+    def _refresh_matches(self, query=None):
+        """Recompute the matches for ``query`` (default: the entry text) and show the first window."""
+        self._search_job = None
+        if self._popup is None:
+            return
+        if query is None:
+            query = self.entry.get()
+        needle = query.strip().lower()
+        pinned = [value for value in self.pinned if needle in value.lower()]
+        self._matches = pinned + self.index.search(query)
+        self._offset = 0
+        self._active = self._matches.index(self._selection) if not needle and self._selection in self._matches else 0
+        self._scroll_to(self._active - VISIBLE_ROWS // 2)
+
+    def _scroll_to(self, offset):
+        total = len(self._matches)
+        self._offset = max(0, min(offset, total - VISIBLE_ROWS))
+        self._render()
+
+    def _render(self):
+        """Fill the fixed rows with the visible window of matches."""
+        background, text, _, muted = LIST_COLORS.get(customtkinter.get_appearance_mode(), LIST_COLORS["Dark"])
+        total = len(self._matches)
+        window = self._matches[self._offset:self._offset + VISIBLE_ROWS]
+        self._listbox.delete(0, "end")
+        if window:
+            self._listbox.insert("end", *window)
+            self._listbox.configure(foreground=text)
+        else:
+            self._listbox.insert("end", self.empty_text)
+            self._listbox.configure(foreground=muted)
+        self._highlight(self._active)
+        if total > VISIBLE_ROWS:
+            self._scrollbar.set(self._offset / total, (self._offset + VISIBLE_ROWS) / total)
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _highlight(self, position):
+        if not self._matches:
+            return
+        self._active = max(0, min(position, len(self._matches) - 1))
+        self._listbox.selection_clear(0, "end")
+        if self._offset <= self._active < self._offset + VISIBLE_ROWS:
+            self._listbox.selection_set(self._active - self._offset)
+
+    def _move(self, step):
+        if not self.is_open:
+            self.open(query="")
+            return "break"
+        if self._matches:
+            self._active = max(0, min(self._active + step, len(self._matches) - 1))
+            if self._active < self._offset:
+                self._scroll_to(self._active)
+            elif self._active >= self._offset + VISIBLE_ROWS:
+                self._scroll_to(self._active - VISIBLE_ROWS + 1)
+            else:
+                self._highlight(self._active)
+        return "break"
+
+    # -- events --------------------------------------------------------------
+
+    def _on_key_release(self, event):
+        if event.keysym in ("Up", "Down", "Prior", "Next", "Return", "Escape", "Tab"):
+            return
+        if self.entry.get() == self._selection and not self.is_open:
+            return
+        if not self.is_open:
+            self._build_popup()
+            self._place_popup()
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+        self._search_job = self.frame.after(SEARCH_DELAY_MS, self._refresh_matches)
+
+    def _on_return(self, _event):
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+            self._refresh_matches()
+        text = self.entry.get()
+        if self.is_open and self._matches:
+            self._choose(self._matches[self._active])
+        elif self._offers(text):
+            self._choose(text)
+        return "break"
+
+    def _on_list_click(self, event):
+        position = self._offset + self._listbox.nearest(event.y)
+        if position < len(self._matches):
+            self._choose(self._matches[position])
+            self.entry.focus_set()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self._offset - 3)
+        else:
+            self._scroll_to(self._offset + 3)
+        return "break"
+
+    def _on_scrollbar(self, action, value, units=None):
+        if action == "moveto":
+            self._scroll_to(round(float(value) * len(self._matches)))
+        elif action == "scroll":
+            self._scroll_to(self._offset + (3 if int(value) > 0 else -3))
+
+    def _on_root_click(self, event):
+        if self.is_open and not str(event.widget).startswith(str(self.frame)):
+            self.close()
+
+    def _close_if_unfocused(self):
+        if not self.is_open:
+            return
+        try:
+            focused = self.frame.focus_get()
+        except KeyError:
+            # tkinter cannot name focus inside override-redirect windows; treat it as inside.
+            return
+        if focused is not None and not str(focused).startswith((str(self.frame), str(self._popup))):
+            self.close()
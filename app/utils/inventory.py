@@ -0,0 +1,260 @@
+import json
+import threading
+import time
+
+from ..services import events
+from ..services.snapshot import COLLECTION_KEYS, OUTPUT_FILE, STORE_BACKEND, SnapshotReader
+
+# Minimum seconds between stat() calls used to detect a rewritten snapshot.
+STAT_INTERVAL = 1.0
+# Seconds a patched item is re-applied over reloaded sections, so a poll that started
+# before the create and finished after it cannot hide the new item.
+PATCH_HOLD = 120.0
+
+
+class BaseInventory:
+    """Lookups shared by the JSON and SQLite inventories."""
+
+    def id_for_name(self, resource_name, name):
+        item = self.find_by_name(resource_name, name)
+        return item.get("id") if item else None
+
+    def has_name(self, resource_name, name):
+        return self.find_by_name(resource_name, name) is not None
+
+
+class Inventory(BaseInventory):
+    """
+    In-memory, indexed view of the cached OpenStack snapshot.
+
+    Resource sections are read lazily through the snapshot manifest, so only
+    the resources a caller touches are parsed. Each loaded section is indexed
+    by id and by name; ports are also indexed by device_id and floating IPs by
+    association state. Lookups are dictionary hits; the snapshot is only
+    re-read when its version changes (checked at most every ``STAT_INTERVAL``
+    seconds) or after ``invalidate()``.
+    """
+
+    def __init__(self, path=OUTPUT_FILE):
+        self.path = path
+        self._lock = threading.RLock()
+        self._reader = None
+        self._version = None
+        self._checked_at = 0.0
+        self._sections = {}
+        self._by_id = {}
+        self._by_name = {}
+        self._ports_by_device = {}
+        self._available_floating_ips = {}
+        self._patches = {}
+
+    # -- loading -----------------------------------------------------------
+
+    def refresh(self, force=False):
+        """Drop loaded sections if the snapshot changed on disk."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._reader is not None and now - self._checked_at < STAT_INTERVAL:
+                return False
+            self._checked_at = now
+            reader = SnapshotReader(self.path)
+            if not force and self._reader is not None and reader.version == self._version:
+                return False
+            self._reader = reader
+            self._version = reader.version
+            self._sections = {}
+            self._by_id = {}
+            self._by_name = {}
+            self._ports_by_device = {}
+            self._available_floating_ips = {}
+            return True
+
+    def invalidate(self):
+        """Force the next lookup to re-check the snapshot on disk."""
+        with self._lock:
+            self._reader = None
+
+    def _section(self, resource_name):
+        """Return the payload for one resource, loading and indexing it on first use."""
+        self.refresh()
+        if resource_name in self._sections:
+            return self._sections[resource_name]
+        with self._lock:
+            if resource_name in self._sections:
+                return self._sections[resource_name]
+            payload = self._apply_patches(resource_name, self._read(resource_name))
+            self._index(resource_name, payload)
+            self._sections[resource_name] = payload
+            return payload
+
+    def _read(self, resource_name):
+        if not self._reader.exists():
+            print(f"Warning: {self.path} not found.")
+            return None
+        try:
+            return self._reader.read_section(resource_name)
+        except (OSError, json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"Error: Failed to parse {self.path}: {e}")
+            return None
+
+    def _index(self, resource_name, payload):
+        items = (payload or {}).get(COLLECTION_KEYS[resource_name], [])
+        ids = {}
+        names = {}
+        for item in items:
+            if resource_name == "keypairs":
+                item = item.get("keypair", item)
+            if item.get("id"):
+                ids[item["id"]] = item
+            if item.get("name") is not None:
+                # Keep the first item per name, matching the old linear scans.
+                names.setdefault(item["name"], item)
+        self._by_id[resource_name] = ids
+        self._by_name[resource_name] = names
+
+        if resource_name == "ports":
+            ports_by_device = {}
+            for port in ids.values():
+                if port.get("device_id"):
+                    ports_by_device.setdefault(port["device_id"], []).append(port)
+            self._ports_by_device = ports_by_device
+        elif resource_name == "floating_ips":
+            self._available_floating_ips = {
+                fip_id: fip for fip_id, fip in ids.items() if not fip.get("port_id")
+            }
+
+    def preload(self, resource_names):
+        """Load sections ahead of use (e.g. from a background thread)."""
+        for resource_name in resource_names:
+            self._section(resource_name)
+
+    def patch(self, resource_name, item):
+        """
+        Upsert one item returned by a create/update call into the inventory in
+        memory, so the UI sees it without a full poll.
+
+        The snapshot on disk is left to the targeted background refresh that
+        follows every change; until that has landed (at most ``PATCH_HOLD``
+        seconds), the item is re-applied whenever the section is reloaded.
+        ``item`` None only signals that the resource type is stale.
+        """
+        if item is None or resource_name not in COLLECTION_KEYS or not item.get("id"):
+            return
+        with self._lock:
+            patches = self._patches.setdefault(resource_name, {})
+            previous = patches.get(item["id"], ({}, 0.0))[0]
+            patches[item["id"]] = ({**previous, **item}, time.monotonic() + PATCH_HOLD)
+            if resource_name in self._sections:
+                payload = self._apply_patches(resource_name, self._sections[resource_name])
+                self._sections[resource_name] = payload
+                self._index(resource_name, payload)
+
+    def _apply_patches(self, resource_name, payload):
+        """Return ``payload`` with the unexpired patches for ``resource_name`` merged in."""
+        patches = self._patches.get(resource_name)
+        if not patches:
+            return payload
+        now = time.monotonic()
+        for item_id in [item_id for item_id, (_, expires) in patches.items() if expires <= now]:
+            del patches[item_id]
+        if not patches:
+            return payload
+        collection_key = COLLECTION_KEYS[resource_name]
+        items = list((payload or {}).get(collection_key, []))
+        positions = {existing.get("id"): index for index, existing in enumerate(items)}
+        for item_id, (item, _) in patches.items():
+            if item_id in positions:
+                items[positions[item_id]] = {**items[positions[item_id]], **item}
+            else:
+                items.append(item)
+        return {**(payload or {}), collection_key: items}
+
+    # -- lookups -----------------------------------------------------------
+
+    @property
+    def loaded(self):
+        self.refresh()
+        return self._reader.exists()
+
+    def items(self, resource_name):
+        """Return the cached item list for a resource (in snapshot order)."""
+        payload = self._section(resource_name) or {}
+        return payload.get(COLLECTION_KEYS[resource_name], [])
+
+    def get(self, resource_name, item_id):
+        self._section(resource_name)
+        return self._by_id.get(resource_name, {}).get(item_id)
+
+    def find_by_name(self, resource_name, name):
+        self._section(resource_name)
+        return self._by_name.get(resource_name, {}).get(name)
+
+    def ports_for_device(self, device_id):
+        self._section("ports")
+        return list(self._ports_by_device.get(device_id, []))
+
+    def available_floating_ips(self):
+        """Floating IPs that are not associated with any port."""
+        self._section("floating_ips")
+        return list(self._available_floating_ips.values())
+
+
+class SqliteInventory(BaseInventory):
+    """
+    Inventory backed by the SQLite store; every lookup is an indexed query, so
+    there is nothing to load or invalidate.
+    """
+
+    def __init__(self, store=None):
+        from ..services.sqlite_store import get_store
+
+        self.store = store or get_store()
+        self.path = self.store.path
+
+    @property
+    def loaded(self):
+        return self.store.has_data()
+
+    def refresh(self, force=False):
+        return False
+
+    def invalidate(self):
+        pass
+
+    def preload(self, resource_names):
+        pass
+
+    def patch(self, resource_name, item):
+        if item is None or resource_name not in COLLECTION_KEYS:
+            return
+        self.store.upsert_items(resource_name, [item])
+
+    def items(self, resource_name):
+        return self.store.items(resource_name)
+
+    def get(self, resource_name, item_id):
+        return self.store.get(resource_name, item_id)
+
+    def find_by_name(self, resource_name, name):
+        return self.store.find_by_name(resource_name, name)
+
+    def ports_for_device(self, device_id):
+        return self.store.ports_for_device(device_id)
+
+    def available_floating_ips(self):
+        return self.store.unassociated_floating_ips()
+
+
+_inventory = None
+_inventory_lock = threading.Lock()
+
+
+def get_inventory():
+    """Return the process-wide inventory shared by validators and the GUI."""
+    global _inventory
+    if _inventory is None:
+        with _inventory_lock:
+            if _inventory is None:
+                _inventory = SqliteInventory() if STORE_BACKEND == "sqlite" else Inventory()
+                events.subscribe(_inventory.patch)
+    return _inventory
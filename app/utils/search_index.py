@@ -0,0 +1,105 @@
+import bisect
+import threading
+
+# Substring queries at least this long are answered from the trigram postings.
+TRIGRAM = 3
+
+
+def _trigrams(text):
+    return {text[index:index + TRIGRAM] for index in range(len(text) - TRIGRAM + 1)}
+
+
+class SearchIndex:
+    """
+    Case-insensitive prefix/substring index over a set of display strings.
+
+    Values are kept in a sorted list of lowercased keys, so prefix matches
+    are a ``bisect`` range, and in trigram postings, so substring matches
+    only verify the candidates that share every trigram of the query.
+    ``update()`` applies the difference between the indexed values and a
+    new list instead of rebuilding, which keeps inventory refreshes cheap
+    when only a few items changed.
+    """
+
+    def __init__(self, values=()):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._values = {}
+        self._postings = {}
+        self.update(values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, value):
+        return value in self._values
+
+    def update(self, values):
+        """
+        Make the index hold exactly ``values`` (anything but a string is skipped).
+
+        Returns:
+            tuple[int, int]: Number of values added and removed.
+        """
+        wanted = {value for value in values if isinstance(value, str)}
+        with self._lock:
+            removed = [value for value in self._values if value not in wanted]
+            added = [value for value in wanted if value not in self._values]
+            for value in removed:
+                self._remove(value)
+            for value in added:
+                self._add(value)
+        return len(added), len(removed)
+
+    def _add(self, value):
+        key = value.lower()
+        self._values[value] = key
+        bisect.insort(self._keys, (key, value))
+        for gram in _trigrams(key):
+            self._postings.setdefault(gram, set()).add(value)
+
+    def _remove(self, value):
+        key = self._values.pop(value)
+        position = bisect.bisect_left(self._keys, (key, value))
+        del self._keys[position]
+        for gram in _trigrams(key):
+            bucket = self._postings.get(gram)
+            if bucket is not None:
+                bucket.discard(value)
+                if not bucket:
+                    del self._postings[gram]
+
+    def search(self, query=""):
+        """
+        Return the values matching ``query``: prefix matches first, then other
+        substring matches, each group in alphabetical order. An empty query
+        returns every value.
+        """
+        query = (query or "").strip().lower()
+        with self._lock:
+            if not query:
+                return [value for _, value in self._keys]
+
+            # Walk the prefix range by index; slicing would copy the whole tail per keystroke.
+            prefixed = []
+            for position in range(bisect.bisect_left(self._keys, (query,)), len(self._keys)):
+                key, value = self._keys[position]
+                if not key.startswith(query):
+                    break
+                prefixed.append(value)
+
+            if len(query) >= TRIGRAM:
+                buckets = [self._postings.get(gram, ()) for gram in _trigrams(query)]
+                if not all(buckets):
+                    return prefixed
+                # Every match is in the rarest trigram's bucket; verifying it beats intersecting.
+                others = sorted(
+                    (self._values[value], value) for value in min(buckets, key=len)
+                    if query in self._values[value] and not self._values[value].startswith(query)
+                )
+            else:
+                others = [
+                    (key, value) for key, value in self._keys
+                    if query in key and not key.startswith(query)
+                ]
+            return prefixed + [value for _, value in others]
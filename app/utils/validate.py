@@ -1,48 +1,84 @@
-import json
-import os
+import requests
 
-DATA_FILE = "openstack_data.json"
+from ..services import query
+from ..services.pagination import PageFetchError
+from .inventory import get_inventory
 
-def _load_data():
-    """Loads JSON data from cache, returns empty dict if not found or invalid."""
-    if not os.path.exists(DATA_FILE):
-        print(f"Warning: {DATA_FILE} not found.")
-        return {}
+# Attributes needed to pick a port for floating IP association.
+PORT_LOOKUP_FIELDS = ("id", "device_id", "status")
+
+
+def _live_lookup(description, lookup):
+    """Run a live query; return None (so the caller uses the cache) if it fails."""
     try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error: Failed to parse {DATA_FILE}: {e}")
-        return {}
+        return lookup()
+    except (requests.RequestException, PageFetchError) as exc:
+        print(f"Warning: Live {description} failed ({exc}); using cached data.")
+        return None
+
+
+def is_network_duplicate(name, live=False):
+    """
+    Check if a network with the same name already exists.
 
-def is_network_duplicate(name):
-    """Check if a network with the same name already exists."""
-    data = _load_data()
-    networks = data.get("networks", {}).get("networks", [])
-    return any(net.get("name") == name for net in networks)
+    With ``live``, Neutron is asked directly (one ``name=`` query returning only
+    IDs) so networks created since the last poll are caught too.
+    """
+    if live:
+        found = _live_lookup("network name check", lambda: query.exists("networks", name=name))
+        if found is not None:
+            return found
+    return get_inventory().has_name("networks", name)
 
-def is_instance_duplicate(name):
-    """Check if an instance with the same name already exists."""
-    data = _load_data()
-    servers = data.get("servers", {}).get("servers", [])
-    return any(vm.get("name") == name for vm in servers)
+def is_instance_duplicate(name, live=False):
+    """Check if an instance with the same name already exists (see ``is_network_duplicate``)."""
+    return bool(find_duplicate_instances([name], live=live))
+
+
+def find_duplicate_instances(names, live=False):
+    """
+    Return the names from ``names`` that existing instances already use.
+
+    With ``live``, Nova's summary listing is queried once with a name filter
+    covering every candidate, instead of loading the cached server list.
+    """
+    if live:
+        servers = _live_lookup(
+            "instance name check",
+            lambda: query.list_resources("servers", {"name": list(names)}, fields=["id", "name"]),
+        )
+        if servers is not None:
+            taken = {server.get("name") for server in servers}
+            return [name for name in names if name in taken]
+    inventory = get_inventory()
+    return [name for name in names if inventory.has_name("servers", name)]
 
 
 def get_available_floating_ips():
     """Return floating IP objects that are not currently associated with any port."""
-    data = _load_data()
-    floating_ips = data.get("floating_ips", {}).get("floatingips", [])
-    return [ip for ip in floating_ips if not ip.get("port_id")]
+    return get_inventory().available_floating_ips()
 
 
-def get_port_id_by_device(device_id):
-    """Return the first Neutron port ID that matches the supplied device (instance) ID."""
+def get_port_id_by_device(device_id, live=False):
+    """
+    Return the first Neutron port ID that matches the supplied device (instance) ID.
+
+    With ``live``, the port is looked up with a ``device_id=`` query returning
+    only ``PORT_LOOKUP_FIELDS``, preferring an ACTIVE port.
+    """
     if not device_id:
         return None
 
-    data = _load_data()
-    ports = data.get("ports", {}).get("ports", [])
-    for port in ports:
-        if port.get("device_id") == device_id:
-            return port.get("id")
-    return None
+    if live:
+        ports = _live_lookup(
+            f"port lookup for device {device_id}",
+            lambda: query.list_resources("ports", {"device_id": device_id}, fields=PORT_LOOKUP_FIELDS),
+        )
+        if ports:
+            active = [port for port in ports if port.get("status") == "ACTIVE"]
+            return (active or ports)[0].get("id")
+        if ports is not None:
+            return None
+
+    ports = get_inventory().ports_for_device(device_id)
+    return ports[0].get("id") if ports else None
@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+import pytest
+
+from app.devtools.mock_openstack import MockCloud, base_urls, create_server, start_in_thread
+
+# Base URLs and credentials are read when app.services is imported, so the mock is
+# bound and the environment set before any test module imports the app.
+_cloud = MockCloud(networks=5, servers=40, floating_ips=20, routers=2, boot_seconds=0.2)
+_server = create_server(_cloud, port=0)
+os.environ.update(base_urls(_server))
+os.environ["ACCOUNT_ID"] = "tests"
+os.environ["OPENSTACK_PROJECT_ID"] = "tests"
+os.environ["ACCOUNT_PASSWORD_BASE64"] = "dGVzdHM="
+os.environ["OPENSTACK_AUTO_REFRESH"] = "0"
+os.environ.pop("OPENSTACK_TOKEN", None)
+os.environ.pop("OPENSTACK_INVENTORY_DAEMON", None)
+# Snapshot, poll state and token cache paths are relative; keep them out of the checkout.
+os.chdir(tempfile.mkdtemp(prefix="openstack-tests-"))
+
+
+@pytest.fixture(scope="session")
+def mock_server():
+    start_in_thread(_server)
+    yield _server
+    _server.shutdown()
+
+
+@pytest.fixture
+def cloud(mock_server):
+    return mock_server.cloud
+
+
+@pytest.fixture
+def token(mock_server):
+    from app.services.auth import get_openstack_token
+
+    return get_openstack_token()
+
+
+@pytest.fixture
+def fresh_cloud(mock_server):
+    """Serve a new, small inventory for one test, so its changes do not leak into others."""
+    shared = mock_server.cloud
+    mock_server.cloud = MockCloud(networks=3, servers=12, floating_ips=6, routers=1, boot_seconds=0.2, seed=1)
+    yield mock_server.cloud
+    mock_server.cloud = shared
@@ -0,0 +1,49 @@
+import os
+import threading
+
+from app.services import auth
+from app.services.auth import TokenManager
+
+
+def _hammer(call, threads=8):
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def _run():
+        barrier.wait()
+        results.append(call())
+
+    workers = [threading.Thread(target=_run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def test_concurrent_callers_share_one_keystone_request(mock_server):
+    if os.path.exists(auth.CACHE_FILE):
+        os.remove(auth.CACHE_FILE)
+    manager = TokenManager()
+    issued = len(mock_server.tokens)
+    try:
+        tokens = _hammer(manager.get_token)
+    finally:
+        manager._timer.cancel()
+
+    assert len(set(tokens)) == 1
+    assert len(mock_server.tokens) == issued + 1
+
+
+def test_concurrent_401s_renew_once(mock_server):
+    manager = TokenManager()
+    rejected = manager.get_token()
+    issued = len(mock_server.tokens)
+    try:
+        tokens = _hammer(lambda: manager.handle_unauthorized(rejected))
+    finally:
+        manager._timer.cancel()
+
+    assert len(set(tokens)) == 1
+    assert tokens[0] != rejected
+    assert len(mock_server.tokens) == issued + 1
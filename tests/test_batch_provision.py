@@ -0,0 +1,45 @@
+import time
+
+from app.services.batch_provision import expand_names, provision_batch
+
+
+def test_expand_names():
+    assert expand_names("lab", 2) == ["lab-1", "lab-2"]
+    assert expand_names("lab-{index:02d}", 2, start=9) == ["lab-09", "lab-10"]
+
+
+def test_ready_instances_are_bound_without_waiting_for_slow_ones(cloud, token, monkeypatch):
+    network_id = next(iter(cloud.collections["subnets"].values()))["network_id"]
+    image_id = next(iter(cloud.collections["images"]))
+    flavor_id = next(iter(cloud.collections["flavors"]))
+    free = [fip["id"] for fip in cloud.collections["floating_ips"].values() if not fip["port_id"]][:3]
+
+    create_server = cloud.create_server
+
+    def _slow_first_server(body):
+        created = create_server(body)
+        if body["server"]["name"] == "slow-batch-1":
+            with cloud._lock:
+                cloud._ready_at[created["id"]] += 60
+        return created
+
+    update_floating_ip = cloud.update_floating_ip
+    bound_at = []
+
+    def _record_binding(floating_ip_id, changes):
+        bound_at.append(time.monotonic())
+        return update_floating_ip(floating_ip_id, changes)
+
+    monkeypatch.setattr(cloud, "create_server", _slow_first_server)
+    monkeypatch.setattr(cloud, "update_floating_ip", _record_binding)
+    started = time.monotonic()
+    results = provision_batch(
+        token, "slow-batch", 3, image_id, flavor_id, network_id, floating_ip_ids=free, ready_timeout=4.0,
+    )
+
+    assert [result["error"] is None for result in results] == [False, True, True]
+    assert results[0]["error"].startswith("no ACTIVE port")
+    assert {result["floating_ip_id"] for result in results[1:]} <= set(free)
+    assert len(bound_at) == 2
+    # Bound while the slow instance was still being waited on.
+    assert max(bound_at) - started < 3.0
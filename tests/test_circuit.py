@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from app.devtools.mock_openstack import MockCloud, base_urls, create_server, start_in_thread
+from app.services import circuit, http_client
+from app.services.circuit import CircuitOpenError
+
+
+@pytest.fixture
+def flaky_server(token):
+    server = create_server(MockCloud(networks=1, servers=0, floating_ips=0, routers=0), port=0, error_rate=1.0)
+    server.tokens.add(token)
+    start_in_thread(server)
+    base_url = base_urls(server)["OPENSTACK_NETWORK_URL"]
+    circuit.register_service("flaky", base_url)
+    url = f"{base_url}/networks"
+    breaker = circuit.breaker_for(url)
+    breaker.failure_threshold = 3
+    breaker.reset_timeout = 0.2
+    yield server, url, breaker
+    server.shutdown()
+
+
+def test_circuit_opens_fails_fast_and_recovers(flaky_server, token):
+    server, url, breaker = flaky_server
+    for _ in range(3):
+        assert http_client.get(url, token=token, retries=0).status_code == 503
+    assert breaker.state == circuit.OPEN
+
+    started = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        http_client.get(url, token=token, retries=0)
+    assert time.monotonic() - started < 0.1
+
+    server.error_rate = 0.0
+    time.sleep(0.25)
+    assert http_client.get(url, token=token, retries=0).status_code == 200
+    assert breaker.state == circuit.CLOSED
+
+
+def test_failed_probe_reopens(flaky_server, token):
+    _, url, breaker = flaky_server
+    for _ in range(3):
+        http_client.get(url, token=token, retries=0)
+    time.sleep(0.25)
+
+    assert http_client.get(url, token=token, retries=0).status_code == 503
+    assert breaker.state == circuit.OPEN
@@ -0,0 +1,117 @@
+import threading
+
+from app.services import floating_ip_pool, query
+from app.services.floating_ip_pool import FloatingIPPool
+
+
+def _unbound_ids(cloud):
+    return {fip["id"] for fip in cloud.collections["floating_ips"].values() if not fip["port_id"]}
+
+
+def test_claimed_address_is_not_handed_out(cloud, token):
+    pool = FloatingIPPool(target=0)
+    pool._resync()
+    picked = next(iter(_unbound_ids(cloud)))
+
+    assert pool.claim(picked)
+    assert not pool.claim(picked)
+    taken = pool.acquire_many(pool.available, allocate=False)
+    assert picked not in {fip["id"] for fip in taken}
+
+
+def test_released_claim_returns_at_resync(cloud, token):
+    pool = FloatingIPPool(target=0)
+    picked = next(iter(_unbound_ids(cloud)))
+    pool.claim(picked)
+
+    pool.release(picked)
+    pool._resync()
+
+    taken = pool.acquire_many(pool.available, allocate=False)
+    assert picked in {fip["id"] for fip in taken}
+
+
+def test_stale_claim_expires_at_resync(cloud, token, monkeypatch):
+    pool = FloatingIPPool(target=0)
+    picked = next(iter(_unbound_ids(cloud)))
+    pool.claim(picked)
+    pool._resync()
+    assert pool.status()["claimed"] == 1
+
+    monkeypatch.setattr(floating_ip_pool, "CLAIM_TIMEOUT", -1.0)
+    pool._resync()
+
+    assert pool.status()["claimed"] == 0
+    assert pool.claim(picked)
+
+
+def test_concurrent_acquire_many_hands_out_each_address_once(fresh_cloud, token):
+    pool = FloatingIPPool(target=0)
+    pool._resync()
+    free = pool.available
+    barrier = threading.Barrier(6)
+    taken = []
+
+    def _take():
+        barrier.wait()
+        taken.extend(pool.acquire_many(3, token=token))
+
+    workers = [threading.Thread(target=_take) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    ids = [fip["id"] for fip in taken]
+    assert len(ids) == 18
+    assert len(set(ids)) == 18
+    status = pool.status()
+    # The pool ran dry part-way; the rest was allocated on demand.
+    assert status["allocated"] == 18 - free
+    assert status["claimed"] == 18
+    assert status["available"] == 0
+
+
+def test_address_bound_during_resync_is_not_freed_again(cloud, token, monkeypatch):
+    pool = FloatingIPPool(target=0)
+    pool._resync()
+    list_resources = query.list_resources
+    bound = []
+
+    def _list_while_binding(*args, **kwargs):
+        floating_ips = list_resources(*args, **kwargs)
+        # Another flow takes and binds an address after Neutron answered, before the pool is rebuilt.
+        floating_ip = pool.acquire(allocate=False)
+        pool._on_event("floating_ips", {**floating_ip, "port_id": "port-1"})
+        bound.append(floating_ip["id"])
+        return floating_ips
+
+    monkeypatch.setattr(query, "list_resources", _list_while_binding)
+    pool._resync()
+
+    taken = pool.acquire_many(pool.available, allocate=False)
+    assert bound[0] not in {fip["id"] for fip in taken}
+
+
+def test_resync_keeps_only_the_pool_network(cloud, token, monkeypatch):
+    pool = FloatingIPPool(target=0)
+    foreign = {"id": "foreign-fip", "floating_ip_address": "198.51.100.9", "floating_network_id": "other", "port_id": None}
+    list_resources = query.list_resources
+    monkeypatch.setattr(query, "list_resources", lambda *args, **kwargs: list_resources(*args, **kwargs) + [foreign])
+
+    pool._resync()
+
+    assert pool.available == len(_unbound_ids(cloud))
+    assert "foreign-fip" not in {fip["id"] for fip in pool.acquire_many(pool.available, allocate=False)}
+
+
+def test_released_id_goes_straight_back_to_the_pool(cloud, token):
+    pool = FloatingIPPool(target=0)
+    pool._resync()
+    free = pool.available
+    floating_ip = pool.acquire(allocate=False)
+
+    pool.release(floating_ip["id"])
+
+    assert pool.available == free
+    assert pool.acquire(allocate=False)["id"] == floating_ip["id"]
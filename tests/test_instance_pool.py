@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+from app.services.instance_pool import POOL_METADATA_KEY, InstancePool, profile_key
+from app.utils.inventory import Inventory
+
+
+@pytest.fixture
+def profile(fresh_cloud):
+    network_id = next(iter(fresh_cloud.collections["subnets"].values()))["network_id"]
+    return next(iter(fresh_cloud.collections["images"])), next(iter(fresh_cloud.collections["flavors"])), network_id
+
+
+def _warm(pool, token, timeout=5.0):
+    pool._refill(token)
+    deadline = time.monotonic() + timeout
+    while any(profile["booting"] for profile in pool._profiles.values()):
+        assert time.monotonic() < deadline, "pool instances did not become ready"
+        time.sleep(0.1)
+        pool._check_booting(token)
+
+
+def test_unknown_profile_is_a_miss_that_starts_warming(profile, token):
+    pool = InstancePool(size=1)
+
+    assert pool.acquire(token, *profile, name="first") is None
+    assert profile_key(*profile) in pool._profiles
+
+
+def test_ready_instance_is_renamed_and_replaced(fresh_cloud, profile, token):
+    pool = InstancePool(size=2)
+    pool.add_profile(*profile)
+    _warm(pool, token)
+    booted = set(fresh_cloud.collections["servers"])
+
+    handed_out = pool.acquire(token, *profile, name="web-1")
+
+    server = fresh_cloud.collections["servers"][handed_out["id"]]
+    assert server["name"] == "web-1"
+    assert POOL_METADATA_KEY not in server["metadata"]
+    assert fresh_cloud.collections["ports"][handed_out["port_id"]]["device_id"] == handed_out["id"]
+
+    second = pool.acquire(token, *profile, name="web-2")
+    assert second["id"] != handed_out["id"]
+    assert pool.acquire(token, *profile, name="web-3") is None
+
+    pool._refill(token)
+    assert len(set(fresh_cloud.collections["servers"]) - booted) == 2
+
+
+def test_handouts_are_counted_per_result(profile, token):
+    pool = InstancePool(size=1)
+    pool.add_profile(*profile, label="small")
+    pool.record_handout(*profile, hit=True, seconds=0.5)
+    pool.record_handout(*profile, hit=False, seconds=40.0)
+    pool.record_handout(*profile, hit=False)
+
+    status = pool.status()["small"]
+    assert (status["hits"], status["misses"], status["hit_s"], status["miss_s"]) == (1, 2, 0.5, 40.0)
+    lines = pool.render_prometheus()
+    assert 'openstack_instance_pool_handouts_total{profile="small",result="miss"} 2' in lines
+    assert 'openstack_instance_pool_handout_seconds_count{profile="small",result="hit"} 1' in lines
+
+
+def test_pool_instances_are_adopted_after_a_restart(fresh_cloud, profile, token):
+    from app.services.poll_resources import poll_openstack_resources
+
+    first = InstancePool(size=1)
+    first.add_profile(*profile)
+    _warm(first, token)
+    poll_openstack_resources(verbose=False, resources=["servers", "images", "flavors", "networks"])
+
+    second = InstancePool(size=1)
+    second._adopt(Inventory())
+    _warm(second, token)
+
+    assert second.acquire(token, *profile, name="adopted")["id"] == first._profiles[profile_key(*profile)]["ready"][0]["id"]
+
+
+def test_instance_that_cannot_be_renamed_is_rechecked_then_orphaned(fresh_cloud, profile, token, monkeypatch):
+    from app.services import instance_pool
+
+    pool = InstancePool(size=1)
+    pool.add_profile(*profile, label="small")
+    _warm(pool, token)
+    monkeypatch.setattr(instance_pool, "rename_instance", lambda *args: None)
+
+    assert pool.acquire(token, *profile, name="web") is None
+    assert pool.status()["small"]["booting"] == 1
+    pool._check_booting(token)
+    assert pool.status()["small"]["ready"] == 1
+
+    assert pool.acquire(token, *profile, name="web") is None
+    status = pool.status()["small"]
+    assert (status["ready"], status["booting"], status["failures"]) == (0, 0, 1)
+    assert len(status["orphaned"]) == 1
+    assert "1 to delete" in pool.format_summary()
+
+
+def test_boot_timeout_orphans_the_instance(fresh_cloud, profile, token):
+    pool = InstancePool(size=1, boot_timeout=0.0)
+    pool.add_profile(*profile, label="small")
+    pool._refill(token)
+    server_id = next(iter(pool._profiles[profile_key(*profile)]["booting"]))
+    with fresh_cloud._lock:
+        fresh_cloud._ready_at[server_id] += 60
+
+    pool._check_booting(token)
+
+    assert pool.status()["small"]["orphaned"] == [server_id]
+
+
+def test_deleted_pool_instance_is_dropped(fresh_cloud, profile, token):
+    pool = InstancePool(size=2)
+    pool.add_profile(*profile, label="small")
+    _warm(pool, token)
+    gone, kept = (entry["id"] for entry in pool._profiles[profile_key(*profile)]["ready"])
+    with fresh_cloud._lock:
+        del fresh_cloud.collections["servers"][gone]
+
+    assert pool.acquire(token, *profile, name="web")["id"] == kept
+    status = pool.status()["small"]
+    assert (status["ready"], status["booting"], status["orphaned"]) == (0, 0, [])
@@ -0,0 +1,41 @@
+import os
+
+from app.services.poll_resources import poll_openstack_resources
+from app.services.snapshot import OUTPUT_FILE
+from app.utils import inventory as inventory_module
+from app.utils.inventory import Inventory
+
+
+def test_patch_stays_in_memory(mock_server):
+    poll_openstack_resources(verbose=False, resources=["networks"])
+    inventory = Inventory()
+    mtime = os.stat(OUTPUT_FILE).st_mtime_ns
+
+    inventory.patch("networks", {"id": "patched-net", "name": "patched"})
+
+    assert inventory.find_by_name("networks", "patched")["id"] == "patched-net"
+    assert os.stat(OUTPUT_FILE).st_mtime_ns == mtime
+
+
+def test_patch_survives_a_stale_poll(mock_server):
+    poll_openstack_resources(verbose=False, resources=["networks"])
+    inventory = Inventory()
+    inventory.items("networks")
+    inventory.patch("networks", {"id": "late-net", "name": "late"})
+
+    # A poll that does not know the item rewrites the snapshot.
+    poll_openstack_resources(verbose=False, resources=["networks"])
+    inventory.refresh(force=True)
+
+    assert inventory.get("networks", "late-net") is not None
+
+
+def test_patch_expires(mock_server, monkeypatch):
+    poll_openstack_resources(verbose=False, resources=["networks"])
+    monkeypatch.setattr(inventory_module, "PATCH_HOLD", 0.0)
+    inventory = Inventory()
+    inventory.patch("networks", {"id": "gone-net", "name": "gone"})
+
+    inventory.refresh(force=True)
+
+    assert inventory.get("networks", "gone-net") is None
@@ -0,0 +1,66 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.services.inventory_daemon import DaemonClient, InventoryDaemon, _DaemonHandler
+from app.services.poll_resources import poll_openstack_resources
+from app.services.snapshot import OUTPUT_FILE, load_snapshot
+
+
+@pytest.fixture
+def serve_daemon():
+    servers = []
+
+    def _serve(daemon):
+        daemon._scan(initial=True)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _DaemonHandler)
+        server.daemon_threads = True
+        server.daemon = daemon
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield _serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_changes_rejects_a_non_integer_since(mock_server, serve_daemon):
+    poll_openstack_resources(verbose=False)
+    base_url = serve_daemon(InventoryDaemon())
+
+    assert requests.get(f"{base_url}/changes", params={"since": "abc"}).status_code == 400
+    assert requests.get(f"{base_url}/changes", params={"since": "0", "timeout": "soon"}).status_code == 400
+
+
+def test_changes_from_another_epoch_return_at_once(mock_server, serve_daemon):
+    poll_openstack_resources(verbose=False)
+    daemon = InventoryDaemon()
+    base_url = serve_daemon(daemon)
+
+    status = DaemonClient(base_url).wait_for_changes(daemon.version, timeout=30, epoch="previous-run")
+
+    assert status["epoch"] == daemon.epoch
+
+
+def test_client_resyncs_everything_after_a_daemon_restart(fresh_cloud, serve_daemon, tmp_path):
+    poll_openstack_resources(verbose=False)
+    client = DaemonClient(serve_daemon(InventoryDaemon()), path=str(tmp_path / "client.json"))
+    client.sync()
+
+    # The restarted daemon holds different data under the same version numbers.
+    fresh_cloud.create("networks", {"name": "after-restart"})
+    poll_openstack_resources(verbose=False, resources=["networks"])
+    restarted = InventoryDaemon()
+    client.base_url = serve_daemon(restarted)
+    assert restarted.resource_versions["networks"] == 1
+
+    changed = client.sync()
+
+    assert "networks" in changed
+    names = [network["name"] for network in load_snapshot(client.path, ["networks"])["networks"]["networks"]]
+    assert "after-restart" in names
+    assert load_snapshot(OUTPUT_FILE, ["networks"]) == load_snapshot(client.path, ["networks"])
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from app.services.http_client import NETWORK_BASE_URL
+from app.services.metrics import metrics
+from app.services.pagination import CollectionPager
+
+
+@pytest.fixture(params=[False, True], ids=["content-length", "chunked"])
+def chunked(request, mock_server):
+    mock_server.chunked = request.param
+    yield request.param
+    mock_server.chunked = False
+
+
+def test_streamed_pages_count_their_body_once(cloud, token, chunked):
+    before = metrics.response_bytes_total()
+    pager = CollectionPager(f"{NETWORK_BASE_URL}/networks", token, "networks", page_size=0)
+    items = [item for batch in pager for item in batch]
+
+    # One page without links: the mock's body is exactly this document.
+    expected = len(json.dumps({"networks": items}).encode("utf-8"))
+    assert metrics.response_bytes_total() - before == expected
+
+
+def test_buffered_responses_count_their_body(cloud, token, chunked):
+    from app.services import http_client
+
+    before = metrics.response_bytes_total()
+    response = http_client.get(f"{NETWORK_BASE_URL}/routers", token=token)
+
+    assert metrics.response_bytes_total() - before == len(response.content)
@@ -0,0 +1,79 @@
+import time
+
+import requests
+
+from app.devtools.mock_openstack import COMPUTE_PREFIX, NETWORK_PREFIX, MockCloud
+
+
+def _url(server, prefix, path):
+    return f"http://127.0.0.1:{server.server_port}{prefix}/{path}"
+
+
+def _get(server, prefix, path, token, **kwargs):
+    return requests.get(_url(server, prefix, path), headers={"X-Auth-Token": token, **kwargs.pop("headers", {})}, **kwargs)
+
+
+def test_requests_need_an_issued_token(mock_server):
+    assert requests.get(_url(mock_server, NETWORK_PREFIX, "networks")).status_code == 401
+    assert _get(mock_server, NETWORK_PREFIX, "networks", "made-up").status_code == 401
+
+
+def test_limit_marker_and_next_links(fresh_cloud, mock_server, token):
+    ids = []
+    url = _url(mock_server, NETWORK_PREFIX, "ports?limit=4")
+    while url:
+        body = requests.get(url, headers={"X-Auth-Token": token}).json()
+        assert len(body["ports"]) <= 4
+        ids += [port["id"] for port in body["ports"]]
+        url = next((link["href"] for link in body.get("ports_links", []) if link["rel"] == "next"), None)
+
+    assert ids == list(fresh_cloud.collections["ports"])
+
+
+def test_filters_fields_and_changes_since(fresh_cloud, mock_server, token):
+    server_id = next(iter(fresh_cloud.collections["servers"]))
+    filtered = _get(mock_server, NETWORK_PREFIX, "ports", token, params={"device_id": server_id, "fields": "id"}).json()
+    assert filtered["ports"] and all(set(port) == {"id"} for port in filtered["ports"])
+
+    fresh_cloud.rename_server(server_id, "renamed")
+    since = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - 60))
+    changed = _get(mock_server, COMPUTE_PREFIX, "servers/detail", token, params={"changes-since": since}).json()
+    assert [server["id"] for server in changed["servers"]] == [server_id]
+
+
+def test_etag_answers_304_until_the_collection_changes(fresh_cloud, mock_server, token):
+    etag = _get(mock_server, NETWORK_PREFIX, "networks", token).headers["ETag"]
+    assert _get(mock_server, NETWORK_PREFIX, "networks", token, headers={"If-None-Match": etag}).status_code == 304
+
+    fresh_cloud.create("networks", {"name": "new"})
+    assert _get(mock_server, NETWORK_PREFIX, "networks", token, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_new_servers_boot_after_boot_seconds(fresh_cloud, mock_server, token):
+    network_id = next(iter(fresh_cloud.collections["subnets"].values()))["network_id"]
+    response = requests.post(
+        _url(mock_server, COMPUTE_PREFIX, "servers"),
+        json={"server": {"name": "booting", "networks": [{"uuid": network_id}]}},
+        headers={"X-Auth-Token": token},
+    )
+    server_id = response.json()["server"]["id"]
+
+    assert _get(mock_server, COMPUTE_PREFIX, f"servers/{server_id}", token).json()["server"]["status"] == "BUILD"
+    time.sleep(fresh_cloud.boot_seconds + 0.05)
+    assert _get(mock_server, COMPUTE_PREFIX, f"servers/{server_id}", token).json()["server"]["status"] == "ACTIVE"
+    ports = _get(mock_server, NETWORK_PREFIX, "ports", token, params={"device_id": server_id}).json()["ports"]
+    assert [port["status"] for port in ports] == ["ACTIVE"]
+
+
+def test_injected_errors(mock_server, token):
+    mock_server.error_rate, mock_server.error_status = 1.0, 502
+    try:
+        assert _get(mock_server, NETWORK_PREFIX, "networks", token).status_code == 502
+    finally:
+        mock_server.error_rate, mock_server.error_status = 0.0, 503
+
+
+def test_generation_is_deterministic():
+    first, second = MockCloud(servers=5, seed=3), MockCloud(servers=5, seed=3)
+
+    assert first.collections == second.collections
@@ -0,0 +1,53 @@
+import pytest
+
+from app.services.http_client import NETWORK_BASE_URL
+from app.services.pagination import CollectionPager
+
+
+def _collect(pager):
+    items = []
+    for batch in pager:
+        items.extend(batch)
+    return items
+
+
+@pytest.fixture
+def ignore_paging(mock_server):
+    mock_server.ignore_paging = True
+    yield
+    mock_server.ignore_paging = False
+
+
+def test_follows_next_links(cloud, token):
+    pager = CollectionPager(f"{NETWORK_BASE_URL}/ports", token, "ports", page_size=7)
+    items = _collect(pager)
+
+    assert [port["id"] for port in items] == list(cloud.collections["ports"])
+    # A full last page costs one more (empty) request when the service sends no links.
+    assert pager.pages in (-(-len(items) // 7), -(-len(items) // 7) + 1)
+
+
+def test_filters_and_fields_apply_to_every_page(cloud, token):
+    network_id = next(iter(cloud.collections["subnets"].values()))["network_id"]
+    params = {"network_id": network_id, "fields": ["id", "network_id"]}
+    items = _collect(CollectionPager(f"{NETWORK_BASE_URL}/ports", token, "ports", params=params, page_size=3))
+
+    expected = [port["id"] for port in cloud.collections["ports"].values() if port["network_id"] == network_id]
+    assert [port["id"] for port in items] == expected
+    assert all(set(port) == {"id", "network_id"} for port in items)
+
+
+def test_server_ignoring_limit_is_read_once(cloud, token, ignore_paging):
+    pager = CollectionPager(f"{NETWORK_BASE_URL}/networks", token, "networks", page_size=2)
+    items = _collect(pager)
+
+    assert [network["id"] for network in items] == list(cloud.collections["networks"])
+    assert pager.pages == 1
+
+
+def test_server_ignoring_limit_at_exact_page_size(cloud, token, ignore_paging):
+    # The whole collection fits the limit exactly, so the pager asks for a second page.
+    total = len(cloud.collections["networks"])
+    items = _collect(CollectionPager(f"{NETWORK_BASE_URL}/networks", token, "networks", page_size=total))
+
+    assert len(items) == total
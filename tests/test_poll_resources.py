@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+
+from app.services.poll_resources import POLL_STATE_FILE, _merge_items, get_deleted_resources, poll_openstack_resources
+from app.services.snapshot import load_snapshot
+
+
+def _servers():
+    return load_snapshot(resource_names=["servers"])["servers"]["servers"]
+
+
+def test_merge_items_keeps_order():
+    previous = [{"id": "a", "v": 1}, {"id": "b", "v": 1}, {"id": "c", "v": 1}]
+
+    merged = _merge_items(previous, [{"id": "b", "v": 2}, {"id": "d", "v": 1}], {"c"})
+
+    assert merged == [{"id": "a", "v": 1}, {"id": "b", "v": 2}, {"id": "d", "v": 1}]
+
+
+def test_incremental_poll_merges_changes_since(fresh_cloud, mock_server):
+    poll_openstack_resources(verbose=False, resources=["servers"])
+    before = _servers()
+    renamed, deleted = before[0]["id"], before[1]["id"]
+
+    fresh_cloud.rename_server(renamed, "renamed")
+    created = fresh_cloud.create_server({"server": {"name": "created", "networks": []}})["id"]
+    with fresh_cloud._lock:
+        # Nova lists servers deleted since the marker time with status DELETED.
+        fresh_cloud.collections["servers"][deleted].update(status="DELETED", updated=fresh_cloud.collections["servers"][renamed]["updated"])
+        fresh_cloud.versions["servers"] += 1
+    poll_openstack_resources(verbose=False, incremental=True, resources=["servers"])
+    after = {server["id"]: server for server in _servers()}
+
+    assert after[renamed]["name"] == "renamed"
+    assert created in after
+    assert deleted not in after
+    assert len(after) == len(before)
+    assert deleted in get_deleted_resources("servers")
+
+
+def test_incremental_poll_keeps_unchanged_sections(fresh_cloud):
+    poll_openstack_resources(verbose=False, resources=["networks"])
+    before = load_snapshot(resource_names=["networks"])
+
+    # The ETag still matches, so the mock answers 304 and the section is carried over.
+    poll_openstack_resources(verbose=False, incremental=True, resources=["networks"])
+
+    assert load_snapshot(resource_names=["networks"]) == before
+
+
+def test_concurrent_partial_polls_keep_each_others_state(fresh_cloud, mock_server, monkeypatch):
+    poll_openstack_resources(verbose=False)
+    os.remove(POLL_STATE_FILE)
+    # Slow responses so that every poll reads the state file before any of them writes it.
+    monkeypatch.setattr(mock_server, "latency", 0.1)
+    threads = [
+        threading.Thread(target=poll_openstack_resources, kwargs={"verbose": False, "resources": [resource_name]})
+        for resource_name in ("networks", "servers", "ports", "subnets")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(POLL_STATE_FILE, encoding="utf-8") as f:
+        state = json.load(f)
+    assert {"networks", "servers", "ports", "subnets"} <= set(state)
+    snapshot = load_snapshot()
+    assert len(snapshot["servers"]["servers"]) == len(fresh_cloud.collections["servers"])
+    assert len(snapshot["networks"]["networks"]) == len(fresh_cloud.collections["networks"])
@@ -0,0 +1,43 @@
+import random
+import string
+
+from app.utils.search_index import SearchIndex
+
+
+def _brute_force(values, query):
+    query = query.strip().lower()
+    prefixed = sorted((value.lower(), value) for value in values if value.lower().startswith(query))
+    others = sorted((value.lower(), value) for value in values if query in value.lower() and not value.lower().startswith(query))
+    return [value for _, value in prefixed + others]
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    values = {"".join(rng.choice(string.ascii_letters + "-_ ") for _ in range(rng.randint(1, 12))) for _ in range(3000)}
+    index = SearchIndex(values)
+
+    for query in ["", "a", "AB", "ab-", "x_y", " q ", "zzzzzz", *rng.sample(sorted(values), 20)]:
+        assert index.search(query) == _brute_force(values, query)
+
+
+def test_prefix_matches_come_first():
+    index = SearchIndex(["net-web", "web", "webserver", "my-web-1"])
+
+    assert index.search("web") == ["web", "webserver", "my-web-1", "net-web"]
+
+
+def test_update_applies_only_the_difference():
+    index = SearchIndex(["alpha", "beta", "gamma"])
+
+    assert index.update(["alpha", "gamma", "delta"]) == (1, 1)
+    assert "beta" not in index
+    assert index.search("ta") == ["delta"]
+    assert index.search("") == ["alpha", "delta", "gamma"]
+
+
+def test_non_string_values_are_skipped():
+    index = SearchIndex(["web", None, "db"])
+
+    assert len(index) == 2
+    assert index.update(["web", None]) == (0, 1)
+    assert index.search("") == ["web"]
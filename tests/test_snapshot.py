@@ -0,0 +1,101 @@
+import gzip
+import json
+
+import pytest
+
+from app.services.snapshot import SnapshotReader, SnapshotWriter, load_snapshot, manifest_path_for
+
+PAYLOADS = {
+    "networks": {"networks": [{"id": "n1", "name": "net-é"}, {"id": "n2", "name": "net-2"}]},
+    "ports": {"ports": [{"id": "p1", "device_id": "s1"}]},
+    "routers": None,
+}
+
+
+def _write(path, payloads, order=None):
+    writer = SnapshotWriter(str(path))
+    try:
+        for resource_name, payload in payloads.items():
+            writer.write_payload(resource_name, payload)
+        writer.commit(order or list(payloads))
+    finally:
+        writer.discard()
+
+
+@pytest.fixture(params=["openstack_data.json", "openstack_data.json.gz"])
+def snapshot_path(request, tmp_path):
+    return tmp_path / request.param
+
+
+def test_sections_read_through_the_manifest(snapshot_path):
+    _write(snapshot_path, PAYLOADS)
+    reader = SnapshotReader(str(snapshot_path))
+
+    assert reader.manifest is not None
+    assert reader.compressed == str(snapshot_path).endswith(".gz")
+    for resource_name, payload in PAYLOADS.items():
+        assert reader.read_section(resource_name) == payload
+    assert reader.item_count("networks") == 2
+
+
+def test_file_is_one_json_document_in_commit_order(snapshot_path):
+    _write(snapshot_path, PAYLOADS, order=["routers", "ports", "networks"])
+    opener = gzip.open if str(snapshot_path).endswith(".gz") else open
+    with opener(snapshot_path, "rt", encoding="utf-8") as f:
+        document = json.load(f)
+
+    assert document == PAYLOADS
+    assert list(document) == ["routers", "ports", "networks"]
+
+
+def test_stale_manifest_falls_back_to_a_full_parse(tmp_path):
+    path = tmp_path / "openstack_data.json"
+    _write(path, PAYLOADS)
+    # A hand edit leaves the manifest's byte ranges wrong.
+    path.write_text(json.dumps({**PAYLOADS, "ports": {"ports": []}}, indent=2), encoding="utf-8")
+    reader = SnapshotReader(str(path))
+
+    assert reader.manifest is None
+    assert reader.read_section("ports") == {"ports": []}
+    assert reader.read_section("networks") == PAYLOADS["networks"]
+
+
+def test_rewrite_changes_version_and_copies_untouched_sections(snapshot_path):
+    _write(snapshot_path, PAYLOADS)
+    before = SnapshotReader(str(snapshot_path))
+
+    writer = SnapshotWriter(str(snapshot_path))
+    try:
+        writer.write_payload("ports", {"ports": []})
+        writer.copy_section("networks", before)
+        writer.copy_section("routers", before)
+        writer.commit(list(PAYLOADS))
+    finally:
+        writer.discard()
+    after = SnapshotReader(str(snapshot_path))
+
+    assert after.version != before.version
+    assert load_snapshot(str(snapshot_path), resource_names=list(PAYLOADS)) == {**PAYLOADS, "ports": {"ports": []}}
+    with open(manifest_path_for(str(snapshot_path)), encoding="utf-8") as f:
+        assert json.load(f)["version"] == after.version
+
+
+def test_open_reader_keeps_reading_the_pinned_file(snapshot_path):
+    _write(snapshot_path, PAYLOADS)
+
+    with SnapshotReader(str(snapshot_path)) as reader:
+        # Another poll replaces the snapshot with sections at different offsets.
+        _write(snapshot_path, {"routers": {"routers": [{"id": "r" * 200}]}, **PAYLOADS, "networks": None})
+
+        assert reader.read_section("networks") == PAYLOADS["networks"]
+        assert reader.read_section("ports") == PAYLOADS["ports"]
+
+
+def test_reader_drops_a_stale_manifest(snapshot_path):
+    _write(snapshot_path, PAYLOADS)
+    reader = SnapshotReader(str(snapshot_path))
+    replaced = {"routers": {"routers": [{"id": "r" * 200}]}, "networks": {"networks": []}, "ports": None}
+    _write(snapshot_path, replaced)
+
+    assert reader.read_section("networks") == {"networks": []}
+    assert reader.manifest is None
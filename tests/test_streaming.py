@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from app.services.pagination import iter_collection_items
+
+DOCUMENT = {
+    "ports_links": [{"rel": "next", "href": "http://example/ports?marker=b"}],
+    "ports": [
+        {"id": "a", "name": "café ☕", "mtu": 1450, "ratio": 12.5, "tags": [], "note": "braces } ] { ["},
+        {"id": "b", "name": "", "enabled": True, "parent": None, "big": -1.25e+10, "escaped": "quote \" back \\"},
+    ],
+    "count": 2,
+}
+
+
+def _chunked(data, size):
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 16])
+def test_items_and_extras_survive_any_chunking(size):
+    body = json.dumps(DOCUMENT, ensure_ascii=False).encode("utf-8")
+    extras = {}
+
+    items = list(iter_collection_items(_chunked(body, size), "ports", extras))
+
+    assert items == DOCUMENT["ports"]
+    assert extras == {"ports_links": DOCUMENT["ports_links"], "count": 2}
+
+
+@pytest.mark.parametrize("body", [b'{"ports": []}', b"{}", b' { "ports" : [ ] } '])
+def test_empty_collections(body):
+    assert list(iter_collection_items(_chunked(body, 1), "ports", {})) == []
+
+
+def test_number_split_at_a_chunk_boundary_is_not_cut_short():
+    items = list(iter_collection_items([b'{"ports": [12', b".5, 3", b"]}"], "ports", {}))
+
+    assert items == [12.5, 3]
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b'{"ports": [1, 2', b'{"ports": [1 2]}', b""])
+def test_malformed_bodies_raise_value_error(body):
+    with pytest.raises(ValueError):
+        list(iter_collection_items(_chunked(body, 3), "ports", {}))
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from app.services import topology
+from app.services.poll_resources import poll_openstack_resources
+from app.services.topology import TopologyError, build_tasks, execute_tasks
+from app.utils.inventory import Inventory
+
+
+@pytest.fixture
+def inventory(fresh_cloud):
+    poll_openstack_resources(verbose=False)
+    return Inventory()
+
+
+def _existing_subnet(cloud):
+    subnet = next(iter(cloud.collections["subnets"].values()))
+    network = cloud.collections["networks"][subnet["network_id"]]
+    return network, subnet
+
+
+def _instance(name, network, **extra):
+    return {"name": name, "network": network, "image": "image-0", "flavor": "m1.flavor-0", **extra}
+
+
+def test_existing_resources_are_reused(fresh_cloud, inventory, token):
+    network, subnet = _existing_subnet(fresh_cloud)
+    manifest = {"networks": [{"name": network["name"], "subnets": [{"name": subnet["name"], "cidr": subnet["cidr"]}]}]}
+    subnets_before = len(fresh_cloud.collections["subnets"])
+
+    results, failed, _ = execute_tasks(build_tasks(manifest, token, inventory))
+
+    assert not failed
+    assert results == {("network", network["name"]): network["id"], ("subnet", subnet["name"]): subnet["id"]}
+    assert len(fresh_cloud.collections["subnets"]) == subnets_before
+
+
+def test_same_subnet_name_on_another_network_is_created(fresh_cloud, inventory, token):
+    network, subnet = _existing_subnet(fresh_cloud)
+    manifest = {"networks": [{"name": "topology-net", "subnets": [{"name": subnet["name"], "cidr": "10.99.0.0/24"}]}]}
+
+    results, failed, _ = execute_tasks(build_tasks(manifest, token, inventory))
+
+    assert not failed
+    new_subnet_id = results[("subnet", subnet["name"])]
+    assert new_subnet_id != subnet["id"]
+    assert fresh_cloud.collections["subnets"][new_subnet_id]["network_id"] == results[("network", "topology-net")]
+
+
+def test_dependents_of_a_failed_task_are_skipped(fresh_cloud, inventory, token, monkeypatch):
+    created = []
+    monkeypatch.setattr(topology, "create_subnet", lambda *args, **kwargs: None)
+    monkeypatch.setattr(topology, "create_instance", lambda token, name, *args, **kwargs: created.append(name))
+    manifest = {
+        "networks": [{"name": "broken-net", "subnets": [{"name": "broken-subnet", "cidr": "10.98.0.0/24"}]}],
+        "routers": [{"name": "broken-router", "subnets": ["broken-subnet"]}],
+        "instances": [_instance("broken-vm", "broken-net")],
+    }
+
+    results, failed, _ = execute_tasks(build_tasks(manifest, token, inventory))
+
+    assert set(results) == {("network", "broken-net"), ("router", "broken-router")}
+    assert failed == {
+        ("subnet", "broken-subnet"),
+        ("interface", "broken-router", "broken-subnet"),
+        ("instance", "broken-vm"),
+    }
+    assert created == []
+
+
+def test_tasks_start_after_their_dependencies(fresh_cloud, inventory, token):
+    manifest = {
+        "networks": [
+            {"name": f"order-net-{index}", "subnets": [{"name": f"order-subnet-{index}", "cidr": f"10.9{index}.0.0/24"}]}
+            for index in range(2)
+        ],
+        "routers": [{"name": "order-router", "subnets": ["order-subnet-0", "order-subnet-1"]}],
+        "instances": [_instance("order-vm", "order-net-0", count=3)],
+    }
+    tasks = build_tasks(manifest, token, inventory)
+    events = []
+    lock = threading.Lock()
+
+    def _recorded(key, action):
+        def _run(results):
+            with lock:
+                events.append(("start", key))
+            try:
+                return action(results)
+            finally:
+                with lock:
+                    events.append(("end", key))
+        return _run
+
+    for key, task in tasks.items():
+        task.action = _recorded(key, task.action)
+
+    results, failed, _ = execute_tasks(tasks, max_workers=4)
+
+    assert not failed and len(results) == len(tasks)
+    for key, task in tasks.items():
+        started = events.index(("start", key))
+        assert all(events.index(("end", dep)) < started for dep in task.deps)
+    assert tasks[("instance", "order-vm-1")].deps == [("network", "order-net-0"), ("subnet", "order-subnet-0")]
+
+
+def test_unknown_references_are_rejected(inventory, token):
+    with pytest.raises(TopologyError):
+        build_tasks({"instances": [_instance("lost-vm", "no-such-network")]}, token, inventory)
+
+
+def test_apply_polls_when_there_is_no_snapshot(fresh_cloud, token, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    empty = Inventory()
+    monkeypatch.setattr(topology, "get_inventory", lambda: empty)
+    manifest = {"instances": [_instance("first-run-vm", "net-0")]}
+
+    results, failed, _ = topology.apply_topology(manifest, token=token)
+
+    assert not failed
+    assert ("instance", "first-run-vm") in results